@@ -0,0 +1,338 @@
+"""
+Пакетное построение отчетов по многим папкам с измерениями.
+
+Каждая папка загружается один раз, графики R2 и уровней и таблица уровней строятся в отдельном процессе,
+папки обрабатываются параллельно. Ошибка в одной папке не останавливает обработку остальных.
+
+Запуск из корня репозитория:
+    python -m radar_chart.batch "data/ЭВМ БК-ТЗ-4К/*" --workers 8
+    python -m radar_chart.batch --manifest campaigns.txt --output-dir reports
+    python -m radar_chart.batch "data/ЭВМ БК-ТЗ-4К/*" --profile trace.json
+"""
+import argparse
+import concurrent.futures
+import functools
+import glob
+import os
+import pathlib
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class BatchOptions:
+    """Настройки построения отчетов"""
+    r2: bool = True
+    levels: bool = True
+    csv: bool = True
+    r2_max_y_tick: Optional[int] = 13
+    levels_max_y_tick: Optional[int] = None
+    col_count: int = 5
+    levels_page_size: Optional[int] = None
+    levels_format: str = 'png'
+    output_dir: Optional[pathlib.Path] = None
+    profile: bool = False
+    profile_memory: bool = False
+
+
+@dataclass
+class JobResult:
+    """Результат обработки одной папки"""
+    dir_name: str
+    outputs: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+    trace_events: List[dict] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.timings.values())
+
+
+def read_manifest(path: pathlib.Path) -> List[str]:
+    """
+    Прочитать список папок из файла: по одной папке (или шаблону) на строку,
+    пустые строки и строки, начинающиеся с #, пропускаются
+    """
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def expand_dirs(patterns: List[str]) -> List[pathlib.Path]:
+    """Раскрыть шаблоны путей в список папок без повторов, в порядке перечисления"""
+    dirs = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            path = pathlib.Path(match)
+            if path.is_dir() and path not in dirs:
+                dirs.append(path)
+    return dirs
+
+
+def output_path(dir_path: pathlib.Path, suffix: str, options: BatchOptions) -> pathlib.Path:
+    """Путь к файлу отчета: рядом с папкой измерений или в options.output_dir"""
+    if options.output_dir is None:
+        return pathlib.Path(str(dir_path) + suffix)
+    return options.output_dir.joinpath(dir_path.name + suffix)
+
+
+@functools.lru_cache(maxsize=4)
+def r2_template(max_y_tick: int):
+    """
+    Шаблон графика R2 процесса пула для предела шкалы max_y_tick: графики R2 всех папок,
+    обрабатываемых процессом, строятся на одной фигуре
+
+    :return: R2FigureTemplate
+    """
+    from .radarplot.plotter import R2FigureTemplate
+    from .radarplot.utils import Line
+
+    line_styles = [Line('tab:blue', '-', 1.1, 0.8), Line('tab:red', '-', 1.6, 0.8)]
+    return R2FigureTemplate(max_y_tick, line_styles=line_styles)
+
+
+def render_r2(r2_data, dir_path: pathlib.Path, options: BatchOptions) -> List[str]:
+    """
+    Построить и сохранить график R2
+
+    :param r2_data: данные RadarDataR2ManyMeas
+    :param dir_path: папка с измерениями
+    :param options: настройки построения отчетов
+    :return: пути к сохраненным файлам
+    """
+    from .radarplot.utils import determine_max_y_tick
+
+    path = output_path(dir_path, ' [График R2].png', options)
+    max_y_tick = options.r2_max_y_tick
+    if max_y_tick is None:
+        max_y_tick = determine_max_y_tick([r2_data.data])
+    r2_template(max_y_tick).render([r2_data], str(path))
+    return [str(path)]
+
+
+def save_levels_csv(levels_data, dir_path: pathlib.Path, options: BatchOptions) -> List[str]:
+    """
+    Сохранить таблицу уровней (в имени файла - максимальная зона R2)
+
+    :param levels_data: данные RadarDataLevelsManyMeas
+    :param dir_path: папка с измерениями
+    :param options: настройки построения отчетов
+    :return: пути к сохраненным файлам
+    """
+    path = output_path(dir_path, f' [R2={levels_data.max_r2}].csv', options)
+    levels_data.save_data(str(path))
+    return [str(path)]
+
+
+def levels_max_y_tick(levels_data, options: BatchOptions) -> int:
+    """
+    Предел шкалы графиков уровней: заданный в настройках или, если он не задан, по данным
+
+    :param levels_data: данные RadarDataLevelsManyMeas
+    :param options: настройки построения отчетов
+    """
+    from .radarplot.utils import determine_max_y_tick
+
+    if options.levels_max_y_tick is not None:
+        return options.levels_max_y_tick
+    return determine_max_y_tick([levels_data.data])
+
+
+def render_levels(levels_data, dir_path: pathlib.Path, options: BatchOptions,
+                  frequencies: Optional[List[float]] = None,
+                  previous_max_y_tick: Optional[int] = None) -> List[str]:
+    """
+    Построить и сохранить графики уровней
+
+    :param levels_data: данные RadarDataLevelsManyMeas
+    :param dir_path: папка с измерениями
+    :param options: настройки построения отчетов
+    :param frequencies: при постраничном выводе в файлы - перестроить только страницы с этими частотами
+    (None - все страницы)
+    :param previous_max_y_tick: предел шкалы ранее сохраненных страниц. Если предел по новым данным
+    другой (или прежний не задан), перестраиваются все страницы, чтобы шкала всего отчета была одной
+    :return: пути к сохраненным файлам
+    """
+    from .radarplot.plotter import RadarLevelsPlotter
+
+    path = output_path(dir_path, f' [Уровни].{options.levels_format}', options)
+    plotter = RadarLevelsPlotter([levels_data], max_y_tick=levels_max_y_tick(levels_data, options),
+                                 col_count=options.col_count, page_size=options.levels_page_size)
+    if not plotter.paged:
+        plotter.save(str(path))
+        return [str(path)]
+
+    pages = None
+    if frequencies is not None and plotter.max_y_tick == previous_max_y_tick:
+        frequencies = set(frequencies)
+        pages = [i_page for i_page, page in enumerate(plotter.pages()) if frequencies.intersection(page)]
+    return [str(page_path) for page_path in plotter.save_pages(path, pages=pages)]
+
+
+def process_dir(dir_path: pathlib.Path, options: BatchOptions) -> JobResult:
+    """
+    Загрузить данные одной папки и построить по ним отчеты. Исключения не выбрасываются,
+    а возвращаются в результате, чтобы ошибка одной папки не прерывала всю обработку
+
+    :param dir_path: папка с измерениями
+    :param options: настройки построения отчетов
+    :return: результат обработки (при options.profile - с этапами обработки в trace_events)
+    """
+    from .radarplot import profiling
+
+    result = JobResult(str(dir_path))
+    if not options.profile:
+        _process_dir(dir_path, options, result)
+        return result
+
+    with profiling.Profiler(memory=options.profile_memory) as profiler:
+        with profiling.span('dir', dir=dir_path.name):
+            _process_dir(dir_path, options, result)
+    result.trace_events = profiler.chrome_events()
+    return result
+
+
+def _process_dir(dir_path: pathlib.Path, options: BatchOptions, result: JobResult) -> None:
+    """Этапы обработки одной папки; время этапов и ошибка записываются в result"""
+    from .radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+
+    stage = 'загрузка'
+    try:
+        start = time.perf_counter()
+        r2_data = RadarDataR2ManyMeas(str(dir_path)).load() if options.r2 else None
+        levels_data = RadarDataLevelsManyMeas(str(dir_path)).load() if options.levels or options.csv else None
+        result.timings['load'] = time.perf_counter() - start
+
+        if options.r2:
+            stage = 'график R2'
+            start = time.perf_counter()
+            result.outputs.extend(render_r2(r2_data, dir_path, options))
+            result.timings['r2'] = time.perf_counter() - start
+
+        if options.csv:
+            stage = 'таблица уровней'
+            start = time.perf_counter()
+            result.outputs.extend(save_levels_csv(levels_data, dir_path, options))
+            result.timings['csv'] = time.perf_counter() - start
+
+        if options.levels:
+            stage = 'график уровней'
+            start = time.perf_counter()
+            result.outputs.extend(render_levels(levels_data, dir_path, options))
+            result.timings['levels'] = time.perf_counter() - start
+    except Exception:
+        result.error = f'{stage}: {traceback.format_exc()}'
+
+
+def _init_worker() -> None:
+    """Процессы пула рисуют без окон"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def run_batch(dirs: List[pathlib.Path], options: BatchOptions, workers: Optional[int] = None,
+              stream=sys.stdout) -> List[JobResult]:
+    """
+    Обработать папки в пуле процессов
+
+    :param dirs: папки с измерениями
+    :param options: настройки построения отчетов
+    :param workers: количество процессов (None - по числу ядер)
+    :param stream: куда выводить ход обработки
+    :return: результаты в порядке dirs
+    """
+    if options.output_dir is not None:
+        options.output_dir.mkdir(parents=True, exist_ok=True)
+
+    results: Dict[pathlib.Path, JobResult] = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(process_dir, dir_path, options): dir_path for dir_path in dirs}
+        for future in concurrent.futures.as_completed(futures):
+            dir_path = futures[future]
+            try:
+                result = future.result()
+            except Exception:
+                # Процесс пула аварийно завершился
+                result = JobResult(str(dir_path), error=traceback.format_exc())
+            results[dir_path] = result
+            status = 'OK    ' if result.ok else 'ОШИБКА'
+            print(f'[{len(results)}/{len(dirs)}] {status} {result.total_time:7.2f} с  {dir_path}', file=stream)
+
+    return [results[dir_path] for dir_path in dirs]
+
+
+def print_summary(results: List[JobResult], wall_time: float, stream=sys.stdout) -> None:
+    """Вывести сводку по времени этапов и ошибкам"""
+    failed = [result for result in results if not result.ok]
+    print(file=stream)
+    print(f'Папок: {len(results)}, успешно: {len(results) - len(failed)}, с ошибками: {len(failed)}, '
+          f'время: {wall_time:.1f} с', file=stream)
+
+    stages = sorted({stage for result in results for stage in result.timings})
+    for stage in stages:
+        times = [result.timings[stage] for result in results if stage in result.timings]
+        print(f'  {stage:<7} всего {sum(times):8.2f} с, среднее {sum(times) / len(times):6.2f} с, '
+              f'максимум {max(times):6.2f} с', file=stream)
+
+    for result in failed:
+        print(f'\nОшибка в папке {result.dir_name}:\n{result.error}', file=stream)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m radar_chart.batch',
+                                     description='Пакетное построение графиков R2 и уровней по папкам с измерениями')
+    parser.add_argument('dirs', nargs='*', help='папки с измерениями или шаблоны путей (glob)')
+    parser.add_argument('--manifest', type=pathlib.Path, help='файл со списком папок, по одной на строку')
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов (по умолчанию - по числу ядер)')
+    parser.add_argument('--output-dir', type=pathlib.Path, default=None,
+                        help='папка для отчетов (по умолчанию - рядом с папками измерений)')
+    parser.add_argument('--r2-max-y-tick', type=int, default=13, help='предел шкалы графика R2')
+    parser.add_argument('--levels-max-y-tick', type=int, default=None, help='предел шкалы графиков уровней')
+    parser.add_argument('--col-count', type=int, default=5, help='количество колонок графиков уровней')
+    parser.add_argument('--levels-page-size', type=int, default=None,
+                        help='количество графиков уровней на странице (по умолчанию - все на одном изображении)')
+    parser.add_argument('--levels-format', choices=['png', 'pdf'], default='png',
+                        help='формат графиков уровней (pdf - многостраничный файл при постраничном выводе)')
+    parser.add_argument('--no-r2', action='store_true', help='не строить графики R2')
+    parser.add_argument('--no-levels', action='store_true', help='не строить графики уровней')
+    parser.add_argument('--no-csv', action='store_true', help='не сохранять таблицы уровней')
+    parser.add_argument('--profile', type=pathlib.Path, default=None,
+                        help='сохранить этапы обработки всех папок в файл Chrome trace (chrome://tracing)')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='при --profile замерять пиковую память этапов (замедляет обработку)')
+    args = parser.parse_args(argv)
+
+    patterns = list(args.dirs)
+    if args.manifest is not None:
+        patterns.extend(read_manifest(args.manifest))
+    dirs = expand_dirs(patterns)
+    if not dirs:
+        parser.error('не найдено ни одной папки с измерениями')
+
+    options = BatchOptions(r2=not args.no_r2, levels=not args.no_levels, csv=not args.no_csv,
+                           r2_max_y_tick=args.r2_max_y_tick, levels_max_y_tick=args.levels_max_y_tick,
+                           col_count=args.col_count, levels_page_size=args.levels_page_size,
+                           levels_format=args.levels_format, output_dir=args.output_dir,
+                           profile=args.profile is not None, profile_memory=args.profile_memory)
+
+    start = time.perf_counter()
+    results = run_batch(dirs, options, workers=args.workers or os.cpu_count())
+    print_summary(results, time.perf_counter() - start)
+
+    if args.profile is not None:
+        from .radarplot.profiling import save_chrome_trace
+        save_chrome_trace(args.profile, [event for result in results for event in result.trace_events])
+
+    return 0 if all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Скорость построения графиков уровней: время подготовки фигуры (make_plot) и сохранения
+изображения в целом и в расчете на один график частоты.
+
+Запуск из корня репозитория:
+    python -m radar_chart.benchmarks.bench_levels_plot [папки с измерениями ...] [--dpi N]
+"""
+import argparse
+import io
+import pathlib
+import time
+
+from ..radarplot.plotter import RadarLevelsPlotter
+from ..radarplot.radar_data import RadarDataLevelsManyMeas
+
+
+DEFAULT_DIRS = sorted(pathlib.Path(__file__).resolve().parent.parent.joinpath('tests', 'data', 'DataSet 3').iterdir())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Скорость построения графиков уровней')
+    parser.add_argument('dirs', nargs='*', type=pathlib.Path, default=DEFAULT_DIRS,
+                        help='папки с измерениями (по умолчанию - тестовые данные DataSet 3)')
+    parser.add_argument('--dpi', type=int, default=400, help='разрешение сохраняемого изображения')
+    parser.add_argument('--col-count', type=int, default=5, help='количество колонок графиков')
+    args = parser.parse_args()
+
+    total_panels, total_time = 0, 0.0
+    for dir_path in args.dirs:
+        radar_data = RadarDataLevelsManyMeas(str(dir_path))
+
+        start = time.perf_counter()
+        plotter = RadarLevelsPlotter([radar_data], col_count=args.col_count)
+        plot_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plotter.save(io.BytesIO(), dpi=args.dpi, format='png')
+        save_time = time.perf_counter() - start
+
+        panels = len(plotter.frequency_list)
+        total_panels += panels
+        total_time += plot_time + save_time
+        print(f'{dir_path.name[:60]:<60} графиков: {panels:4d}, make_plot {plot_time:6.2f} с, '
+              f'save {save_time:6.2f} с, на график {(plot_time + save_time) / panels * 1000:6.1f} мс')
+
+    print(f'Всего: {total_panels} графиков за {total_time:.1f} с, '
+          f'{total_time / total_panels * 1000:.1f} мс на график')
+
+
+if __name__ == '__main__':
+    main()
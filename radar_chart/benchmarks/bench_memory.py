@@ -0,0 +1,59 @@
+"""
+Сравнение объема памяти, занимаемого данными уровней многих измерений: прежняя длинная таблица
+pandas со строковыми столбцами (и широкие таблицы сигналов и шумов) против компактного куба float32.
+
+Запуск из корня репозитория:
+    python -m radar_chart.benchmarks.bench_memory [папки с измерениями ...]
+"""
+import argparse
+import pathlib
+import sys
+
+from ..radarplot.radar_data import RadarDataLevelsManyMeas
+
+
+DEFAULT_DIRS = sorted(pathlib.Path(__file__).resolve().parent.parent.joinpath('tests', 'data', 'DataSet 3').iterdir())
+
+
+def long_table_size(radar_data: RadarDataLevelsManyMeas) -> int:
+    """Объем прежнего представления: длинная таблица со строковыми столбцами и широкие таблицы сигналов и шумов"""
+    raw_data = radar_data.raw_data
+    for column in ['meas_name', 'interface', 'polarisation']:
+        raw_data[column] = raw_data[column].astype(str).astype(object)
+
+    grouped = raw_data.groupby(['meas_name', 'angle', 'freq'], as_index=False)[['signal', 'noise', 'R2']].max()
+    signal_data = grouped.groupby(['angle', 'freq'])['signal'].mean().unstack(level='angle')
+    noise_data = grouped.groupby(['angle', 'freq'])['noise'].mean().unstack(level='angle')
+
+    return sum(int(frame.memory_usage(deep=True).sum())
+               for frame in [raw_data, grouped, signal_data, noise_data, radar_data.output_data])
+
+
+def cube_size(radar_data: RadarDataLevelsManyMeas) -> int:
+    """Объем компактного представления: кубы, оси и метаданные файлов"""
+    cube = radar_data.cube
+    records = sum(sys.getsizeof(record) for record in cube.records)
+    return cube.nbytes + records + int(radar_data.output_data.memory_usage(deep=True).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Объем памяти данных уровней многих измерений')
+    parser.add_argument('dirs', nargs='*', type=pathlib.Path, default=DEFAULT_DIRS,
+                        help='папки с измерениями (по умолчанию - тестовые данные DataSet 3)')
+    args = parser.parse_args()
+
+    total_long, total_cube = 0, 0
+    for dir_path in args.dirs:
+        radar_data = RadarDataLevelsManyMeas(str(dir_path))
+        long_size, compact_size = long_table_size(radar_data), cube_size(radar_data)
+        total_long += long_size
+        total_cube += compact_size
+        print(f'{dir_path.name[:60]:<60} куб {radar_data.cube.shape}: '
+              f'{long_size / 1024:9.1f} КиБ -> {compact_size / 1024:9.1f} КиБ')
+
+    print(f'Всего: {total_long / 1024:.1f} КиБ -> {total_cube / 1024:.1f} КиБ '
+          f'({total_long / total_cube:.1f}x меньше)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Сравнение скорости чтения файлов измерений Навигатора: специализированный разборщик
+(radarplot.navigator) против прежнего pandas.read_csv.
+
+Запуск из корня репозитория:
+    python -m radar_chart.benchmarks.bench_navigator [папка с данными] [--repeat N]
+"""
+import argparse
+import pathlib
+import time
+
+from ..radarplot.navigator import NavigatorFormatError
+from ..radarplot.radar_data.ingest import read_levels_file, read_levels_file_pandas
+
+
+DEFAULT_DATA_DIR = pathlib.Path(__file__).resolve().parent.parent.joinpath('tests', 'data')
+
+
+def collect_files(data_dir: pathlib.Path) -> list:
+    """Все файлы измерений Навигатора в папке (файлы другого формата пропускаются)"""
+    files = []
+    for file in sorted(data_dir.rglob('*.txt')):
+        try:
+            read_levels_file(file)
+        except NavigatorFormatError:
+            continue
+        files.append(file)
+    return files
+
+
+def time_reader(reader, files: list, repeat: int) -> float:
+    """Лучшее из repeat время чтения всех файлов, с"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for file in files:
+            reader(file)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Скорость чтения файлов измерений Навигатора')
+    parser.add_argument('data_dir', nargs='?', default=DEFAULT_DATA_DIR, type=pathlib.Path,
+                        help='папка с файлами измерений (по умолчанию - тестовые данные)')
+    parser.add_argument('--repeat', type=int, default=5, help='количество повторов замера')
+    args = parser.parse_args()
+
+    files = collect_files(args.data_dir)
+    if not files:
+        parser.error(f'в папке {args.data_dir} нет файлов измерений')
+
+    results = {
+        'pandas.read_csv': time_reader(read_levels_file_pandas, files, args.repeat),
+        'navigator': time_reader(read_levels_file, files, args.repeat),
+    }
+
+    print(f'Файлов: {len(files)}')
+    for name, seconds in results.items():
+        print(f'{name:>16}: {seconds * 1000:8.1f} мс всего, {seconds / len(files) * 1e6:8.1f} мкс на файл')
+    print(f'Ускорение: {results["pandas.read_csv"] / results["navigator"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
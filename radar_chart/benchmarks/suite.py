@@ -0,0 +1,277 @@
+"""
+Набор замеров скорости и памяти для загрузчиков данных (RadarData*), построения графиков (make_plot)
+и сохранения изображений (save) на синтетических данных заданного размера. Результаты сохраняются в JSON,
+команда compare сравнивает их с сохраненными ранее и сообщает об ухудшениях.
+
+Запуск из корня репозитория:
+    python -m radar_chart.benchmarks.suite run --size medium --output baseline.json
+    python -m radar_chart.benchmarks.suite run --size medium --output current.json
+    python -m radar_chart.benchmarks.suite compare baseline.json current.json --threshold 0.2
+"""
+import argparse
+import datetime
+import fnmatch
+import io
+import json
+import pathlib
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List, NamedTuple, Optional
+
+from .synthetic import TreeSize, add_size_arguments, generate_tree, tree_size
+
+
+RESULTS_VERSION = 1
+
+
+class Benchmark(NamedTuple):
+    """
+    Замер: setup готовит аргументы (не входит в замер), run - замеряемое действие
+    """
+    name: str
+    setup: Callable[[], tuple]
+    run: Callable
+
+
+@dataclass
+class Comparison:
+    """Сравнение одного показателя замера с базовым"""
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    regression: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+
+def make_benchmarks(root: pathlib.Path, dpi: int) -> List[Benchmark]:
+    """
+    Замеры над деревом многих измерений root. Отдельные папки (RadarDataR2, RadarDataLevels) -
+    первая папка поляризации первого измерения
+
+    :param root: папка многих измерений
+    :param dpi: разрешение сохраняемых изображений
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    from ..radarplot.plotter import R2FigureTemplate, RadarLevelsPlotter, RadarR2Plotter
+    from ..radarplot.radar_data import RadarDataLevels, RadarDataLevelsManyMeas, RadarDataR2, RadarDataR2ManyMeas
+
+    folder = sorted(sorted(root.iterdir())[0].iterdir())[0]
+    loaded = {}
+
+    def data(cls, path):
+        """Данные для замеров построения графиков загружаются один раз"""
+        if cls not in loaded:
+            loaded[cls] = cls(str(path)).load()
+        return loaded[cls]
+
+    def load(cls):
+        """Загрузка данных: объекты RadarData* читают файлы не при создании, а в load()"""
+        return lambda path: cls(path).load()
+
+    benchmarks = [
+        Benchmark('load.RadarDataR2', lambda: (str(folder),), load(RadarDataR2)),
+        Benchmark('load.RadarDataLevels', lambda: (str(folder),), load(RadarDataLevels)),
+        Benchmark('load.RadarDataR2ManyMeas', lambda: (str(root),), load(RadarDataR2ManyMeas)),
+        Benchmark('load.RadarDataLevelsManyMeas', lambda: (str(root),), load(RadarDataLevelsManyMeas)),
+    ]
+    for plotter_class, data_class, path in [(RadarR2Plotter, RadarDataR2ManyMeas, root),
+                                            (RadarR2Plotter, RadarDataR2, folder),
+                                            (RadarLevelsPlotter, RadarDataLevelsManyMeas, root),
+                                            (RadarLevelsPlotter, RadarDataLevels, folder)]:
+        suffix = f'{plotter_class.__name__}[{data_class.__name__}]'
+        benchmarks.append(Benchmark(f'plot.{suffix}',
+                                    lambda data_class=data_class, path=path: ([data(data_class, path)],),
+                                    plotter_class))
+        benchmarks.append(Benchmark(f'save.{suffix}',
+                                    lambda plotter_class=plotter_class, data_class=data_class, path=path:
+                                    (plotter_class([data(data_class, path)]),),
+                                    lambda plotter: plotter.save(io.BytesIO(), dpi=dpi, format='png')))
+
+    # Построение графика R2 на готовом шаблоне (как в пакетной обработке) - сравнивается с plot + save
+    template = {}
+    benchmarks.append(Benchmark('render.R2FigureTemplate[RadarDataR2ManyMeas]',
+                                lambda: ([data(RadarDataR2ManyMeas, root)],),
+                                lambda data_list: template.setdefault('r2', R2FigureTemplate(13)).render(
+                                    data_list, io.BytesIO(), dpi=dpi, format='png')))
+    return benchmarks
+
+
+def measure(benchmark: Benchmark, repeat: int) -> dict:
+    """
+    Выполнить замер: время repeat запусков и пиковый объем памяти Python и NumPy (tracemalloc)
+    в отдельном запуске, чтобы трассировка не искажала время
+
+    :return: словарь best_s, median_s, times_s, peak_mib
+    """
+    times = []
+    for _ in range(repeat):
+        args = benchmark.setup()
+        start = time.perf_counter()
+        benchmark.run(*args)
+        times.append(time.perf_counter() - start)
+
+    args = benchmark.setup()
+    tracemalloc.start()
+    try:
+        benchmark.run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {'best_s': min(times), 'median_s': statistics.median(times), 'times_s': times,
+            'peak_mib': peak / 2 ** 20}
+
+
+def environment() -> dict:
+    """Сведения о среде, в которой выполнены замеры"""
+    import matplotlib
+    import numpy
+    import pandas
+    return {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def run_suite(root: pathlib.Path, size: Optional[TreeSize], repeat: int = 5, dpi: int = 100,
+              patterns: Optional[List[str]] = None, stream=sys.stdout) -> dict:
+    """
+    Выполнить замеры
+
+    :param root: папка многих измерений
+    :param size: размер синтетического дерева (None - данные не синтетические)
+    :param repeat: количество повторов каждого замера
+    :param dpi: разрешение сохраняемых изображений
+    :param patterns: шаблоны имен замеров (fnmatch), None - все замеры
+    :param stream: куда выводить ход замеров
+    :return: результаты для сохранения в JSON
+    """
+    results = {}
+    for benchmark in make_benchmarks(root, dpi):
+        if patterns and not any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in patterns):
+            continue
+        result = measure(benchmark, repeat)
+        results[benchmark.name] = result
+        print(f'{benchmark.name:<55} {result["best_s"] * 1000:9.1f} мс (медиана {result["median_s"] * 1000:9.1f}), '
+              f'память {result["peak_mib"]:7.1f} МиБ', file=stream)
+
+    return {
+        'version': RESULTS_VERSION,
+        'environment': environment(),
+        'data': {'root': str(root), 'size': size.to_dict() if size is not None else None},
+        'repeat': repeat,
+        'dpi': dpi,
+        'benchmarks': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2,
+            memory_threshold: Optional[float] = None) -> List[Comparison]:
+    """
+    Сравнить результаты с базовыми. Ухудшение - лучшее время или пиковая память больше базовых
+    более чем на долю threshold (memory_threshold для памяти)
+
+    :param baseline: базовые результаты
+    :param current: текущие результаты
+    :param threshold: допустимое относительное увеличение времени
+    :param memory_threshold: допустимое относительное увеличение памяти (None - как для времени)
+    :return: сравнения для замеров, которые есть в обоих результатах
+    """
+    if memory_threshold is None:
+        memory_threshold = threshold
+
+    comparisons = []
+    for name, result in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            continue
+        for metric, limit in [('best_s', threshold), ('peak_mib', memory_threshold)]:
+            comparisons.append(Comparison(name, metric, base[metric], result[metric],
+                                          regression=result[metric] > base[metric] * (1 + limit)))
+    return comparisons
+
+
+def print_comparison(baseline: dict, current: dict, comparisons: List[Comparison], stream=sys.stdout) -> None:
+    """Вывести таблицу сравнения"""
+    if baseline.get('data', {}).get('size') != current.get('data', {}).get('size'):
+        print('Внимание: размеры данных базовых и текущих замеров различаются', file=stream)
+    for comparison in comparisons:
+        unit, scale = ('мс', 1000) if comparison.metric == 'best_s' else ('МиБ', 1)
+        mark = 'УХУДШЕНИЕ' if comparison.regression else ''
+        print(f'{comparison.name:<55} {comparison.metric:<8} {comparison.baseline * scale:9.1f} -> '
+              f'{comparison.current * scale:9.1f} {unit:<3} ({comparison.ratio:5.2f}x) {mark}', file=stream)
+
+
+def load_results(path: pathlib.Path) -> dict:
+    results = json.loads(path.read_text(encoding='utf-8'))
+    if results.get('version') != RESULTS_VERSION:
+        raise ValueError(f'{path}: неподдерживаемая версия результатов {results.get("version")!r}')
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m radar_chart.benchmarks.suite',
+                                     description='Замеры скорости и памяти загрузки данных и построения графиков')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='выполнить замеры')
+    add_size_arguments(run_parser)
+    run_parser.add_argument('--data-dir', type=pathlib.Path, default=None,
+                            help='готовая папка многих измерений (по умолчанию - синтетические данные во временной папке)')
+    run_parser.add_argument('--repeat', type=int, default=5, help='количество повторов каждого замера')
+    run_parser.add_argument('--dpi', type=int, default=100, help='разрешение сохраняемых изображений')
+    run_parser.add_argument('--only', nargs='+', default=None, metavar='PATTERN',
+                            help='шаблоны имен замеров, например "load.*"')
+    run_parser.add_argument('--output', type=pathlib.Path, default=None, help='файл результатов JSON')
+
+    compare_parser = commands.add_parser('compare', help='сравнить результаты с базовыми')
+    compare_parser.add_argument('baseline', type=pathlib.Path, help='базовые результаты JSON')
+    compare_parser.add_argument('current', type=pathlib.Path, help='текущие результаты JSON')
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help='допустимое относительное увеличение времени (0.2 - на 20%%)')
+    compare_parser.add_argument('--memory-threshold', type=float, default=None,
+                                help='допустимое относительное увеличение памяти (по умолчанию - как для времени)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        baseline, current = load_results(args.baseline), load_results(args.current)
+        comparisons = compare(baseline, current, args.threshold, args.memory_threshold)
+        print_comparison(baseline, current, comparisons)
+        return 1 if any(comparison.regression for comparison in comparisons) else 0
+
+    if args.data_dir is not None:
+        results = run_suite(args.data_dir, None, args.repeat, args.dpi, args.only)
+    else:
+        size = tree_size(args)
+        temp_dir = pathlib.Path(tempfile.mkdtemp())
+        try:
+            root = temp_dir.joinpath('synthetic')
+            generate_tree(root, size)
+            results = run_suite(root, size, args.repeat, args.dpi, args.only)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=1), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Генератор синтетических данных в формате Навигатора для замеров скорости: дерево папок многих измерений
+<корень>/Измерение N/<интерфейс поляризация>/<файлы> заданного размера
+(измерения × поляризации × углы × частоты).
+
+Запуск из корня репозитория:
+    python -m radar_chart.benchmarks.synthetic /tmp/synthetic --meas 5 --angles 36 --frequencies 200
+"""
+import argparse
+import pathlib
+from dataclasses import asdict, dataclass
+from typing import List
+
+import numpy as np
+
+from ..radarplot.navigator import ENCODING
+
+
+HEADER = 'N\tЧаст.МГц\tEсш.дБмкВ\tEш.дБмкВ\tПП.кГц\tПогр.пр.дБ\tПогр.ант.дБ'
+
+
+@dataclass
+class TreeSize:
+    """Размер синтетического дерева измерений"""
+    meas: int = 3
+    polarisations: int = 2
+    angles: int = 8
+    frequencies: int = 20
+    interface: str = 'DVI'
+    seed: int = 0
+
+    @property
+    def file_count(self) -> int:
+        return self.meas * self.polarisations * self.angles
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+# Готовые размеры для набора замеров
+SIZES = {
+    'small': TreeSize(meas=3, polarisations=2, angles=8, frequencies=20),
+    'medium': TreeSize(meas=5, polarisations=2, angles=36, frequencies=100),
+    'large': TreeSize(meas=10, polarisations=2, angles=72, frequencies=400),
+}
+
+POLARISATIONS = ['ВП', 'ГП', 'П3', 'П4']
+
+
+def write_navigator_file(path: pathlib.Path, freq: np.ndarray, signal: np.ndarray, noise: np.ndarray) -> None:
+    """Записать файл измерений в формате Навигатора"""
+    lines = ['', HEADER]
+    lines.extend(f'{i + 1}\t{f:.6f}\t{s:.2f}\t{n:.2f}\t100.000\t0.10\t0.20'
+                 for i, (f, s, n) in enumerate(zip(freq, signal, noise)))
+    path.write_text('\n'.join(lines) + '\n', encoding=ENCODING)
+
+
+def generate_tree(root: pathlib.Path, size: TreeSize) -> List[pathlib.Path]:
+    """
+    Создать дерево многих измерений. Частоты разных измерений немного различаются (в пределах округления
+    частот при совмещении), уровни сигнала зависят от угла, зона R2 в имени файла - от наибольшего уровня
+
+    :param root: папка многих измерений (создается)
+    :param size: размер дерева
+    :return: пути к созданным файлам
+    """
+    if size.polarisations > len(POLARISATIONS):
+        raise ValueError(f'Поляризаций может быть не больше {len(POLARISATIONS)}')
+
+    rng = np.random.default_rng(size.seed)
+    base_freq = 30.0 + 10.0 * np.arange(size.frequencies)
+    angles = np.arange(size.angles) * (360 // max(size.angles, 1))
+    files = []
+    for i_meas in range(size.meas):
+        # Сетка частот одного измерения одинакова для всех файлов, у разных измерений - немного различается
+        freq = base_freq + rng.uniform(-0.2, 0.2, size.frequencies)
+        for polarisation in POLARISATIONS[:size.polarisations]:
+            folder = root.joinpath(f'Измерение {i_meas + 1}', f'{size.interface} {polarisation}')
+            folder.mkdir(parents=True, exist_ok=True)
+            for angle in angles:
+                gain = 6 * np.cos(np.deg2rad(angle))
+                signal = np.round(rng.normal(30, 8, size.frequencies) + gain, 2)
+                noise = np.round(rng.normal(10, 3, size.frequencies), 2)
+                r2 = int(np.clip(np.max(signal) // 4, 1, 30))
+
+                path = folder.joinpath(f'E 0000001 SYN {size.interface} ({angle}) {r2}m {polarisation}.txt')
+                write_navigator_file(path, freq, signal, noise)
+                files.append(path)
+    return files
+
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    """Добавить аргументы размера дерева: готовый размер и замена отдельных значений"""
+    parser.add_argument('--size', choices=list(SIZES), default='small', help='готовый размер')
+    parser.add_argument('--meas', type=int, help='количество измерений')
+    parser.add_argument('--polarisations', type=int, help='количество поляризаций')
+    parser.add_argument('--angles', type=int, help='количество углов')
+    parser.add_argument('--frequencies', type=int, help='количество частот в файле')
+    parser.add_argument('--seed', type=int, help='начальное значение генератора случайных чисел')
+
+
+def tree_size(args: argparse.Namespace) -> TreeSize:
+    """Размер дерева из аргументов командной строки: готовый размер с заменой заданных значений"""
+    size = TreeSize(**SIZES[args.size].to_dict())
+    for name in ['meas', 'polarisations', 'angles', 'frequencies', 'seed']:
+        if getattr(args, name, None) is not None:
+            setattr(size, name, getattr(args, name))
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Синтетические данные в формате Навигатора')
+    parser.add_argument('root', type=pathlib.Path, help='папка многих измерений (создается)')
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    size = tree_size(args)
+    files = generate_tree(args.root, size)
+    print(f'{args.root}: файлов {len(files)}')
+
+
+if __name__ == '__main__':
+    main()
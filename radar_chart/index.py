@@ -0,0 +1,391 @@
+"""
+Индекс измерений по всему корню данных (например, data/ с папками изделий ВМЦ-61ЖК, ЭВМ БК-ТЗ-4К, ...).
+
+Для каждого файла Навигатора в SQLite сохраняются изделие, интерфейс, поляризация, угол, зона R2,
+наибольшие уровни сигнала (пики по частотам) и время изменения файла. Повторное построение индекса
+читает только новые и измененные файлы. По индексу можно найти папки измерений и сразу загрузить их данные.
+
+Пример:
+    index = MeasurementIndex('data', 'data/index.sqlite')
+    index.update()
+    r2_list = index.load('r2', interface='DVI', polarisation='ВП', angle=90, min_r2=10)
+
+Запуск из корня репозитория:
+    python -m radar_chart.index data --interface DVI --polarisation ВП --angle 90 --min-r2 10
+"""
+import argparse
+import logging
+import os
+import pathlib
+import sqlite3
+import sys
+from typing import TYPE_CHECKING, Collection, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .radarplot.radar_data.scan import parse_filename, split_polarisation_dir
+from .radarplot.radar_data.ingest import read_levels_file
+
+if TYPE_CHECKING:
+    from .radarplot.radar_data.base import BaseRadarData
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+DEFAULT_DB_NAME = 'index.sqlite'
+
+# Количество пиков (наибольших уровней сигнала), сохраняемых для каждого файла
+PEAK_COUNT = 5
+
+# Уровень файлов в папке многих измерений (см. BaseManyMeasData): <кампания>/<измерение>/<интерфейс поляризация>/<файл>
+CAMPAIGN_FILE_DEPTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,          -- путь к файлу относительно корня данных
+    folder TEXT NOT NULL,           -- папка поляризации с файлами (RadarDataR2, RadarDataLevels)
+    campaign TEXT,                  -- папка многих измерений (RadarData*ManyMeas) или NULL
+    meas_name TEXT,                 -- имя измерения в кампании или NULL
+    device TEXT NOT NULL,           -- изделие: первая папка пути
+    interface TEXT NOT NULL,
+    polarisation TEXT NOT NULL,
+    angle REAL NOT NULL,            -- угол, градусы
+    r2 REAL NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_lookup ON files (interface, polarisation, angle);
+CREATE TABLE IF NOT EXISTS peaks (
+    path TEXT NOT NULL,
+    rank INTEGER NOT NULL,          -- 0 - наибольший уровень сигнала в файле
+    freq REAL NOT NULL,
+    signal REAL NOT NULL,
+    noise REAL,
+    PRIMARY KEY (path, rank)
+);
+"""
+
+
+class IndexedFile(NamedTuple):
+    """Запись индекса об одном файле измерений"""
+    path: str
+    folder: str
+    campaign: Optional[str]
+    meas_name: Optional[str]
+    device: str
+    interface: str
+    polarisation: str
+    angle: float
+    r2: float
+    size: int
+    mtime_ns: int
+
+
+class IndexUpdate(NamedTuple):
+    """Итог обновления индекса: количество файлов"""
+    added: int
+    updated: int
+    removed: int
+    failed: int
+
+
+def find_campaigns(paths: Iterable[str]) -> Set[str]:
+    """
+    Найти папки многих измерений по структуре папок, а не по именам: папка лежит внутри папки изделия,
+    и все файлы в ней находятся на уровне <кампания>/<измерение>/<интерфейс поляризация>/<файл>.
+    Папка с файлами одной поляризации внутри группы (изделие/Оценочные/DVI ВП) кампанией не считается
+
+    :param paths: пути ко всем файлам измерений относительно корня
+    :return: пути папок многих измерений относительно корня
+    """
+    depths = {}
+    for path in paths:
+        parts = pathlib.PurePosixPath(path).parts
+        # Первая папка пути - изделие, кампании - вложенные в нее папки
+        for stop in range(2, len(parts)):
+            depths.setdefault('/'.join(parts[:stop]), set()).add(len(parts) - stop)
+    return {folder for folder, folder_depths in depths.items() if folder_depths == {CAMPAIGN_FILE_DEPTH}}
+
+
+def campaign_of(rel_path: pathlib.PurePath, campaigns: Collection[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Кампания многих измерений и измерение, к которым относится файл
+
+    :param rel_path: путь к файлу относительно корня
+    :param campaigns: папки многих измерений (см. find_campaigns)
+    :return: (кампания, измерение) или (None, None) для файлов отдельных папок
+    """
+    if len(rel_path.parts) > CAMPAIGN_FILE_DEPTH:
+        campaign = rel_path.parents[CAMPAIGN_FILE_DEPTH - 1]
+        if campaign.as_posix() in campaigns:
+            return campaign.as_posix(), rel_path.parent.parent.name
+    return None, None
+
+
+def parse_file_path(rel_path: pathlib.PurePath,
+                    campaigns: Collection[str] = ()) -> Tuple[str, Optional[str], Optional[str], str,
+                                                              str, str, float, float]:
+    """
+    Разобрать путь к файлу относительно корня данных по соглашениям об именах BaseRadarData
+
+    :param rel_path: путь к файлу относительно корня
+    :param campaigns: папки многих измерений (см. find_campaigns)
+    :return: (папка, кампания, измерение, изделие, интерфейс, поляризация, угол в градусах, R2)
+    """
+    folder = rel_path.parent
+    interface, polarisation = split_polarisation_dir(folder.name)
+    angle, r2 = parse_filename(rel_path.name)
+    angle = float(np.round(np.rad2deg(angle), 6))
+    campaign, meas_name = campaign_of(rel_path, campaigns)
+
+    device = rel_path.parts[0] if len(rel_path.parts) > 2 else ''
+    return folder.as_posix(), campaign, meas_name, device, interface, polarisation, angle, r2
+
+
+def find_peaks(path: pathlib.Path, count: int = PEAK_COUNT) -> List[Tuple[float, float, float]]:
+    """
+    Наибольшие уровни сигнала в файле измерений
+
+    :param path: путь к файлу
+    :param count: количество пиков
+    :return: список (частота, сигнал, шум) в порядке убывания сигнала
+    """
+    file_data = read_levels_file(path)
+    signal = np.asarray(file_data.signal, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(signal))
+    order = valid[np.argsort(-signal[valid], kind='stable')[:count]]
+    return [(float(file_data.freq[i]), float(signal[i]), float(file_data.noise[i])) for i in order]
+
+
+class MeasurementIndex:
+    """Постоянный индекс файлов измерений в SQLite с запросами по интерфейсу, поляризации, углу, R2 и пикам"""
+
+    def __init__(self, root: Union[str, pathlib.Path], db_path: Union[str, pathlib.Path, None] = None):
+        """
+        :param root: корень данных; первые вложенные папки - изделия
+        :param db_path: файл индекса (по умолчанию - root/index.sqlite)
+        """
+        self.root: pathlib.Path = pathlib.Path(root)
+        if db_path is None:
+            db_path = self.root.joinpath(DEFAULT_DB_NAME)
+        self.db_path: pathlib.Path = pathlib.Path(db_path)
+        self.connection: sqlite3.Connection = sqlite3.connect(str(self.db_path))
+
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Индекс другой версии строится заново
+            with self.connection:
+                self.connection.execute('DROP TABLE IF EXISTS files')
+                self.connection.execute('DROP TABLE IF EXISTS peaks')
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'MeasurementIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Найти все файлы измерений в корне данных
+
+        :return: словарь путь относительно корня -> (размер, время изменения в нс)
+        """
+        files = {}
+        for dir_path, dir_names, file_names in os.walk(self.root):
+            dir_names.sort()
+            for file_name in file_names:
+                if not file_name.endswith('.txt'):
+                    continue
+                path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[pathlib.Path(path).relative_to(self.root).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def update(self) -> IndexUpdate:
+        """
+        Обновить индекс: прочитать новые и измененные (по размеру и времени изменения) файлы,
+        удалить записи исчезнувших файлов. Файлы, имена которых не соответствуют соглашениям, пропускаются.
+        Кампании многих измерений определяются заново по всем файлам: у прочитанных ранее файлов, которые
+        вошли в кампанию (или перестали в нее входить) из-за других файлов, обновляются кампания и измерение
+
+        :return: количество добавленных, обновленных, удаленных и пропущенных файлов
+        """
+        known, known_campaigns = {}, {}
+        for path, size, mtime_ns, campaign, meas_name in self.connection.execute(
+                'SELECT path, size, mtime_ns, campaign, meas_name FROM files'):
+            known[path] = (size, mtime_ns)
+            known_campaigns[path] = (campaign, meas_name)
+        current = self.scan()
+        campaigns = find_campaigns(current)
+
+        removed = [path for path in known if path not in current]
+        changed = [path for path, state in current.items() if known.get(path) != state]
+        regrouped = [(path, campaign_of(pathlib.PurePosixPath(path), campaigns)) for path in current
+                     if path in known and known[path] == current[path]]
+        regrouped = [(path, campaign) for path, campaign in regrouped if known_campaigns[path] != campaign]
+        added = failed = 0
+        updated = len(regrouped)
+
+        with self.connection:
+            self._delete(removed)
+            self.connection.executemany('UPDATE files SET campaign = ?, meas_name = ? WHERE path = ?',
+                                        [campaign + (path,) for path, campaign in regrouped])
+            for path in changed:
+                try:
+                    entry = parse_file_path(pathlib.PurePosixPath(path), campaigns)
+                    peaks = find_peaks(self.root.joinpath(path))
+                except (IndexError, ValueError, OSError) as error:
+                    logger.warning('%s: файл не добавлен в индекс (%s)', path, error)
+                    self._delete([path])
+                    failed += 1
+                    continue
+
+                self._delete([path])
+                self.connection.execute('INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                        (path,) + entry + current[path])
+                self.connection.executemany('INSERT INTO peaks VALUES (?, ?, ?, ?, ?)',
+                                            [(path, rank) + peak for rank, peak in enumerate(peaks)])
+                if path in known:
+                    updated += 1
+                else:
+                    added += 1
+
+        result = IndexUpdate(added, updated, len(removed), failed)
+        logger.info('%s: индекс обновлен, добавлено %d, обновлено %d, удалено %d, пропущено %d',
+                    self.root, *result)
+        return result
+
+    def query(self, device: str = None, interface: str = None, polarisation: str = None, angle: float = None,
+              min_r2: float = None, max_r2: float = None, freq_range: Tuple[float, float] = None,
+              min_signal: float = None, campaign: str = None) -> List[IndexedFile]:
+        """
+        Найти файлы измерений. Не заданные (None) условия не проверяются
+
+        :param device: изделие
+        :param interface: интерфейс
+        :param polarisation: поляризация
+        :param angle: угол, градусы
+        :param min_r2: зона R2 не меньше
+        :param max_r2: зона R2 не больше
+        :param freq_range: (от, до) - среди пиков файла есть частота в этом интервале
+        :param min_signal: среди пиков файла (в интервале freq_range, если он задан) есть уровень сигнала не меньше
+        :param campaign: папка многих измерений относительно корня
+        :return: записи найденных файлов, упорядоченные по пути
+        """
+        conditions, params = [], []
+        for column, value in [('device', device), ('interface', interface), ('polarisation', polarisation),
+                              ('campaign', campaign)]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if angle is not None:
+            conditions.append('abs(angle - ?) < 1e-6')
+            params.append(angle)
+        if min_r2 is not None:
+            conditions.append('r2 >= ?')
+            params.append(min_r2)
+        if max_r2 is not None:
+            conditions.append('r2 <= ?')
+            params.append(max_r2)
+
+        if freq_range is not None or min_signal is not None:
+            peak_conditions, peak_params = [], []
+            if freq_range is not None:
+                peak_conditions.append('peaks.freq BETWEEN ? AND ?')
+                peak_params.extend(freq_range)
+            if min_signal is not None:
+                peak_conditions.append('peaks.signal >= ?')
+                peak_params.append(min_signal)
+            conditions.append('EXISTS (SELECT 1 FROM peaks WHERE peaks.path = files.path AND '
+                              + ' AND '.join(peak_conditions) + ')')
+            params.extend(peak_params)
+
+        sql = 'SELECT * FROM files'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        return [IndexedFile(*row) for row in self.connection.execute(sql + ' ORDER BY path', params)]
+
+    def peaks(self, path: str) -> List[Tuple[float, float, float]]:
+        """Пики файла (частота, сигнал, шум) в порядке убывания сигнала"""
+        return list(self.connection.execute('SELECT freq, signal, noise FROM peaks WHERE path = ? ORDER BY rank',
+                                            (path,)))
+
+    def folders(self, **conditions) -> List[Tuple[pathlib.Path, bool]]:
+        """
+        Папки, в которых есть файлы, удовлетворяющие условиям query
+
+        :return: список (путь к папке, многие ли это измерения): для файлов кампаний многих измерений -
+        папка кампании, для остальных - папка с файлами
+        """
+        folders = {}
+        for entry in self.query(**conditions):
+            if entry.campaign is not None:
+                folders.setdefault(entry.campaign, True)
+            else:
+                folders.setdefault(entry.folder, False)
+        return [(self.root.joinpath(folder), many_meas) for folder, many_meas in sorted(folders.items())]
+
+    def load(self, kind: str = 'r2', **conditions) -> List['BaseRadarData']:
+        """
+        Загрузить данные папок, в которых есть файлы, удовлетворяющие условиям query.
+        Папки загружаются целиком, как в скриптах r2.py, levels.py и many_meas_controller.py
+
+        :param kind: 'r2' - данные зон R2, 'levels' - данные уровней
+        :param conditions: условия query
+        :return: RadarDataR2ManyMeas/RadarDataLevelsManyMeas для кампаний многих измерений,
+        RadarDataR2/RadarDataLevels для отдельных папок
+        """
+        from .radarplot.radar_data import RadarDataLevels, RadarDataLevelsManyMeas, RadarDataR2, RadarDataR2ManyMeas
+
+        classes = {'r2': (RadarDataR2, RadarDataR2ManyMeas), 'levels': (RadarDataLevels, RadarDataLevelsManyMeas)}
+        if kind not in classes:
+            raise ValueError(f'Неизвестный вид данных: {kind!r}, допустимы: {", ".join(classes)}')
+        single_class, many_class = classes[kind]
+        return [(many_class if many_meas else single_class)(str(folder))
+                for folder, many_meas in self.folders(**conditions)]
+
+    def _delete(self, paths: List[str]) -> None:
+        self.connection.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in paths])
+        self.connection.executemany('DELETE FROM peaks WHERE path = ?', [(path,) for path in paths])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m radar_chart.index',
+                                     description='Индекс измерений по корню данных и поиск папок измерений')
+    parser.add_argument('root', type=pathlib.Path, help='корень данных (папки изделий)')
+    parser.add_argument('--db', type=pathlib.Path, default=None, help='файл индекса (по умолчанию - root/index.sqlite)')
+    parser.add_argument('--no-update', action='store_true', help='не обновлять индекс перед поиском')
+    parser.add_argument('--device', help='изделие')
+    parser.add_argument('--interface', help='интерфейс')
+    parser.add_argument('--polarisation', help='поляризация')
+    parser.add_argument('--angle', type=float, help='угол, градусы')
+    parser.add_argument('--min-r2', type=float, help='зона R2 не меньше')
+    parser.add_argument('--max-r2', type=float, help='зона R2 не больше')
+    parser.add_argument('--freq-range', type=float, nargs=2, metavar=('FROM', 'TO'), help='частота пика в интервале')
+    parser.add_argument('--min-signal', type=float, help='уровень сигнала пика не меньше')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    with MeasurementIndex(args.root, args.db) as index:
+        if not args.no_update:
+            index.update()
+        conditions = dict(device=args.device, interface=args.interface, polarisation=args.polarisation,
+                          angle=args.angle, min_r2=args.min_r2, max_r2=args.max_r2,
+                          freq_range=tuple(args.freq_range) if args.freq_range else None, min_signal=args.min_signal)
+        for folder, many_meas in index.folders(**conditions):
+            print(f'{"многие измерения" if many_meas else "папка":<16} {folder}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,8 @@
-import matplotlib
+import argparse
 
 from radarplot.radar_data import RadarDataLevels
 from radarplot.plotter import RadarLevelsPlotter
+from radarplot.plotter.profiles import DEFAULT_PROFILE, PROFILES, get_profile
 
 
 DIR_LIST = [
@@ -16,15 +17,17 @@ DIR_LIST = [
 
 
 if __name__ == '__main__':
-    matplotlib.get_backend()
-    matplotlib.use('QtAgg')
+    parser = argparse.ArgumentParser(description='Графики уровней')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help='профиль вывода: draft - быстрый просмотр, final - для отчета, vector - PDF')
+    profile = get_profile(parser.parse_args().profile)
 
     data_list = list(map(RadarDataLevels, DIR_LIST))
 
 
-    plotter = RadarLevelsPlotter(data_list, max_y_tick=50, col_count=5)
+    plotter = RadarLevelsPlotter(data_list, max_y_tick=50, col_count=5, profile=profile)
     # plotter.show()
     if len(data_list) < 2:
-        plotter.save(DIR_LIST[-1] + ' [Уровни].png')
+        plotter.save(DIR_LIST[-1] + ' [Уровни]' + profile.suffix)
     else:
-        plotter.save(DIR_LIST[-1] + ' [Сравнение уровней].png')
+        plotter.save(DIR_LIST[-1] + ' [Сравнение уровней]' + profile.suffix)
@@ -1,6 +1,4 @@
-import matplotlib
-
-from radar_chart.radarplot.utils import Line
+from radarplot.utils import Line
 from radarplot.radar_data import RadarDataR2ManyMeas, RadarDataLevelsManyMeas
 from radarplot.plotter import RadarR2Plotter, RadarLevelsPlotter
 
@@ -20,9 +18,6 @@ DIR_NAMES = [r'd:\WorkSpace\Python\pythonProject\Statistic\data\ЭВМ БК-ТЗ
 # DIR2_NAME = r'd:\WorkSpace\Python\pythonProject\Statistic\data\ВМЦ-61.2ЖК\Монитор без краски\Ток прошивки\LVDS max'
 
 if __name__ == '__main__':
-    matplotlib.get_backend()
-    matplotlib.use('QtAgg')
-
     for dir_name in DIR_NAMES:
         data1 = RadarDataR2ManyMeas(dir_name)
         data_list = [data1]
@@ -1,7 +1,8 @@
-import matplotlib
+import argparse
 
 from radarplot.radar_data import RadarDataR2
 from radarplot.plotter import RadarR2Plotter
+from radarplot.plotter.profiles import DEFAULT_PROFILE, PROFILES, get_profile
 
 
 DIR_NAME = r'd:\WorkSpace\Python\pythonProject\Statistic\data\ВМЦ-61ЖК\Оценочные (периодика со склада)\VGA ВП'
@@ -11,19 +12,21 @@ DIR2_NAME = None
 DIR2_NAME = r'd:\WorkSpace\Python\pythonProject\Statistic\data\ВМЦ-61ЖК\Оценочные (периодика со склада)\VGA ГП'
 
 if __name__ == '__main__':
-    matplotlib.get_backend()
-    matplotlib.use('QtAgg')
+    parser = argparse.ArgumentParser(description='График зон R2')
+    parser.add_argument('--profile', choices=list(PROFILES), default=DEFAULT_PROFILE,
+                        help='профиль вывода: draft - быстрый просмотр, final - для отчета, vector - PDF')
+    profile = get_profile(parser.parse_args().profile)
 
     data1 = RadarDataR2(DIR_NAME)
     if DIR2_NAME is None:
         data_list = [data1]
-        output_file_name = DIR_NAME + ' [График R2].png'
+        output_file_name = DIR_NAME + ' [График R2]' + profile.suffix
     else:
         data2 = RadarDataR2(DIR2_NAME)
         data_list = [data1, data2]
-        output_file_name = DIR2_NAME + ' [Сравнение R2].png'
-        output_file_name = DIR2_NAME + ' [ВП + ГП].png'
+        output_file_name = DIR2_NAME + ' [Сравнение R2]' + profile.suffix
+        output_file_name = DIR2_NAME + ' [ВП + ГП]' + profile.suffix
 
-    plotter = RadarR2Plotter(data_list, max_y_tick=23)
+    plotter = RadarR2Plotter(data_list, max_y_tick=23, profile=profile)
     # plotter.show()
     plotter.save(output_file_name)
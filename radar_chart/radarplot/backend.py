@@ -0,0 +1,27 @@
+"""
+Выбор бэкенда matplotlib для отображения графиков в окне (BaseRadarPlotter.show).
+Построение и сохранение графиков бэкенд не используют: фигуры рисуются на холсте Agg вне pyplot,
+поэтому скриптам, которые только сохраняют графики, выбирать бэкенд не нужно
+"""
+import os
+from typing import Optional
+
+
+# Переменная окружения с именем бэкенда для окон, например QtAgg или TkAgg
+BACKEND_ENV = 'RADARPLOT_BACKEND'
+
+
+def select_backend(name: Optional[str] = None) -> str:
+    """
+    Выбрать бэкенд matplotlib: заданный, из переменной окружения RADARPLOT_BACKEND или, если они не заданы,
+    бэкенд matplotlib по умолчанию (MPLBACKEND, matplotlibrc, автоматический выбор)
+
+    :param name: имя бэкенда
+    :return: имя выбранного бэкенда
+    """
+    import matplotlib
+
+    name = name or os.environ.get(BACKEND_ENV)
+    if name:
+        matplotlib.use(name)
+    return matplotlib.get_backend()
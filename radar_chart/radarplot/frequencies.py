@@ -0,0 +1,196 @@
+"""
+Совмещение частот разных файлов по допуску.
+
+Одна и та же составляющая излучения в разных файлах может быть измерена на немного различающихся частотах
+(например, 415.5 и 415.6 МГц). Частоты объединяются в кластеры: отсортированные частоты попадают в один
+кластер, пока промежуток до предыдущей частоты не превышает допуск max(absolute, relative * частота),
+а ширина кластера (от его наименьшей частоты) - тот же допуск. Поэтому частый равномерный ряд частот
+делится на кластеры шириной в допуск, а не сливается в один.
+Каждый кластер хранит крайние частоты. Каноническая частота кластера - середина между ними,
+округленная до decimals знаков (как прежнее округление частот); кластеры с одинаковой
+канонической частотой объединяются, поэтому ширина кластера не больше допуска плюс шаг округления.
+Все операции - сортировка и поиск в отсортированных массивах
+"""
+from dataclasses import dataclass
+
+import numpy as np
+from typing import Iterable, Tuple, Union
+
+
+# Количество знаков канонической частоты по умолчанию (точность частот в файлах Навигатора)
+CENTRE_DECIMALS = 6
+# Запас к ненулевому допуску на погрешность представления десятичных частот (415.6 - 415.5 чуть больше 0.1)
+TOLERANCE_SLACK = 0.5 * 10 ** -CENTRE_DECIMALS
+
+
+@dataclass(frozen=True)
+class FrequencyTolerance:
+    """
+    Допуск совмещения частот: частоты совмещаются, если отличаются не больше чем на max(absolute, relative * f).
+    decimals - количество знаков, до которого округляется каноническая частота кластера
+    """
+    absolute: float = 0.0
+    relative: float = 0.0
+    decimals: int = CENTRE_DECIMALS
+
+    def __post_init__(self):
+        if self.absolute < 0 or not 0 <= self.relative < 1:
+            raise ValueError(f'Недопустимый допуск совмещения частот: {self}')
+
+    def threshold(self, frequencies: np.ndarray) -> np.ndarray:
+        """Допустимый промежуток до частот frequencies от предыдущих частот (и ширина кластера от frequencies)"""
+        threshold = np.maximum(self.absolute, self.relative * np.abs(frequencies))
+        return np.where(threshold > 0, threshold + TOLERANCE_SLACK, 0.0)
+
+    def round(self, frequencies: np.ndarray) -> np.ndarray:
+        """Округлить частоты до точности канонических частот"""
+        return np.round(frequencies, self.decimals)
+
+    def reach(self, frequency: float) -> float:
+        """
+        Наибольшая частота, которая может оказаться в одном кластере с частотой frequency:
+        совмещается с ней по допуску или округляется до той же канонической частоты
+        """
+        same_rounding = float(self.round(frequency)) + 0.5 * 10 ** -self.decimals
+        if self.absolute == 0 and self.relative == 0:
+            return max(frequency, same_rounding)
+        return max(frequency + self.absolute, frequency / (1 - self.relative), same_rounding) + TOLERANCE_SLACK
+
+
+# Совмещаются только совпадающие частоты
+EXACT = FrequencyTolerance()
+# Допуск по умолчанию для уровней многих измерений: половина МГц, канонические частоты - целые МГц,
+# как при прежнем округлении частот до целых
+DEFAULT_TOLERANCE = FrequencyTolerance(absolute=0.5, decimals=0)
+
+
+class FrequencyClusters:
+    """Отсортированные кластеры частот: крайние частоты low, high и канонические частоты centres"""
+
+    __slots__ = ('low', 'high', 'centres', 'tolerance')
+
+    def __init__(self, low: np.ndarray, high: np.ndarray, tolerance: FrequencyTolerance = EXACT):
+        """
+        :param low: наименьшие частоты кластеров (по возрастанию)
+        :param high: наибольшие частоты кластеров
+        :param tolerance: допуск, с которым построены кластеры
+        """
+        self.low: np.ndarray = np.asarray(low, dtype=np.float64)
+        self.high: np.ndarray = np.asarray(high, dtype=np.float64)
+        self.tolerance: FrequencyTolerance = tolerance
+        self.centres: np.ndarray = _centres(self.low, self.high, tolerance)
+
+    @classmethod
+    def from_frequencies(cls, frequencies: Iterable[np.ndarray],
+                         tolerance: FrequencyTolerance = EXACT) -> 'FrequencyClusters':
+        """
+        Построить кластеры частот
+
+        :param frequencies: массивы частот (например, частоты каждого файла)
+        :param tolerance: допуск совмещения
+        """
+        arrays = [np.asarray(values, dtype=np.float64).ravel() for values in frequencies]
+        unique = np.unique(np.concatenate(arrays)) if arrays else np.array([])
+        low, high, _ = _link(unique, unique, tolerance)
+        return cls(low, high, tolerance)
+
+    def __len__(self) -> int:
+        return len(self.low)
+
+    def positions(self, frequencies: np.ndarray) -> np.ndarray:
+        """
+        Номера кластеров для частот
+
+        :param frequencies: частоты, входящие в кластеры
+        :return: номера кластеров
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        positions = np.searchsorted(self.low, frequencies, side='right') - 1
+        if len(self):
+            outside = (positions < 0) | (frequencies > self.high[np.maximum(positions, 0)])
+        else:
+            outside = np.ones(frequencies.shape, dtype=bool)
+        if np.any(outside):
+            raise ValueError(f'Частоты не входят в кластеры: {frequencies[outside][:5].tolist()}')
+        return positions
+
+    def extend(self, frequencies: Iterable[np.ndarray]) -> Tuple['FrequencyClusters', np.ndarray]:
+        """
+        Дополнить кластеры частотами. Прежние кластеры не делятся: новые частоты могут расширить их
+        и объединить соседние. Результат совпадает с кластерами по всем частотам сразу, если новые частоты
+        не меняют деление частого ряда частот на кластеры шириной в допуск
+
+        :param frequencies: массивы новых частот
+        :return: новые кластеры и номера новых кластеров для прежних кластеров
+        """
+        arrays = [np.asarray(values, dtype=np.float64).ravel() for values in frequencies]
+        unique = np.unique(np.concatenate(arrays)) if arrays else np.array([])
+        low, high, labels = _link(np.concatenate([self.low, unique]), np.concatenate([self.high, unique]),
+                                  self.tolerance)
+        return FrequencyClusters(low, high, self.tolerance), labels[:len(self)]
+
+
+def _centres(low: np.ndarray, high: np.ndarray, tolerance: FrequencyTolerance) -> np.ndarray:
+    """Канонические частоты кластеров: округленные середины (частота кластера из одной частоты - она сама)"""
+    return np.where(low == high, low if tolerance == EXACT else tolerance.round(low),
+                    tolerance.round((low + high) / 2))
+
+
+def _link(low: np.ndarray, high: np.ndarray,
+          tolerance: FrequencyTolerance) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Объединить интервалы частот [low, high] в кластеры: интервал присоединяется к кластеру,
+    если промежуток от наибольшей частоты кластера и ширина кластера с этим интервалом не превышают допуск.
+    Затем объединяются соседние кластеры с одинаковой канонической частотой
+
+    :return: крайние частоты кластеров и номер кластера каждого интервала
+    """
+    if not len(low):
+        return np.array([]), np.array([]), np.array([], dtype=np.intp)
+
+    order = np.argsort(low, kind='stable')
+    sorted_low, sorted_high = low[order], high[order]
+    reach = np.maximum.accumulate(sorted_high)
+    breaks = np.r_[False, sorted_low[1:] - reach[:-1] > tolerance.threshold(sorted_low[1:])]
+
+    # Участки без разрывов шире допуска делятся на кластеры шириной в допуск слева направо:
+    # следующий кластер начинается с первого интервала, выходящего за границу текущего.
+    # Допуск не убывает с частотой, поэтому границы можно искать по накопленному максимуму high
+    segment_starts = np.r_[0, np.flatnonzero(breaks), len(low)]
+    limits = sorted_low + tolerance.threshold(sorted_low)
+    for start, stop in zip(segment_starts[:-1], segment_starts[1:]):
+        if reach[stop - 1] <= limits[start]:
+            continue
+        segment_reach = np.maximum.accumulate(sorted_high[start:stop])
+        cluster_start = start
+        while True:
+            next_start = start + int(np.searchsorted(segment_reach, limits[cluster_start], side='right'))
+            next_start = max(next_start, cluster_start + 1)
+            if next_start >= stop:
+                break
+            breaks[next_start] = True
+            cluster_start = next_start
+
+    starts = np.r_[0, np.flatnonzero(breaks)]
+    cluster_low, cluster_high = sorted_low[starts], np.maximum.reduceat(sorted_high, starts)
+
+    # Кластеры с одинаковой канонической частотой (при округлении) объединяются
+    centres = _centres(cluster_low, cluster_high, tolerance)
+    merged = np.r_[True, centres[1:] != centres[:-1]]
+    merged_starts = np.flatnonzero(merged)
+    cluster_ids = np.cumsum(merged) - 1
+
+    labels = np.empty(len(low), dtype=np.intp)
+    labels[order] = cluster_ids[np.cumsum(breaks)]
+    return cluster_low[merged_starts], np.maximum.reduceat(cluster_high, merged_starts), labels
+
+
+def unique_frequencies(frequencies: Iterable[Union[np.ndarray, list]],
+                       tolerance: FrequencyTolerance = EXACT) -> np.ndarray:
+    """
+    Отсортированные канонические частоты кластеров
+
+    :param frequencies: массивы частот
+    :param tolerance: допуск совмещения
+    """
+    return FrequencyClusters.from_frequencies(frequencies, tolerance).centres
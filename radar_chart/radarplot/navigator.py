@@ -0,0 +1,142 @@
+import io
+import itertools
+import pathlib
+import warnings
+
+import numpy as np
+from typing import NamedTuple, Tuple, Union
+
+
+ENCODING = 'cp1251'
+
+# Файл измерений Навигатора: пустая строка, строка заголовка, затем строки данных, разделенные табуляцией:
+# N  Част.МГц  Eсш.дБмкВ  Eш.дБмкВ  ПП.кГц  Погр.пр.дБ  Погр.ант.дБ
+HEADER_LINES = 2
+HEADER_PREFIX = 'N\t'
+FREQ_COLUMN = 1
+SIGNAL_COLUMN = 2
+NOISE_COLUMN = 3
+
+# Количество строк данных в порции при чтении файла по частям (read_navigator_chunk)
+CHUNK_LINES = 4096
+
+
+class NavigatorFormatError(ValueError):
+    """Файл не соответствует формату файла измерений Навигатора"""
+
+    def __init__(self, path: Union[str, pathlib.Path], line_number: int, message: str):
+        """
+        :param path: путь к файлу
+        :param line_number: номер строки файла (с 1), в которой обнаружена ошибка
+        :param message: описание ошибки
+        """
+        self.path = pathlib.Path(path)
+        self.line_number = line_number
+        super().__init__(f'{self.path}:{line_number}: {message}')
+
+
+def read_navigator_file(path: Union[str, pathlib.Path]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Прочитать частоты, уровни сигнала и шума из файла измерений Навигатора. Заголовок проверяется,
+    а из строк данных разбираются только нужные столбцы, сразу в массивы float64
+
+    :param path: путь к файлу
+    :return: массивы частот, уровней сигнала и уровней шума
+    """
+    raw = pathlib.Path(path).read_bytes()
+    body_start = _check_header(path, raw)
+    return _parse_rows(path, raw[body_start:], HEADER_LINES + 1)
+
+
+class NavigatorChunk(NamedTuple):
+    """Порция строк данных файла измерений Навигатора и место, с которого читать следующую порцию"""
+    freq: np.ndarray
+    signal: np.ndarray
+    noise: np.ndarray
+    offset: int
+    line_number: int
+    eof: bool
+
+
+def read_navigator_chunk(path: Union[str, pathlib.Path], offset: int = 0, line_number: int = 1,
+                         max_lines: int = CHUNK_LINES) -> NavigatorChunk:
+    """
+    Прочитать из файла измерений Навигатора не больше max_lines строк данных, начиная со смещения offset.
+    Файл открывается только на время чтения порции, поэтому порции многих файлов можно читать по очереди,
+    не держа файлы открытыми
+
+    :param path: путь к файлу
+    :param offset: смещение начала порции в байтах (0 - начало файла, заголовок проверяется)
+    :param line_number: номер первой строки порции (для сообщений об ошибках)
+    :param max_lines: наибольшее количество строк в порции
+    :return: порция строк; offset и line_number - для чтения следующей порции
+    """
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        if offset == 0:
+            header = b''.join(file.readline() for _ in range(HEADER_LINES))
+            _check_header(path, header)
+            line_number = HEADER_LINES + 1
+        lines = list(itertools.islice(file, max_lines))
+        offset = file.tell()
+
+    freq, signal, noise = _parse_rows(path, b''.join(lines), line_number)
+    return NavigatorChunk(freq, signal, noise, offset, line_number + len(lines), eof=len(lines) < max_lines)
+
+
+def _parse_rows(path: Union[str, pathlib.Path], body: bytes, first_line: int
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Разобрать строки данных
+
+    :param body: строки данных файла
+    :param first_line: номер первой строки в файле (для сообщений об ошибках)
+    :return: массивы частот, уровней сигнала и уровней шума
+    """
+    try:
+        with warnings.catch_warnings():
+            # Файл без строк данных - не ошибка, в нем просто нет сигналов
+            warnings.simplefilter('ignore', UserWarning)
+            values = np.loadtxt(io.BytesIO(body), delimiter='\t', ndmin=2, dtype=np.float64,
+                                usecols=(FREQ_COLUMN, SIGNAL_COLUMN, NOISE_COLUMN), encoding=ENCODING)
+    except ValueError:
+        _raise_malformed_line(path, body, first_line)
+        raise
+
+    return values[:, 0].copy(), values[:, 1].copy(), values[:, 2].copy()
+
+
+def _check_header(path: Union[str, pathlib.Path], raw: bytes) -> int:
+    """
+    Проверить заголовок файла
+
+    :return: смещение начала строк данных
+    """
+    position = 0
+    lines = []
+    for _ in range(HEADER_LINES):
+        end = raw.find(b'\n', position)
+        if end < 0:
+            raise NavigatorFormatError(path, len(lines) + 1, 'файл закончился до окончания заголовка')
+        lines.append(raw[position:end].decode(ENCODING).rstrip('\r'))
+        position = end + 1
+
+    if lines[0].strip():
+        raise NavigatorFormatError(path, 1, f'ожидалась пустая строка, прочитано: {lines[0]!r}')
+    if not lines[1].startswith(HEADER_PREFIX):
+        raise NavigatorFormatError(path, 2, f'ожидался заголовок таблицы "N<Tab>Част.МГц...", прочитано: {lines[1]!r}')
+
+    return position
+
+
+def _raise_malformed_line(path: Union[str, pathlib.Path], body: bytes, first_line: int) -> None:
+    """Найти первую строку данных, которую не удается разобрать, и сообщить о ней с номером строки"""
+    lines = body.decode(ENCODING).splitlines()
+    for line_number, line in enumerate(lines, start=first_line):
+        if not line.strip():
+            continue
+        fields = line.split('\t')
+        try:
+            [float(fields[column]) for column in (FREQ_COLUMN, SIGNAL_COLUMN, NOISE_COLUMN)]
+        except (IndexError, ValueError):
+            raise NavigatorFormatError(path, line_number, f'не удается разобрать строку данных: {line!r}') from None
@@ -1,5 +1,35 @@
-from .levels_plotter import RadarLevelsPlotter
-from .r2_plotter import RadarR2Plotter
+"""
+Построители круговых диаграмм. matplotlib импортируется при первом обращении к классу построителя
+"""
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .levels_plotter import RadarLevelsPlotter
+    from .profiles import OutputProfile, get_profile
+    from .r2_plotter import R2FigureTemplate, RadarR2Plotter
 
-__all__ = ['RadarLevelsPlotter', 'RadarR2Plotter']
+
+# Имя класса (функции) -> модуль пакета, в котором он определен
+_LAZY = {
+    'RadarLevelsPlotter': 'levels_plotter',
+    'RadarR2Plotter': 'r2_plotter',
+    'R2FigureTemplate': 'r2_plotter',
+    'OutputProfile': 'profiles',
+    'get_profile': 'profiles',
+}
+
+__all__ = ['RadarLevelsPlotter', 'RadarR2Plotter', 'R2FigureTemplate', 'OutputProfile', 'get_profile']
+
+
+def __getattr__(name: str):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    # То же, что from .<module_name> import <name>
+    value = getattr(__import__(module_name, globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
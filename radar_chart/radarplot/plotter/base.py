@@ -1,11 +1,15 @@
 import abc
 
 
-import matplotlib.pyplot as plt
 import pandas as pd
 import pathlib
-from typing import List
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from typing import BinaryIO, List, Optional, Tuple, Union
 
+from .. import profiling
+from ..backend import select_backend
+from .profiles import DEFAULT_PROFILE, OutputProfile, get_profile
 from ..utils import make_unique_frequency_list, determine_max_y_tick, Line
 from ..radar_data.base import BaseRadarData
 
@@ -21,18 +25,21 @@ class BaseRadarPlotter(abc.ABC):
     """Класс построителя круговых диаграмм по подготовленным данным о зонах R2 в RadarData"""
 
     def __init__(self, radar_data_list: List[BaseRadarData], max_y_tick: int = None,
-                 line_styles: List[Line] = DEFAULT_LINE_STYLES):
+                 line_styles: List[Line] = DEFAULT_LINE_STYLES,
+                 profile: Union[str, OutputProfile] = DEFAULT_PROFILE):
         """
         Подготавливает графики с зонами R2 или Уровнями сигнала к отображению
 
         :param radar_data_list: список данных R2 по углам для сравнения
         :param max_y_tick:
         :param line_styles:
+        :param profile: профиль вывода (draft, final, vector - см. profiles)
         """
+        self.profile: OutputProfile = get_profile(profile)
 
         self.rdata_list: List[BaseRadarData] = radar_data_list
         self.data_list: List[pd.DataFrame] = [rdata.data for rdata in self.rdata_list]
-        self.frequency_list: List[float] = sorted(make_unique_frequency_list(self.data_list))
+        self.frequency_list: List[float] = make_unique_frequency_list(self.data_list)
 
         if max_y_tick is not None:
             self.max_y_tick = max_y_tick
@@ -45,18 +52,85 @@ class BaseRadarPlotter(abc.ABC):
         else:
             self.lines = line_styles
 
+        # Собственная фигура построителя, не связанная с глобальным состоянием pyplot,
+        # поэтому построители можно использовать одновременно в нескольких потоках
+        self.figure: Optional[Figure] = None
+
     @abc.abstractmethod
     def make_plot(self):
-        """Из данных о зонах R2 или Уровней сигналов в self.rdata должен подготовить графики для отображения"""
+        """Из данных о зонах R2 или Уровней сигналов в self.rdata должен подготовить графики в self.figure"""
 
     @staticmethod
-    def show():
-        """Отобразить график"""
+    def new_figure(**kwargs) -> Figure:
+        """
+        Создать фигуру с холстом Agg вне pyplot
+
+        :param kwargs: параметры matplotlib.figure.Figure
+        """
+        figure = Figure(**kwargs)
+        FigureCanvasAgg(figure)
+        return figure
+
+    def show(self, backend: Optional[str] = None):
+        """
+        Отобразить график в окне. Окна в matplotlib создает только pyplot, поэтому для отображения
+        график строится заново на фигуре pyplot (self.figure после этого - фигура pyplot, она закрывается
+        вместе с окном или через matplotlib.pyplot.close)
+
+        :param backend: бэкенд matplotlib (см. backend.select_backend), None - RADARPLOT_BACKEND
+        или бэкенд matplotlib по умолчанию
+        """
+        select_backend(backend)
+        import matplotlib.pyplot as plt
+
+        # make_plot создает фигуру через self.new_figure: на время построения - через plt.figure
+        self.close()
+        self.new_figure = plt.figure
+        try:
+            self.make_plot()
+        finally:
+            del self.new_figure
         plt.show()
 
-    def save(self, path: str = None):
-        """сохранить график"""
+    def save(self, path: Union[str, pathlib.Path, BinaryIO] = None, dpi: Optional[int] = None, **kwargs):
+        """
+        Сохранить график и освободить фигуру. При повторном сохранении график строится заново
+
+        :param path: путь к файлу (формат - по расширению) или открытый двоичный файл (формат профиля)
+        :param dpi: разрешение, точек на дюйм (None - разрешение профиля)
+        :param kwargs: параметры Figure.savefig (например, format для файловых объектов)
+        """
+        dpi, path = self._output_options(path, dpi, kwargs)
+        with profiling.span('save', plotter=type(self).__name__, dpi=dpi, profile=self.profile.name):
+            if self.figure is None:
+                self.make_plot()
+
+            try:
+                with profiling.span('encode', dpi=dpi):
+                    self.figure.savefig(path, dpi=dpi, **kwargs)
+            finally:
+                self.close()
+
+    def _output_options(self, path: Union[str, pathlib.Path, BinaryIO, None], dpi: Optional[int],
+                        kwargs: dict) -> Tuple[int, Union[pathlib.Path, BinaryIO]]:
+        """
+        Разрешение и путь сохранения с учетом профиля. Для файловых объектов в kwargs
+        добавляется формат профиля, если формат не задан
+
+        :return: разрешение и путь (или файловый объект)
+        """
+        if dpi is None:
+            dpi = self.profile.dpi
         if path is None:
-            plt.savefig(self.rdata_list[0].dir.joinpath(' [график].png'), dpi=400)
-        else:
-            plt.savefig(pathlib.Path(path), dpi=400)
+            path = self.rdata_list[0].dir.joinpath(f' [график]{self.profile.suffix}')
+        elif isinstance(path, str):
+            path = pathlib.Path(path)
+        elif not isinstance(path, pathlib.Path):
+            kwargs.setdefault('format', self.profile.format)
+        return dpi, path
+
+    def close(self):
+        """Освободить фигуру и все ее элементы"""
+        if self.figure is not None:
+            self.figure.clear()
+            self.figure = None
@@ -1,19 +1,52 @@
 import math
+import pathlib
 import numpy as np
-import matplotlib.pyplot as plt
-import pandas as pd
+import matplotlib
 
-from typing import List
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-from radar_chart.radarplot.plotter.base import BaseRadarPlotter, Line
+from .base import BaseRadarPlotter, Line
+from .profiles import ARC_STEPS, DEFAULT_PROFILE, OutputProfile
+from .. import profiling
 from ..radar_data import RadarDataLevels
 
 
+# Размер одного графика на холсте, дюймы
+PANEL_SIZE = (2.5, 3)
+
+
+class LevelsLayer(NamedTuple):
+    """Подготовленные для отрисовки данные одной выборки по всем частотам (массивы частота x угол)"""
+    present: np.ndarray
+    noise: np.ndarray
+    noise_colors: np.ndarray
+    signal: np.ndarray
+    signal_colors: np.ndarray
+    positions: np.ndarray
+    widths: np.ndarray
+    angles: np.ndarray
+    line: Line
+
+
+class PanelTemplate(NamedTuple):
+    """Положение графика внутри своей ячейки холста и высота его названия, рассчитанные один раз"""
+    left: float
+    bottom: float
+    width: float
+    height: float
+    title_y: float
+
+
 class RadarLevelsPlotter(BaseRadarPlotter):
     """Класс построителя круговых диаграмм по подготовленным данным об Уровнях сигналов в RadarData"""
 
     def __init__(self, radar_data_list: List[RadarDataLevels],
-                 max_y_tick: int = None, col_count: int = 4):
+                 max_y_tick: int = None, col_count: int = 4,
+                 page_size: int = None, bands: List[Tuple[float, float]] = None,
+                 profile: Union[str, OutputProfile] = DEFAULT_PROFILE):
         """
         Подготавливает графики с Уровнями сигналов к отображению
 
@@ -21,6 +54,9 @@ class RadarLevelsPlotter(BaseRadarPlotter):
         для сравнения
         :param max_y_tick: Предел шкалы уровней сигналов
         :param col_count: Количество колонок с графиками
+        :param page_size: Количество графиков на странице (постраничный вывод)
+        :param bands: Диапазоны частот [нижняя, верхняя) МГц, по странице на диапазон (постраничный вывод)
+        :param profile: профиль вывода (draft, final, vector - см. profiles)
         """
 
         self.angels: List[float] = []
@@ -33,82 +69,298 @@ class RadarLevelsPlotter(BaseRadarPlotter):
         ]
 
         BaseRadarPlotter.__init__(self, radar_data_list,
-                                  max_y_tick, line_styles=line_styles)
+                                  max_y_tick, line_styles=line_styles, profile=profile)
 
         self.col_count: int = col_count
         # Рассчет количества графиков по вертикали и горизонтали
         self.row_count = math.ceil(len(self.frequency_list) / self.col_count)
 
-        self.make_plot()
+        # Разбиение частот на страницы: по page_size графиков или по диапазонам частот bands
+        self.page_size: Optional[int] = page_size
+        self.bands: Optional[List[Tuple[float, float]]] = bands
+
+        # Подготовленные данные выборок и шаблон графика общие для всех страниц
+        self._layers: Optional[List[LevelsLayer]] = None
+        self._template: Optional[PanelTemplate] = None
+
+        # При постраничном выводе фигуры строятся по одной при сохранении
+        if not self.paged:
+            self.make_plot()
 
-    def make_plot(self):
-        """Из данных об Уровнях сигнала на различных угла подготавливает круговые диаграммы для каждой частоты"""
+    @property
+    def paged(self) -> bool:
+        """Включен ли постраничный вывод"""
+        return self.page_size is not None or self.bands is not None
+
+    @profiling.traced('make_plot')
+    def make_plot(self, frequency_list: List[float] = None):
+        """
+        Из данных об Уровнях сигнала на различных угла подготавливает круговые диаграммы для каждой частоты
+
+        :param frequency_list: частоты, для которых строятся графики (по умолчанию - все частоты)
+        """
+        if frequency_list is None:
+            frequency_list = self.frequency_list
+        frequency_index = {frequency: i for i, frequency in enumerate(self.frequency_list)}
 
         # Список углов, на которых проводились измерения надо сохранить в self.angels,
         # todo: если углы первой и второй выборки отличаются, то надо выкинуть ошибку
         self.angels = self.data_list[0].index.values
 
         # Размер холста
-        plt.figure(layout='constrained', figsize=(self.col_count * 2.5, self.row_count * 3))
-
-        # Для каждой частоты данных
-        for frequency in self.frequency_list:
-            axes = plt.subplot(self.row_count, self.col_count,
-                               pd.Index(self.frequency_list).get_loc(frequency) + 1, projection='polar')
-
-            # Настройка шкалы уровней текущего графика
-            plt.ylim((0, self.max_y_tick))
-
-            # Название текущего графика
-            plt.title(f"{frequency} МГц", loc='center')
-
-            # При построении графиков используется обратный порядок построения,
-            # чтобы график с последними данными был сверху
-            for i_rdata, rdata in enumerate(reversed(self.rdata_list)):
-                if frequency in rdata.data.columns.values:
-                    signal = rdata.data[frequency]
-                    noise = rdata.noise[frequency]
-
-                    # Настройка цвета лепестков
-                    min_color_factor = 10
-                    color_signal_factors = (signal - min_color_factor) / (self.max_y_tick - min_color_factor)
-                    color_noise_factors = (noise - min_color_factor) / (self.max_y_tick - min_color_factor)
-                    signal_colors = plt.cm.jet(color_signal_factors)
-                    noise_colors = plt.cm.jet(color_noise_factors)
-
-                    # Настройка ширины лепестков
-                    min_width_factor = -10
-                    width_factors = (signal - min_width_factor) / (self.max_y_tick - min_width_factor)
-                    segment_width = (2 * np.pi / signal.shape[0])
-                    widths = segment_width * width_factors
-
-                    # Построение графика шума
-                    axes.bar(noise.index.values, noise, width=0.8, edgecolor='dimgray', color=noise_colors,
-                             linewidth=0.6, zorder=3, alpha=0.5/len(self.rdata_list))
-
-                    # Расчет ширины лепестков и их смещение от количества выборок
-                    # todo: переделать (сделать функцию)
-                    base_count_factor = 0.9
-                    gap_between_bars = 0.05
-                    if len(self.rdata_list) > 1:
-                        width_count_factor = base_count_factor - 0.1 * (len(self.rdata_list) - 1) - gap_between_bars * base_count_factor
-                        offset = (0.2 * width_count_factor) * widths
-                        # todo: не работает offset = (((widths * width_count_factor) / 2) - ((widths * width_count_factor) - (widths / 2)))
-                    else:
-                        width_count_factor = base_count_factor
-                        offset = 0
-
-                    # Построить график сигнала
-                    # todo: не работает segment_positions = signal.index.values - ((widths * width_count_factor) / 2 + offset)
-                    segment_positions = signal.index.values + (i_rdata - ((len(self.rdata_list) - 1) / 2)) * offset
-                    axes.bar(segment_positions, signal,
-                             width=widths*width_count_factor,
-                             edgecolor=self.lines[i_rdata].color, color=signal_colors,
-                             linewidth=self.lines[i_rdata].width, zorder=10-i_rdata, alpha=0.8)
-
-            # Настройка сетки графика
-            axes.tick_params(axis='both', which='major', labelsize=8)
-            axes.set_yticks(np.arange(0, self.max_y_tick, 10))
-            axes.set_yticks(np.arange(0, self.max_y_tick, 2), minor=True)
+        self.row_count = max(1, math.ceil(len(frequency_list) / self.col_count))
+        self.figure = self.new_figure(figsize=(self.col_count * PANEL_SIZE[0], self.row_count * PANEL_SIZE[1]))
+
+        # Цвета, ширины и положения лепестков сразу для всех частот.
+        # При построении графиков используется обратный порядок построения,
+        # чтобы график с последними данными был сверху
+        if self._layers is None:
+            with profiling.span('layers'):
+                self._layers = [self._make_layer(i_rdata, rdata)
+                                for i_rdata, rdata in enumerate(reversed(self.rdata_list))]
+        layers = self._layers
+
+        # Размещение графика в ячейке и положение названия рассчитываются один раз на шаблоне
+        if self._template is None:
+            self._template = self._make_panel_template()
+        template = self._template
+
+        with profiling.span('panels', panels=len(frequency_list)):
+            # Для каждой частоты данных
+            for i_panel, frequency in enumerate(frequency_list):
+                i_frequency = frequency_index[frequency]
+                row, col = divmod(i_panel, self.col_count)
+                axes = self.figure.add_axes([(col + template.left) / self.col_count,
+                                             (self.row_count - 1 - row + template.bottom) / self.row_count,
+                                             template.width / self.col_count,
+                                             template.height / self.row_count], projection='polar')
+                self._setup_axes(axes)
+
+                # Название текущего графика
+                axes.set_title(f"{frequency} МГц", loc='center', y=template.title_y)
+
+                for i_rdata, layer in enumerate(layers):
+                    if layer.present[i_frequency]:
+                        self._draw_layer(axes, layer, i_frequency, i_rdata)
+
+    def pages(self) -> List[List[float]]:
+        """
+        Разбить частоты на страницы: по page_size графиков или по диапазонам bands.
+        Частоты вне всех диапазонов не выводятся, пустые диапазоны пропускаются.
+        Без постраничного вывода - одна страница со всеми частотами
+        """
+        if self.bands is not None:
+            pages = [[frequency for frequency in self.frequency_list if low <= frequency < high]
+                     for low, high in self.bands]
+            return [page for page in pages if page]
+        if self.page_size is not None:
+            return [self.frequency_list[i:i + self.page_size]
+                    for i in range(0, len(self.frequency_list), self.page_size)]
+        return [self.frequency_list]
+
+    def iter_pages(self, pages: Iterable[int] = None) -> Iterator[Tuple[List[float], Figure]]:
+        """
+        Строить страницы по одной: фигура страницы освобождается перед построением следующей,
+        поэтому памяти требуется не больше, чем на одну страницу
+
+        :param pages: номера (с 0) страниц, которые надо построить (по умолчанию - все)
+        :return: итератор пар (частоты страницы, фигура страницы)
+        """
+        all_pages = self.pages()
+        for i_page in (range(len(all_pages)) if pages is None else sorted(pages)):
+            page = all_pages[i_page]
+            self.make_plot(page)
+            try:
+                yield page, self.figure
+            finally:
+                self.close()
+
+    def save(self, path: Union[str, pathlib.Path, BinaryIO] = None, dpi: Optional[int] = None,
+             **kwargs) -> List[pathlib.Path]:
+        """
+        Сохранить график. При постраничном выводе - сохранить страницы (см. save_pages)
+
+        :param path: путь к файлу (формат - по расширению) или открытый двоичный файл (формат профиля)
+        :param dpi: разрешение, точек на дюйм (None - разрешение профиля)
+        :param kwargs: параметры Figure.savefig
+        :return: пути к сохраненным файлам (для открытого файла - пустой список)
+        """
+        dpi, path = self._output_options(path, dpi, kwargs)
+        if self.paged:
+            return self.save_pages(path, dpi, **kwargs)
+        BaseRadarPlotter.save(self, path, dpi, **kwargs)
+        return [path] if isinstance(path, pathlib.Path) else []
+
+    def save_pages(self, path: Union[str, pathlib.Path, BinaryIO], dpi: Optional[int] = None,
+                   pages: Iterable[int] = None, **kwargs) -> List[pathlib.Path]:
+        """
+        Сохранить графики постранично. Для пути с расширением .pdf все страницы записываются
+        в один многостраничный PDF, иначе каждая страница - в отдельный файл с номером страницы в имени.
+        В открытый двоичный файл страницы записываются только многостраничным PDF
+
+        :param path: путь к файлу или открытый двоичный файл (формат - format из kwargs или формат профиля)
+        :param dpi: разрешение, точек на дюйм (None - разрешение профиля)
+        :param pages: номера (с 0) страниц, которые надо сохранить в отдельные файлы (по умолчанию - все);
+        PDF всегда сохраняется целиком
+        :param kwargs: параметры Figure.savefig
+        :return: пути к сохраненным файлам (для открытого файла - пустой список)
+        """
+        if dpi is None:
+            dpi = self.profile.dpi
+
+        if not isinstance(path, (str, pathlib.Path)):
+            output_format = kwargs.pop('format', self.profile.format)
+            if output_format != 'pdf':
+                raise ValueError(f'Страницы записываются в открытый файл только многостраничным PDF, '
+                                 f'а не в формате {output_format!r}: задайте путь к файлу или профиль vector')
+            self._save_pdf(path, dpi, **kwargs)
+            return []
+
+        path = pathlib.Path(path)
+        if path.suffix.lower() == '.pdf':
+            self._save_pdf(path, dpi, **kwargs)
+            return [path]
+
+        with profiling.span('save_pages', plotter=type(self).__name__, dpi=dpi, profile=self.profile.name) as stage:
+            pages = sorted(range(len(self.pages())) if pages is None else pages)
+            width = len(str(len(self.pages())))
+            paths = []
+            for i_page, (_, figure) in zip(pages, self.iter_pages(pages)):
+                page_path = path.with_name(f'{path.stem} [стр. {i_page + 1:0{width}d}]{path.suffix}')
+                with profiling.span('encode', dpi=dpi):
+                    figure.savefig(page_path, dpi=dpi, **kwargs)
+                paths.append(page_path)
+            stage.set(pages=len(paths))
+            return paths
+
+    def _save_pdf(self, path: Union[pathlib.Path, BinaryIO], dpi: int, **kwargs) -> None:
+        """Записать все страницы в один многостраничный PDF (путь или открытый двоичный файл)"""
+        with profiling.span('save_pages', plotter=type(self).__name__, dpi=dpi, profile=self.profile.name) as stage:
+            with PdfPages(path) as pdf:
+                for _, figure in self.iter_pages():
+                    with profiling.span('encode', dpi=dpi):
+                        pdf.savefig(figure, dpi=dpi, **kwargs)
+            stage.set(pages=len(self.pages()))
+
+    def _make_layer(self, i_rdata: int, rdata: RadarDataLevels) -> LevelsLayer:
+        """
+        Рассчитать цвета, ширины и положения лепестков выборки для всех частот
+
+        :param i_rdata: номер выборки в порядке построения
+        :param rdata: данные выборки
+        """
+        colormap = matplotlib.colormaps['jet']
+        data = rdata.data.reindex(columns=self.frequency_list)
+        noise_data = rdata.noise.reindex(columns=self.frequency_list)
+
+        angles = data.index.values.astype(float)
+        signal = data.to_numpy(dtype=float).T
+        noise = noise_data.to_numpy(dtype=float).T
+
+        # Настройка цвета лепестков
+        min_color_factor = 10
+        signal_colors = colormap((signal - min_color_factor) / (self.max_y_tick - min_color_factor))
+        noise_colors = colormap((noise - min_color_factor) / (self.max_y_tick - min_color_factor))
+
+        # Настройка ширины лепестков
+        min_width_factor = -10
+        width_factors = (signal - min_width_factor) / (self.max_y_tick - min_width_factor)
+        segment_width = (2 * np.pi / len(angles))
+        widths = segment_width * width_factors
+
+        # Расчет ширины лепестков и их смещение от количества выборок
+        base_count_factor = 0.9
+        gap_between_bars = 0.05
+        count = len(self.rdata_list)
+        if count > 1:
+            width_count_factor = base_count_factor - 0.1 * (count - 1) - gap_between_bars * base_count_factor
+            offset = (0.2 * width_count_factor) * widths
+        else:
+            width_count_factor = base_count_factor
+            offset = 0
+
+        positions = angles + (i_rdata - ((count - 1) / 2)) * offset
+
+        return LevelsLayer(present=np.isin(self.frequency_list, rdata.data.columns.values),
+                           noise=noise, noise_colors=noise_colors,
+                           signal=signal, signal_colors=signal_colors,
+                           positions=np.broadcast_to(positions, signal.shape), widths=widths * width_count_factor,
+                           angles=angles, line=self.lines[i_rdata])
+
+    def _draw_layer(self, axes, layer: LevelsLayer, i_frequency: int, i_rdata: int):
+        """
+        Построить лепестки шума и сигнала одной выборки на графике частоты
+
+        :param axes: график частоты
+        :param layer: подготовленные данные выборки
+        :param i_frequency: номер частоты
+        :param i_rdata: номер выборки в порядке построения
+        """
+        # Построение графика шума. Цвета берутся только для построенных лепестков (без NaN)
+        noise = layer.noise[i_frequency]
+        vertices, valid = wedge_vertices(layer.angles, np.full(len(noise), 0.8), noise, self.profile.arc_steps)
+        axes.add_collection(PolyCollection(
+            vertices, facecolors=layer.noise_colors[i_frequency][valid], edgecolors='dimgray', linewidths=0.6,
+            zorder=3, alpha=0.5/len(self.rdata_list)), autolim=False)
+
+        # Построить график сигнала
+        vertices, valid = wedge_vertices(layer.positions[i_frequency], layer.widths[i_frequency],
+                                         layer.signal[i_frequency], self.profile.arc_steps)
+        axes.add_collection(PolyCollection(
+            vertices, facecolors=layer.signal_colors[i_frequency][valid], edgecolors=layer.line.color,
+            linewidths=layer.line.width, zorder=10-i_rdata, alpha=0.8), autolim=False)
+
+    def _setup_axes(self, axes):
+        """Настройка шкалы уровней и сетки графика"""
+        axes.set_ylim((0, self.max_y_tick))
+        axes.tick_params(axis='both', which='major', labelsize=8)
+        if self.profile.minor_grid:
             axes.grid(which='minor', color='lightgray', linewidth=0.3, alpha=0.3)
-            axes.grid(which='major', linewidth=0.4, alpha=0.9)
+        axes.grid(which='major', linewidth=0.4, alpha=0.9)
+        axes.set_yticks(np.arange(0, self.max_y_tick, 10))
+        if self.profile.minor_grid:
+            axes.set_yticks(np.arange(0, self.max_y_tick, 2), minor=True)
+
+    def _make_panel_template(self) -> PanelTemplate:
+        """
+        Рассчитать размещение одного графика в ячейке холста автоматической компоновкой
+        на отдельной фигуре размером в одну ячейку. Все графики устроены одинаково,
+        поэтому компоновка всего холста сводится к повторению шаблона
+        """
+        figure = BaseRadarPlotter.new_figure(layout='constrained', figsize=PANEL_SIZE)
+        axes = figure.add_subplot(projection='polar')
+        self._setup_axes(axes)
+        axes.set_title(f"{max(self.frequency_list, default=0)} МГц", loc='center')
+        figure.draw_without_rendering()
+
+        position = axes.get_position()
+        template = PanelTemplate(position.x0, position.y0, position.width, position.height,
+                                 axes.title.get_position()[1])
+        figure.clear()
+        return template
+
+
+def wedge_vertices(positions: np.ndarray, widths: np.ndarray, heights: np.ndarray,
+                   arc_steps: int = ARC_STEPS) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Вершины лепестков полярной диаграммы: дуга радиуса height шириной width с центром на угле position,
+    замкнутая в центре диаграммы. Лепестки без данных (NaN) пропускаются
+
+    :param positions: углы центров лепестков, рад
+    :param widths: угловые ширины лепестков, рад
+    :param heights: радиусы лепестков
+    :param arc_steps: количество точек на дуге лепестка
+    :return: список массивов вершин (угол, радиус) для PolyCollection и маска построенных лепестков
+    (по ней выбираются цвета лепестков)
+    """
+    positions, widths, heights = np.broadcast_arrays(positions, widths, heights)
+    valid = ~np.isnan(heights)
+    positions, widths, heights = positions[valid], widths[valid], heights[valid]
+
+    steps = np.linspace(-0.5, 0.5, arc_steps)
+    vertices = np.empty((len(positions), arc_steps + 1, 2))
+    vertices[:, :-1, 0] = positions[:, None] + widths[:, None] * steps
+    vertices[:, :-1, 1] = heights[:, None]
+    vertices[:, -1, 0] = positions
+    vertices[:, -1, 1] = 0
+    return list(vertices), valid
@@ -0,0 +1,58 @@
+"""
+Профили вывода графиков: разрешение, формат файла и подробность построения.
+
+draft - быстрый предварительный просмотр: низкое разрешение, без дополнительной сетки, упрощенные лепестки;
+final - графики для отчета (разрешение 400 точек на дюйм);
+vector - векторный формат (PDF, по расширению пути - SVG)
+"""
+from dataclasses import dataclass
+from typing import Union
+
+
+# Разрешение сохраняемых изображений, точек на дюйм
+DPI = 400
+
+# Количество точек на дуге лепестка графика уровней
+ARC_STEPS = 24
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """Профиль вывода графиков"""
+    name: str
+    # Разрешение, точек на дюйм (для векторных форматов - разрешение растровых вставок)
+    dpi: int
+    # Формат файла (для путей без расширения и файловых объектов)
+    format: str = 'png'
+    # Строить ли дополнительную сетку
+    minor_grid: bool = True
+    # Количество точек на дуге лепестка графика уровней
+    arc_steps: int = ARC_STEPS
+
+    @property
+    def suffix(self) -> str:
+        """Расширение файлов профиля"""
+        return f'.{self.format}'
+
+
+PROFILES = {profile.name: profile for profile in [
+    OutputProfile('draft', dpi=80, minor_grid=False, arc_steps=4),
+    OutputProfile('final', dpi=DPI),
+    OutputProfile('vector', dpi=DPI, format='pdf'),
+]}
+
+DEFAULT_PROFILE = 'final'
+
+
+def get_profile(profile: Union[str, OutputProfile]) -> OutputProfile:
+    """
+    Профиль вывода по имени
+
+    :param profile: имя профиля (draft, final, vector) или сам профиль
+    """
+    if isinstance(profile, OutputProfile):
+        return profile
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f'Неизвестный профиль вывода {profile!r}, допустимые: {", ".join(PROFILES)}') from None
@@ -1,8 +1,12 @@
+import pathlib
+
 import numpy as np
-import matplotlib.pyplot as plt
-from typing import List
+from matplotlib.cbook import contiguous_regions
+from typing import BinaryIO, List, Optional, Union
 
-from radar_chart.radarplot.plotter.base import BaseRadarPlotter
+from .base import DEFAULT_LINE_STYLES, BaseRadarPlotter
+from .profiles import DEFAULT_PROFILE, OutputProfile, get_profile
+from .. import profiling
 from ..radar_data import RadarDataR2
 from ..utils import Line
 
@@ -11,23 +15,26 @@ class RadarR2Plotter(BaseRadarPlotter):
     """Класс построителя круговых диаграмм по подготовленным данным о зонах R2 в RadarData"""
 
     def __init__(self, radar_data_list: List[RadarDataR2] = None, max_y_tick: int = None,
-                 line_styles: List[Line] = None):
+                 line_styles: List[Line] = None, profile: Union[str, OutputProfile] = DEFAULT_PROFILE):
         """
         Подготавливает графики с зонами R2 к отображению
 
         :param radar_data_list: список подготовленных данных R2 по углам для сравнения
         :param max_y_tick: Предел шкалы зон R2
+        :param profile: профиль вывода (draft, final, vector - см. profiles)
         """
-        BaseRadarPlotter.__init__(self, radar_data_list, max_y_tick, line_styles=line_styles)
+        BaseRadarPlotter.__init__(self, radar_data_list, max_y_tick, line_styles=line_styles, profile=profile)
         self.make_plot()
 
+    @profiling.traced('make_plot')
     def make_plot(self):
         """Из данных о зонах R2 на различных углах подготавливает круговые диаграммы"""
-        fig, ax = plt.subplots(subplot_kw={'projection': 'polar'})
+        self.figure = self.new_figure()
+        ax = self.figure.add_subplot(projection='polar')
 
         # Настройка максимальной величины оси уровней R2
         if self.max_y_tick is not None:
-            plt.ylim((0, self.max_y_tick))
+            ax.set_ylim((0, self.max_y_tick))
 
         # Построение линнии данных
         for i_rdata, rdata in enumerate(self.rdata_list):
@@ -56,7 +63,122 @@ class RadarR2Plotter(BaseRadarPlotter):
                                 alpha=self.lines[i_rdata].alpha-0.5, zorder=i_rdata)
 
         # Настройка сетки графика
-        ax.set_yticks(np.arange(0, self.max_y_tick, 5))
-        ax.set_yticks(np.arange(0, self.max_y_tick, 1), minor=True)
+        setup_r2_grid(ax, self.max_y_tick, self.profile.minor_grid)
+
+
+def setup_r2_grid(ax, max_y_tick: int, minor_grid: bool = True):
+    """
+    Настроить деления и сетку круговой диаграммы R2
+
+    :param minor_grid: строить ли дополнительную сетку
+    """
+    ax.set_yticks(np.arange(0, max_y_tick, 5))
+    if minor_grid:
+        ax.set_yticks(np.arange(0, max_y_tick, 1), minor=True)
         ax.grid(which='minor', color='gray', linewidth=0.3, alpha=0.2)
-        ax.grid(which='major', color='dimgray', linewidth=0.4, alpha=0.5)
+    ax.grid(which='major', color='dimgray', linewidth=0.4, alpha=0.5)
+
+
+def fill_polygons(x: np.ndarray, y1: np.ndarray, y2: np.ndarray) -> List[np.ndarray]:
+    """
+    Многоугольники заливки между кривыми y1 и y2, как их строит Axes.fill_between:
+    по одному многоугольнику на каждый непрерывный участок без NaN
+
+    :return: вершины многоугольников (x, y)
+    """
+    x, y1, y2 = (np.asarray(values, dtype=np.float64) for values in (x, y1, y2))
+    valid = np.isfinite(x) & np.isfinite(y1) & np.isfinite(y2)
+    polygons = []
+    for start, stop in contiguous_regions(valid):
+        n = stop - start
+        points = np.zeros((2 * n + 2, 2))
+        points[0] = x[start], y2[start]
+        points[n + 1] = x[stop - 1], y2[stop - 1]
+        points[1:n + 1, 0] = x[start:stop]
+        points[1:n + 1, 1] = y1[start:stop]
+        points[n + 2:, 0] = x[start:stop][::-1]
+        points[n + 2:, 1] = y2[start:stop][::-1]
+        polygons.append(points)
+    return polygons
+
+
+class R2FigureTemplate:
+    """
+    Шаблон круговой диаграммы R2 для построения многих однотипных графиков подряд.
+    Фигура, полярные оси, деления и сетка создаются один раз, для каждого графика заменяются только
+    данные линий и многоугольники заливок. Изображение совпадает с изображением RadarR2Plotter
+    с теми же max_y_tick и стилями линий. Шаблон не потокобезопасен: один шаблон на поток
+    """
+
+    def __init__(self, max_y_tick: int, line_styles: List[Line] = None, slots: int = 1,
+                 profile: Union[str, OutputProfile] = DEFAULT_PROFILE):
+        """
+        :param max_y_tick: предел шкалы зон R2
+        :param line_styles: стили линий (по умолчанию - стили BaseRadarPlotter)
+        :param slots: наибольшее количество данных на одном графике
+        :param profile: профиль вывода (draft, final, vector - см. profiles)
+        """
+        self.max_y_tick = max_y_tick
+        self.profile: OutputProfile = get_profile(profile)
+        self.lines: List[Line] = line_styles if line_styles is not None else DEFAULT_LINE_STYLES
+        if slots > len(self.lines):
+            raise ValueError(f'Стилей линий ({len(self.lines)}) меньше, чем данных на графике ({slots})')
+
+        with profiling.span('make_template', slots=slots):
+            self.figure = BaseRadarPlotter.new_figure()
+            ax = self.figure.add_subplot(projection='polar')
+            ax.set_ylim((0, max_y_tick))
+
+            # Линии и заливки создаются пустыми в том же порядке, что и в RadarR2Plotter.make_plot
+            self._artists = []
+            for i_slot, line in enumerate(self.lines[:slots]):
+                plot_line, = ax.plot([], [], color=line.color, linewidth=line.width, linestyle=line.style,
+                                     alpha=line.alpha, zorder=i_slot)
+                fills = [ax.fill_between([], [], y2=[], color=line.color, linewidth=0.5, linestyle=line.style,
+                                         alpha=line.alpha - 0.5, zorder=i_slot) for _ in ['lower', 'upper']]
+                self._artists.append((plot_line, fills))
+
+            setup_r2_grid(ax, max_y_tick, self.profile.minor_grid)
+
+    def render(self, radar_data_list: List[RadarDataR2], path: Union[str, pathlib.Path, BinaryIO],
+               dpi: Optional[int] = None, **kwargs):
+        """
+        Построить и сохранить график данных radar_data_list
+
+        :param radar_data_list: список данных R2 по углам (не больше slots)
+        :param path: путь к файлу (формат - по расширению) или открытый двоичный файл (формат профиля)
+        :param dpi: разрешение, точек на дюйм (None - разрешение профиля)
+        :param kwargs: параметры Figure.savefig (например, format для файловых объектов)
+        """
+        if len(radar_data_list) > len(self._artists):
+            raise ValueError(f'Данных ({len(radar_data_list)}) больше, чем мест в шаблоне ({len(self._artists)})')
+
+        if dpi is None:
+            dpi = self.profile.dpi
+        if isinstance(path, str):
+            path = pathlib.Path(path)
+        elif not isinstance(path, pathlib.Path):
+            kwargs.setdefault('format', self.profile.format)
+
+        with profiling.span('save', plotter=type(self).__name__, dpi=dpi, profile=self.profile.name):
+            for i_slot, (plot_line, fills) in enumerate(self._artists):
+                visible = i_slot < len(radar_data_list)
+                plot_line.set_visible(visible)
+                for fill in fills:
+                    fill.set_visible(visible)
+                if not visible:
+                    continue
+
+                data = radar_data_list[i_slot].data
+                angles = data.index.values
+                plot_line.set_data(angles, data['main'])
+                for fill, column in zip(fills, ['lower', 'upper']):
+                    fill.set_verts(fill_polygons(angles, data['main'], data[column])
+                                   if column in data.columns else [])
+
+            with profiling.span('encode', dpi=dpi):
+                self.figure.savefig(path, dpi=dpi, **kwargs)
+
+    def close(self):
+        """Освободить фигуру шаблона"""
+        self.figure.clear()
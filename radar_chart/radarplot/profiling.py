@@ -0,0 +1,290 @@
+"""
+Легковесная трассировка этапов загрузки данных и построения графиков.
+
+Этапы отмечаются контекстным менеджером span или декоратором traced. Пока профилирование не включено,
+span возвращает общий пустой объект и почти ничего не стоит. Внутри `with Profiler() as profiler:`
+для каждого этапа сохраняются время, вложенность, поток, счетчики (файлы, строки и т.п.)
+и, при memory=True, пиковый объем памяти Python и NumPy (tracemalloc).
+Результаты выводятся сводкой по этапам или сохраняются в JSON и в формате Chrome trace
+(открывается в chrome://tracing или https://ui.perfetto.dev).
+
+Пример:
+    with Profiler(memory=True) as profiler:
+        plotter = RadarLevelsPlotter([RadarDataLevelsManyMeas(dir_name)])
+        plotter.save(output_file_name)
+    profiler.print_summary()
+    profiler.save_chrome_trace('trace.json')
+"""
+import functools
+import json
+import os
+import pathlib
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, TypeVar, Union
+
+
+F = TypeVar('F', bound=Callable)
+
+# Текущий профилировщик (None - профилирование выключено)
+_profiler: Optional['Profiler'] = None
+
+
+class _NullSpan:
+    """Пустой этап, возвращаемый, когда профилирование выключено"""
+
+    __slots__ = ()
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def __bool__(self) -> bool:
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Этап обработки: имя, время начала и окончания, счетчики и пиковая память"""
+
+    __slots__ = ('profiler', 'name', 'attrs', 'start', 'end', 'depth', 'parent', 'thread', 'peak', '_peak')
+
+    def __init__(self, profiler: 'Profiler', name: str, attrs: dict):
+        self.profiler = profiler
+        self.name = name
+        self.attrs = attrs
+        self.start = self.end = 0.0
+        self.depth = 0
+        self.parent: Optional[str] = None
+        self.thread = threading.get_ident()
+        self.peak: Optional[int] = None
+        self._peak = 0
+
+    @property
+    def duration(self) -> float:
+        """Длительность этапа, с"""
+        return self.end - self.start
+
+    def set(self, **attrs) -> None:
+        """Добавить счетчики этапа, например files=120, rows=35000"""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> 'Span':
+        stack = self.profiler._stack()
+        if stack:
+            self.depth = len(stack)
+            self.parent = stack[-1].name
+        if self.profiler.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._peak = current
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        self.end = time.perf_counter()
+        stack = self.profiler._stack()
+        stack.pop()
+        if self.profiler.memory:
+            self.peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, self.peak)
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.profiler._add(self)
+        return False
+
+    def __bool__(self) -> bool:
+        return True
+
+    def to_dict(self) -> dict:
+        """Этап в виде словаря для JSON; время - в секундах от начала профилирования"""
+        return {
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'start_s': self.start - self.profiler.origin,
+            'duration_s': self.duration,
+            'pid': self.profiler.pid,
+            'thread': self.thread,
+            'peak_mib': self.peak / 2 ** 20 if self.peak is not None else None,
+            'attrs': self.attrs,
+        }
+
+
+def span(name: str, **attrs) -> Union[Span, _NullSpan]:
+    """
+    Этап обработки для использования в with. Если профилирование выключено, возвращает NULL_SPAN
+
+    :param name: имя этапа
+    :param attrs: счетчики этапа
+    """
+    profiler = _profiler
+    if profiler is None:
+        return NULL_SPAN
+    return Span(profiler, name, attrs)
+
+
+def traced(name: str = None) -> Callable[[F], F]:
+    """
+    Декоратор: вызов функции - этап обработки
+
+    :param name: имя этапа (по умолчанию - имя функции)
+    """
+    def decorator(func: F) -> F:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            with Span(profiler, span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enabled() -> bool:
+    """Включено ли профилирование"""
+    return _profiler is not None
+
+
+class Profiler:
+    """Сборщик этапов обработки. Действует внутри with; вложенные профилировщики не поддерживаются"""
+
+    def __init__(self, memory: bool = False):
+        """
+        :param memory: замерять пиковую память (tracemalloc заметно замедляет выполнение)
+        """
+        self.memory: bool = memory
+        self.spans: List[Span] = []
+        self.pid: int = os.getpid()
+        self.origin: float = time.perf_counter()
+        self.origin_wall: float = time.time()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> 'Profiler':
+        global _profiler
+        if _profiler is not None:
+            raise RuntimeError('Профилирование уже включено')
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.origin = time.perf_counter()
+        self.origin_wall = time.time()
+        _profiler = self
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        global _profiler
+        _profiler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return False
+
+    def _stack(self) -> List[Span]:
+        """Стек открытых этапов текущего потока"""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, finished: Span) -> None:
+        with self._lock:
+            self.spans.append(finished)
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Сводка по этапам с одинаковым именем: количество, суммарное и наибольшее время,
+        наибольшая пиковая память и суммы числовых счетчиков
+
+        :return: словарь имя этапа -> сводка, в порядке первого начала этапа
+        """
+        summary = {}
+        for finished in sorted(self.spans, key=lambda item: item.start):
+            stage = summary.setdefault(finished.name, {'count': 0, 'total_s': 0.0, 'max_s': 0.0,
+                                                       'peak_mib': None, 'attrs': {}})
+            stage['count'] += 1
+            stage['total_s'] += finished.duration
+            stage['max_s'] = max(stage['max_s'], finished.duration)
+            if finished.peak is not None:
+                stage['peak_mib'] = max(stage['peak_mib'] or 0.0, finished.peak / 2 ** 20)
+            for key, value in finished.attrs.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage['attrs'][key] = stage['attrs'].get(key, 0) + value
+        return summary
+
+    def print_summary(self, stream=None) -> None:
+        """Вывести сводку по этапам"""
+        stream = stream if stream is not None else sys.stdout
+        for name, stage in self.summary().items():
+            peak = f', память {stage["peak_mib"]:7.1f} МиБ' if stage['peak_mib'] is not None else ''
+            counters = ''.join(f', {key} {value:g}' for key, value in stage['attrs'].items())
+            print(f'{name:<40} {stage["count"]:5d} раз, всего {stage["total_s"]:8.3f} с, '
+                  f'максимум {stage["max_s"]:8.3f} с{peak}{counters}', file=stream)
+
+    def to_dict(self) -> dict:
+        """Все этапы и сводка для сохранения в JSON"""
+        return {
+            'pid': self.pid,
+            'started': self.origin_wall,
+            'spans': [finished.to_dict() for finished in sorted(self.spans, key=lambda item: item.start)],
+            'summary': self.summary(),
+        }
+
+    def chrome_events(self) -> List[dict]:
+        """
+        События в формате Chrome trace (полные события 'X', время в мкс от эпохи Unix,
+        поэтому события нескольких процессов можно объединить в один файл)
+        """
+        events = []
+        for finished in self.spans:
+            args = dict(finished.attrs)
+            if finished.peak is not None:
+                args['peak_mib'] = round(finished.peak / 2 ** 20, 3)
+            events.append({
+                'name': finished.name,
+                'ph': 'X',
+                'ts': (self.origin_wall + finished.start - self.origin) * 1e6,
+                'dur': finished.duration * 1e6,
+                'pid': self.pid,
+                'tid': finished.thread,
+                'args': args,
+            })
+        return events
+
+    def save_json(self, path: Union[str, pathlib.Path]) -> None:
+        """Сохранить этапы и сводку в JSON"""
+        pathlib.Path(path).write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=1), encoding='utf-8')
+
+    def save_chrome_trace(self, path: Union[str, pathlib.Path]) -> None:
+        """Сохранить этапы в формате Chrome trace"""
+        save_chrome_trace(path, self.chrome_events())
+
+
+def save_chrome_trace(path: Union[str, pathlib.Path], events: List[dict]) -> None:
+    """
+    Сохранить события в формате Chrome trace
+
+    :param path: путь к файлу
+    :param events: события (например, объединенные Profiler.chrome_events нескольких процессов)
+    """
+    pathlib.Path(path).write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False),
+                                  encoding='utf-8')
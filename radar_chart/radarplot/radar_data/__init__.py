@@ -1,7 +1,36 @@
-from .levels_data import RadarDataLevels
-from .r2_data import RadarDataR2
-from .r2_data_many_meas import RadarDataR2ManyMeas
-from .levels_data_many_meas import RadarDataLevelsManyMeas
+"""
+Классы данных для круговых диаграмм. Модули загружаются при первом обращении к классу
+(pandas, numpy и модули пакета не импортируются, пока они не нужны)
+"""
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .levels_data import RadarDataLevels
+    from .r2_data import RadarDataR2
+    from .r2_data_many_meas import RadarDataR2ManyMeas
+    from .levels_data_many_meas import RadarDataLevelsManyMeas
+
+
+# Имя класса -> модуль пакета, в котором он определен
+_LAZY = {
+    'RadarDataLevels': 'levels_data',
+    'RadarDataR2': 'r2_data',
+    'RadarDataR2ManyMeas': 'r2_data_many_meas',
+    'RadarDataLevelsManyMeas': 'levels_data_many_meas',
+}
 
 __all__ = ['RadarDataLevels', 'RadarDataR2', 'RadarDataR2ManyMeas', 'RadarDataLevelsManyMeas']
+
+
+def __getattr__(name: str):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    # То же, что from .<module_name> import <name>
+    value = getattr(__import__(module_name, globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
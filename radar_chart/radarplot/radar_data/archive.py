@@ -0,0 +1,301 @@
+"""
+Архив обработанной кампании измерений: папка с таблицами (Parquet или Feather, если установлен pyarrow,
+иначе NumPy .npz) и файлом meta.json с описанием таблиц и происхождением данных.
+Загрузка из архива не требует разбора текстовых файлов измерений.
+"""
+import datetime
+import json
+import pathlib
+import platform
+
+import numpy as np
+import pandas as pd
+from typing import List, NamedTuple, Optional, Union
+
+from .levels_cube import CUBE_DTYPE, LevelsCube, MeasFileRecord
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+ARCHIVE_VERSION = 1
+META_FILE = 'meta.json'
+FORMATS = {'parquet': '.parquet', 'feather': '.feather', 'npz': '.npz'}
+
+
+class ArchiveError(ValueError):
+    """Архив отсутствует, поврежден или записан несовместимой версией"""
+
+
+class LevelsArchive(NamedTuple):
+    """Данные уровней, прочитанные из архива"""
+    meta: dict
+    cube: LevelsCube
+    data: pd.DataFrame
+    noise: pd.DataFrame
+
+
+class R2Archive(NamedTuple):
+    """Данные зон R2, прочитанные из архива"""
+    meta: dict
+    files: pd.DataFrame
+
+
+def resolve_format(archive_format: str = 'auto') -> str:
+    """
+    Формат таблиц архива
+
+    :param archive_format: 'parquet', 'feather', 'npz' или 'auto' (parquet при наличии pyarrow, иначе npz)
+    """
+    if archive_format == 'auto':
+        return 'parquet' if pyarrow is not None else 'npz'
+    if archive_format not in FORMATS:
+        raise ValueError(f'Неизвестный формат архива: {archive_format!r}, допустимы: {", ".join(FORMATS)}, auto')
+    if archive_format != 'npz' and pyarrow is None:
+        raise ImportError(f'Для формата {archive_format} требуется пакет pyarrow')
+    return archive_format
+
+
+def write_levels(path: Union[str, pathlib.Path], levels_data, archive_format: str = 'auto') -> pathlib.Path:
+    """
+    Записать в архив данные уровней многих измерений: длинную таблицу необработанных данных,
+    сигналы и шумы по углам, уровни по частотам (output_data), метаданные файлов и оси куба
+
+    :param path: папка архива (создается при необходимости)
+    :param levels_data: данные RadarDataLevelsManyMeas
+    :param archive_format: формат таблиц
+    :return: папка архива
+    """
+    archive_format = resolve_format(archive_format)
+    path = pathlib.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    cube = levels_data.cube
+
+    tables = {
+        'levels_raw': _write_table(path, 'levels_raw', cube.to_frame(), archive_format),
+        'levels_data': _write_table(path, 'levels_data', levels_data.data, archive_format),
+        'levels_noise': _write_table(path, 'levels_noise', levels_data.noise, archive_format),
+        'levels_output': _write_table(path, 'levels_output', levels_data.output_data, archive_format),
+        'levels_files': _write_table(path, 'levels_files', _records_frame(cube.records), archive_format),
+    }
+    _update_meta(path, 'levels', archive_format, levels_data, {
+        'tables': tables,
+        'max_r2': levels_data.max_r2,
+        'axes': {
+            'meas_names': cube.meas_names,
+            'polarisations': cube.polarisations,
+            'angles': cube.angles.tolist(),
+            'frequencies': cube.frequencies.tolist(),
+            'freq_low': cube.freq_low.tolist(),
+            'freq_high': cube.freq_high.tolist(),
+            'interfaces': cube.interfaces.tolist(),
+        },
+    })
+    return path
+
+
+def read_levels(path: Union[str, pathlib.Path]) -> LevelsArchive:
+    """
+    Прочитать из архива данные уровней многих измерений и восстановить куб данных
+
+    :param path: папка архива
+    """
+    path = pathlib.Path(path)
+    meta = read_meta(path, 'levels')
+    part = meta['parts']['levels']
+    tables = {name: _read_table(path, name, info, meta['format']) for name, info in part['tables'].items()}
+
+    axes = part['axes']
+    angles = np.array(axes['angles'], dtype=np.float64)
+    frequencies = np.array(axes['frequencies'], dtype=np.float64)
+    shape = (len(axes['meas_names']), len(axes['polarisations']), len(angles), len(frequencies))
+
+    # Разложить длинную таблицу обратно в куб. Уровни в таблице - значения куба float32,
+    # округленные до точности исходных данных, поэтому обратное преобразование точное
+    raw = tables['levels_raw']
+    m = pd.Index(axes['meas_names']).get_indexer(raw['meas_name'].astype(str))
+    p = pd.Index(axes['polarisations']).get_indexer(raw['polarisation'].astype(str))
+    a = np.searchsorted(angles, raw['angle'].to_numpy())
+    f = np.searchsorted(frequencies, raw['freq'].to_numpy())
+    cubes = {}
+    for name, column in [('signal', 'signal'), ('noise', 'noise'), ('r2', 'R2')]:
+        values = np.full(shape, np.nan, dtype=CUBE_DTYPE)
+        values[m, p, a, f] = raw[column].to_numpy()
+        cubes[name] = values
+
+    interfaces = np.array(axes['interfaces'], dtype=object).reshape(shape[:2])
+
+    files = tables['levels_files']
+    records = [MeasFileRecord(pathlib.Path(row.path), row.meas_name, row.interface, row.polarisation,
+                              float(row.angle), float(row.r2)) for row in files.itertuples(index=False)]
+
+    # Границы кластеров частот (в архивах прежних версий их нет - кластеры из одной частоты)
+    freq_low = np.array(axes.get('freq_low', frequencies), dtype=np.float64)
+    freq_high = np.array(axes.get('freq_high', frequencies), dtype=np.float64)
+    cube = LevelsCube(axes['meas_names'], axes['polarisations'], angles, frequencies, interfaces,
+                      cubes['signal'], cubes['noise'], cubes['r2'], records, freq_low, freq_high)
+    return LevelsArchive(meta, cube, tables['levels_data'], tables['levels_noise'])
+
+
+def write_r2(path: Union[str, pathlib.Path], r2_data, archive_format: str = 'auto') -> pathlib.Path:
+    """
+    Записать в архив данные зон R2 многих измерений: значения каждого файла, накопители статистики
+    по углам и итоговые зоны R2 с границами неопределенности
+
+    :param path: папка архива (создается при необходимости)
+    :param r2_data: данные RadarDataR2ManyMeas
+    :param archive_format: формат таблиц
+    :return: папка архива
+    """
+    archive_format = resolve_format(archive_format)
+    path = pathlib.Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    tables = {
+        'r2_files': _write_table(path, 'r2_files', r2_data.files_frame(), archive_format),
+        'r2_stats': _write_table(path, 'r2_stats', r2_data.stats.accumulators_frame(), archive_format),
+        'r2_data': _write_table(path, 'r2_data', r2_data.data, archive_format),
+    }
+    _update_meta(path, 'r2', archive_format, r2_data, {'tables': tables})
+    return path
+
+
+def read_r2(path: Union[str, pathlib.Path]) -> R2Archive:
+    """
+    Прочитать из архива данные зон R2 многих измерений
+
+    :param path: папка архива
+    """
+    path = pathlib.Path(path)
+    meta = read_meta(path, 'r2')
+    info = meta['parts']['r2']['tables']['r2_files']
+    return R2Archive(meta, _read_table(path, 'r2_files', info, meta['format']))
+
+
+def read_meta(path: pathlib.Path, part: Optional[str] = None) -> dict:
+    """
+    Прочитать описание архива
+
+    :param path: папка архива
+    :param part: раздел ('levels' или 'r2'), который обязательно должен быть в архиве
+    """
+    meta_path = pathlib.Path(path).joinpath(META_FILE)
+    try:
+        meta = json.loads(meta_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as error:
+        raise ArchiveError(f'{path}: не удалось прочитать описание архива ({error})') from error
+
+    if meta.get('version') != ARCHIVE_VERSION:
+        raise ArchiveError(f'{path}: неподдерживаемая версия архива {meta.get("version")!r}')
+    if part is not None and part not in meta.get('parts', {}):
+        raise ArchiveError(f'{path}: в архиве нет данных {part}')
+    return meta
+
+
+def provenance(radar_data) -> dict:
+    """Происхождение данных: исходная папка, файлы, время создания архива и версии библиотек"""
+    mtimes = []
+    for file in radar_data.files:
+        try:
+            mtimes.append(pathlib.Path(radar_data.dir, file).stat().st_mtime)
+        except OSError:
+            continue
+    return {
+        'source_dir': str(radar_data.dir),
+        'file_count': len(radar_data.files),
+        'newest_file': (datetime.datetime.fromtimestamp(max(mtimes), datetime.timezone.utc).isoformat()
+                        if mtimes else None),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def _update_meta(path: pathlib.Path, part: str, archive_format: str, radar_data, part_meta: dict) -> None:
+    """Добавить раздел в описание архива (другие разделы сохраняются, если формат таблиц тот же)"""
+    meta = {'version': ARCHIVE_VERSION, 'format': archive_format, 'parts': {}}
+    try:
+        existing = read_meta(path)
+    except ArchiveError:
+        existing = None
+    if existing is not None and existing['format'] == archive_format:
+        meta['parts'] = existing['parts']
+
+    part_meta['provenance'] = provenance(radar_data)
+    meta['parts'][part] = part_meta
+    path.joinpath(META_FILE).write_text(json.dumps(meta, ensure_ascii=False, indent=1), encoding='utf-8')
+
+
+def _records_frame(records: List[MeasFileRecord]) -> pd.DataFrame:
+    """Таблица метаданных файлов"""
+    return pd.DataFrame({
+        'path': [str(record.path) for record in records],
+        'meas_name': [record.meas_name for record in records],
+        'interface': [record.interface for record in records],
+        'polarisation': [record.polarisation for record in records],
+        'angle': np.array([record.angle for record in records], dtype=np.float64),
+        'r2': np.array([record.r2 for record in records], dtype=np.float64),
+    })
+
+
+def _write_table(path: pathlib.Path, name: str, frame: pd.DataFrame, archive_format: str) -> dict:
+    """
+    Записать таблицу. Индекс записывается отдельным столбцом, числовые имена столбцов - строками
+
+    :return: описание таблицы для восстановления индекса, имен и типов столбцов
+    """
+    info = {
+        'index': frame.index.name,
+        'columns_name': frame.columns.name,
+        'numeric_columns': bool(pd.api.types.is_numeric_dtype(frame.columns.dtype)),
+    }
+    table = frame.copy()
+    if info['numeric_columns']:
+        table.columns = [repr(float(column)) for column in table.columns]
+    table.columns.name = None
+    table = table.reset_index() if info['index'] is not None else table.reset_index(drop=True)
+    info['dtypes'] = {str(column): str(dtype) for column, dtype in table.dtypes.items()}
+
+    file = path.joinpath(name + FORMATS[archive_format])
+    if archive_format == 'parquet':
+        table.to_parquet(file, index=False)
+    elif archive_format == 'feather':
+        table.to_feather(file)
+    else:
+        columns = {}
+        for i, column in enumerate(table.columns):
+            values = table[column]
+            if pd.api.types.is_numeric_dtype(values.dtype):
+                columns[f'c{i}'] = values.to_numpy()
+            else:
+                columns[f'c{i}'] = np.array(values.astype(str).tolist(), dtype=str)
+        np.savez(file, names=np.array(table.columns, dtype=str), **columns)
+    return info
+
+
+def _read_table(path: pathlib.Path, name: str, info: dict, archive_format: str) -> pd.DataFrame:
+    """Прочитать таблицу, записанную _write_table"""
+    file = path.joinpath(name + FORMATS[archive_format])
+    try:
+        if archive_format == 'parquet':
+            table = pd.read_parquet(file)
+        elif archive_format == 'feather':
+            table = pd.read_feather(file)
+        else:
+            with np.load(file, allow_pickle=False) as arrays:
+                names = arrays['names'].tolist()
+                table = pd.DataFrame({column: arrays[f'c{i}'] for i, column in enumerate(names)}, columns=names)
+    except (OSError, ValueError, KeyError) as error:
+        raise ArchiveError(f'{file}: не удалось прочитать таблицу ({error})') from error
+
+    table = table.astype(info['dtypes'])
+    if info['index'] is not None:
+        table = table.set_index(info['index'])
+    if info['numeric_columns']:
+        table.columns = pd.Index([float(column) for column in table.columns], dtype=np.float64)
+    table.columns.name = info['columns_name']
+    return table
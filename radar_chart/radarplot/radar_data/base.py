@@ -2,12 +2,18 @@ import abc
 import numpy as np
 import pandas as pd
 import pathlib
-import re
-from typing import List, Union
+from typing import Callable, List, Optional, Sequence, TypeVar, Union
 
+from .cache import ParsedFileCache
+from .ingest import LevelsFileData, map_files, read_levels_file
+from .scan import ANGLE_PATTERN, R2_PATTERN, scan_dir
+from .. import profiling
 from ..utils import Line
 
 
+T = TypeVar('T')
+
+
 DEFAULT_LINE_STYLES = [
     Line('royalblue', '--', 1.1),
     Line('tomato', '-', 1.6),
@@ -15,19 +21,133 @@ DEFAULT_LINE_STYLES = [
 ]
 
 
+def loaded_attribute(name: str, doc: str) -> property:
+    """
+    Атрибут, вычисляемый при загрузке данных (make_data): при первом обращении данные загружаются (load),
+    затем значение хранится в атрибуте '_' + name. Присваивание значения сохраняет его без загрузки
+
+    :param name: имя атрибута
+    :param doc: описание атрибута
+    """
+    private = '_' + name
+
+    def getter(self):
+        if not self._loaded:
+            self.load()
+        return getattr(self, private)
+
+    def setter(self, value) -> None:
+        setattr(self, private, value)
+
+    return property(getter, setter, doc=doc)
+
+
 class BaseRadarData(abc.ABC):
-    """Базовый Класс данных для круговых диаграмм зон R2 по углам"""
+    """
+    Базовый Класс данных для круговых диаграмм зон R2 по углам.
+    Папка и файлы данных читаются не при создании объекта, а при первом обращении: список файлов (files) -
+    при обращении к нему, данные (data, noise и т.д.) - при обращении к ним или при явном вызове load()
+    """
 
-    def __init__(self, dir_path: str):
+    # Список файлов и данные до первого обращения к ним
+    _files: Union[None, List[str], List[pathlib.Path]] = None
+    _data: Optional[pd.DataFrame] = None
+    _noise: Optional[pd.DataFrame] = None
+    _loaded: bool = False
+    _loading: bool = False
+
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None):
         """
-        Подготавливает данные о зонах R2 (на всех углах измерения) для отображения их на круговых диаграммах
+        Подготавливает данные о зонах R2 (на всех углах измерения) для отображения их на круговых диаграммах.
+        Папка и файлы не читаются до первого обращения к данным
 
         :param dir_path: путь к папке со списком файлов данных
+        :param workers: количество потоков или процессов для параллельного чтения файлов.
+        None - файлы читаются последовательно
+        :param executor: 'thread' - пул потоков (для сетевых папок), 'process' - пул процессов
+        (когда время уходит на разбор файлов)
+        :param cache: дисковый кэш разобранных файлов. None - файлы всегда читаются заново
         """
         self.dir: pathlib.Path = pathlib.Path(dir_path)
-        self.files: Union[List[str], List[pathlib.Path]] = self.read_filenames()
-        self.noise: Union[None, pd.DataFrame] = None
-        self.data: pd.DataFrame = self.make_data()
+        self.workers: Optional[int] = workers
+        self.executor: str = executor
+        self.cache: Optional[ParsedFileCache] = cache
+
+    @property
+    def files(self) -> Union[List[str], List[pathlib.Path]]:
+        """Список файлов данных (папка читается при первом обращении, файлы данных при этом не читаются)"""
+        if self._files is None:
+            with profiling.span('read_filenames') as stage:
+                self._files = self.read_filenames()
+                stage.set(files=len(self._files))
+        return self._files
+
+    @files.setter
+    def files(self, files: Union[List[str], List[pathlib.Path]]) -> None:
+        self._files = files
+
+    data = loaded_attribute('data', 'Данные для построения диаграмм (загружаются при первом обращении)')
+    noise = loaded_attribute('noise', 'Данные шумов или None (загружаются при первом обращении)')
+
+    @property
+    def loaded(self) -> bool:
+        """Загружены ли данные"""
+        return self._loaded
+
+    def load(self) -> 'BaseRadarData':
+        """
+        Прочитать папку и файлы и вычислить данные, если это еще не сделано
+
+        :return: self
+        """
+        if self._loaded or self._loading:
+            return self
+        self._loading = True
+        try:
+            with profiling.span('load', loader=type(self).__name__, dir=self.dir.name):
+                # Список файлов читается в этапе load, если к нему еще не обращались
+                self.files
+                self._noise = None
+                with profiling.span('make_data') as stage:
+                    self._data = self.make_data()
+                    if self._data is not None:
+                        stage.set(rows=len(self._data))
+            self._loaded = True
+        finally:
+            self._loading = False
+        return self
+
+    def refresh(self) -> 'BaseRadarData':
+        """
+        Забыть прочитанные список файлов и данные и загрузить их заново (например, после изменений в папке)
+
+        :return: self
+        """
+        self._files = None
+        self._data = None
+        self._noise = None
+        self._loaded = False
+        return self.load()
+
+    @classmethod
+    def _create_loaded(cls, dir_path: Union[str, pathlib.Path], files: list):
+        """
+        Создать объект без чтения папки и файлов, для данных, загружаемых в готовом виде (например, из архива).
+        Данные (data, noise и т.д.) устанавливает вызывающий
+
+        :param dir_path: путь к папке, из которой были получены данные
+        :param files: список файлов данных
+        """
+        radar_data = cls.__new__(cls)
+        radar_data.dir = pathlib.Path(dir_path)
+        radar_data.workers = None
+        radar_data.executor = 'thread'
+        radar_data.cache = None
+        radar_data.files = files
+        radar_data.noise = None
+        radar_data._loaded = True
+        return radar_data
 
     def read_filenames(self) -> List[str]:
         """
@@ -35,9 +155,72 @@ class BaseRadarData(abc.ABC):
 
         :return: список текстовых файлов
         """
-        file_list = [file.name for file in self.dir.iterdir() if file.is_file() and file.name.endswith('.txt')]
+        file_list = scan_dir(self.dir)
         return file_list
 
+    def read_files(self, files: Sequence[Union[str, pathlib.Path]],
+                   reader: Callable[[pathlib.Path], T] = read_levels_file) -> List[T]:
+        """
+        Прочитать и разобрать файлы данных, параллельно, если задано self.workers.
+        Результаты возвращаются в порядке files, независимо от порядка завершения чтения.
+        Если задан кэш self.cache, то читаются только файлы, которых в нем нет (или которые изменились).
+        Кэш хранит результаты read_levels_file, поэтому с другой функцией чтения он не используется
+
+        :param files: имена файлов в папке self.dir или пути к ним
+        :param reader: функция чтения одного файла
+        :return: список разобранных данных файлов
+        """
+        paths = [self._file_path(file) for file in files]
+        with profiling.span('read_files', files=len(paths)) as stage:
+            results = self._read_paths(paths, reader)
+            if stage and results and isinstance(results[0], LevelsFileData):
+                stage.set(rows=sum(len(file_data.freq) for file_data in results))
+        return results
+
+    def _read_paths(self, paths: List[pathlib.Path], reader: Callable[[pathlib.Path], T]) -> List[T]:
+        """Прочитать файлы, используя кэш self.cache, если он задан и файлы читаются read_levels_file"""
+        if self.cache is None or reader is not read_levels_file:
+            return map_files(reader, paths, self.workers, self.executor)
+
+        results = [self.cache.get(path) for path in paths]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        # Прочитать отсутствующие в кэше файлы и сохранить их в кэш
+        parsed = map_files(reader, [paths[i] for i in missing], self.workers, self.executor)
+        for i, file_data in zip(missing, parsed):
+            self.cache.put(paths[i], file_data)
+            results[i] = file_data
+
+        return results
+
+    def invalidate_cache(self) -> None:
+        """Удалить из кэша self.cache записи всех файлов данных, чтобы при следующей загрузке они были прочитаны заново"""
+        if self.cache is None:
+            return
+        for file in self.files:
+            self.cache.invalidate(self._file_path(file))
+
+    def update_files(self, changed: Sequence[Union[str, pathlib.Path]],
+                     removed: Sequence[Union[str, pathlib.Path]] = ()) -> Optional[List[float]]:
+        """
+        Обновить данные после добавления, изменения или удаления файлов.
+        По умолчанию список файлов читается заново и данные пересчитываются полностью.
+        Если данные еще не загружены, то забывается только список файлов
+
+        :param changed: добавленные или измененные файлы
+        :param removed: удаленные файлы
+        :return: частоты, данные которых изменились, или None, если изменились все данные
+        """
+        if self._loaded:
+            self.refresh()
+        else:
+            self._files = None
+        return None
+
+    def _file_path(self, file: Union[str, pathlib.Path]) -> pathlib.Path:
+        """Путь к файлу данных по его имени в папке self.dir (или по уже готовому пути)"""
+        return file if isinstance(file, pathlib.Path) else self.dir.joinpath(file)
+
     @abc.abstractmethod
     def make_data(self) -> pd.DataFrame:
         """
@@ -47,7 +230,7 @@ class BaseRadarData(abc.ABC):
         для всех положений (углов) измерений
 
         :return: Набор данных pandas.DataFrame с углами, в качестве индексов,
-        и R2 или Уровней, в качестве значений
+        и R2 или Уровней, в качестве значений, или None, если наследник строит data при первом обращении
         """
 
     @staticmethod
@@ -58,7 +241,7 @@ class BaseRadarData(abc.ABC):
         :param filename: имя файла
         :return: угол
         """
-        angle = np.deg2rad(float(re.findall(r'\((\d+)\)', filename)[0]))
+        angle = np.deg2rad(float(ANGLE_PATTERN.findall(filename)[0]))
         return angle
 
     @staticmethod
@@ -69,5 +252,5 @@ class BaseRadarData(abc.ABC):
         :param filename: имя файла
         :return: R2
         """
-        r2 = float(re.findall(r'\) (\d+)', filename)[0])
+        r2 = float(R2_PATTERN.findall(filename)[0])
         return r2
@@ -1,48 +1,73 @@
 import abc
 import pathlib
-from typing import List
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
 
 from .base import BaseRadarData
+from .cache import ParsedFileCache
+from .scan import FileMeta, files_table, parse_filename, scan_many_meas, split_polarisation_dir
 
 
 class BaseManyMeasData(BaseRadarData, abc.ABC):
     """ Базовый класс для данных к круговым диаграммам, читаемым из многих файлов """
 
-    def __init__(self, dir_path: str):
+    # Метаданные файлов, собранные при обходе папки: путь -> FileMeta
+    _scanned: Dict[pathlib.Path, FileMeta]
+
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None):
         """
         Перенаправляет создание объекта базовому классу
 
         :param dir_path: путь к начальной папке с данными
+        :param workers: количество потоков или процессов для параллельного чтения файлов
+        :param executor: 'thread' - пул потоков, 'process' - пул процессов
+        :param cache: дисковый кэш разобранных файлов
         """
-        BaseRadarData.__init__(self, dir_path)
+        BaseRadarData.__init__(self, dir_path, workers, executor, cache)
 
     def read_filenames(self) -> List[pathlib.Path]:
         """
-        Прочитать список файлов из заданной папки
+        Прочитать список файлов из заданной папки. Метаданные файлов (измерение, интерфейс, поляризация,
+        угол, R2) разбираются попутно и сохраняются в self._scanned
 
         :return: список текстовых файлов
         """
-        meas_dir_list = [dirname for dirname in self.dir.iterdir() if dirname.is_dir()]
+        scanned = scan_many_meas(self.dir)
+        self._scanned = {file.path: file for file in scanned}
+        return [file.path for file in scanned]
+
+    @classmethod
+    def _create_loaded(cls, dir_path: Union[str, pathlib.Path], files: list):
+        radar_data = super()._create_loaded(dir_path, files)
+        radar_data._scanned = {}
+        return radar_data
 
-        file_list = []
-        for meas_dir in meas_dir_list:
-            for polarisation in meas_dir.iterdir():
-                file_list.extend([meas_file for meas_file in polarisation.iterdir()
-                                  if meas_file.is_file() and meas_file.name.endswith('.txt')])
+    @property
+    def files_table(self) -> pd.DataFrame:
+        """Таблица метаданных файлов self.files: path, meas_name, interface, polarisation, angle, r2"""
+        return files_table([self._file_meta(file) for file in self.files])
 
-        return file_list
+    def _file_meta(self, file: pathlib.Path) -> FileMeta:
+        """Метаданные файла: собранные при обходе папки или разобранные из пути (для файлов, найденных позже)"""
+        meta = self._scanned.get(file)
+        if meta is None:
+            meas_name, polarisation_dir = file.relative_to(self.dir).parts[:2]
+            meta = FileMeta(file, meas_name, *split_polarisation_dir(polarisation_dir), *parse_filename(file.name))
+        return meta
 
     def _get_meas_name(self, file: pathlib.Path) -> str:
         """Из пути к файлу измерений получить имя измерения"""
-        return file.relative_to(self.dir).parts[0]
+        return self._file_meta(file).meas_name
 
     def _get_interface(self, file: pathlib.Path) -> str:
         """Из пути к файлу измерений получить название интерфейса"""
-        return file.relative_to(self.dir).parts[1].split(" ")[0]
+        return self._file_meta(file).interface
 
     def _get_polarisation(self, file: pathlib.Path) -> str:
         """Из пути к файлу измерений получить поляризацию"""
-        return file.relative_to(self.dir).parts[1].split(" ")[1]
+        return self._file_meta(file).polarisation
 
     def _get_filename(self, file: pathlib.Path) -> str:
         """Из пути к файлу измерений получить имя файла"""
@@ -0,0 +1,187 @@
+import collections
+import hashlib
+import os
+import pathlib
+
+import numpy as np
+from typing import Dict, Optional, OrderedDict, Set, Union
+
+from .ingest import LevelsFileData
+
+
+# Версия формата записей кэша. При изменении формата или разбора файлов старые записи не используются
+CACHE_VERSION = 1
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024   # Предельный размер кэша на диске, байт
+
+ENTRY_SUFFIX = '.npy'
+
+
+class ParsedFileCache:
+    """
+    Дисковый кэш разобранных файлов измерений. Каждый файл хранится в двоичном формате NumPy (.npy)
+    как массив из трех строк (частоты, сигналы, шумы). Запись привязана к пути файла и его размеру
+    и времени изменения (или хэшу содержимого), поэтому измененный файл будет прочитан заново.
+    При превышении max_size удаляются давно не использовавшиеся записи
+    """
+
+    def __init__(self, cache_dir: Union[str, pathlib.Path], max_size: int = DEFAULT_MAX_SIZE,
+                 validate: str = 'stat'):
+        """
+        :param cache_dir: папка для хранения кэша
+        :param max_size: предельный размер кэша на диске, байт
+        :param validate: 'stat' - запись действительна, пока не изменились размер и время изменения файла,
+        'content' - пока не изменилось содержимое файла (надежнее, но файл приходится читать целиком)
+        """
+        if validate not in ('stat', 'content'):
+            raise ValueError(f"Неизвестный способ проверки записей кэша: {validate!r}, допустимы: 'stat', 'content'")
+
+        self.dir: pathlib.Path = pathlib.Path(cache_dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.max_size: int = max_size
+        self.validate: str = validate
+        # Состояние кэша в памяти: папка просматривается один раз (при первом обращении),
+        # затем состояние ведется при чтении, записи и удалении записей.
+        # Записи по ключам путей файлов
+        self._index: Optional[Dict[str, Set[pathlib.Path]]] = None
+        # Размеры записей в порядке использования: от давно не использовавшихся к недавним
+        self._usage: Optional[OrderedDict[pathlib.Path, int]] = None
+        self._size: Optional[int] = None
+
+    def get(self, path: Union[str, pathlib.Path]) -> Optional[LevelsFileData]:
+        """
+        Получить разобранные данные файла из кэша
+
+        :param path: путь к файлу измерений
+        :return: данные файла или None, если в кэше нет действительной записи
+        """
+        entry = self._entry_path(path)
+        try:
+            array = np.load(entry, allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        # Отметить запись как недавно использованную. Запись могла быть удалена другим процессом
+        # уже после чтения - данные все равно действительны
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            pass
+        if self._usage is not None and entry in self._usage:
+            self._usage.move_to_end(entry)
+        return LevelsFileData(freq=array[0], signal=array[1], noise=array[2])
+
+    def put(self, path: Union[str, pathlib.Path], data: LevelsFileData) -> None:
+        """
+        Сохранить разобранные данные файла в кэш. Записи для прежних версий файла удаляются
+
+        :param path: путь к файлу измерений
+        :param data: разобранные данные файла
+        """
+        key = self._path_key(path)
+        for previous in list(self._entry_index().get(key, ())):
+            self._remove(previous)
+
+        entry = self._entry_path(path, key)
+        temp_entry = entry.with_suffix(f'.{os.getpid()}.tmp')
+        with open(temp_entry, 'wb') as file:
+            np.save(file, np.vstack([data.freq, data.signal, data.noise]).astype(float), allow_pickle=False)
+        # Запись появляется в кэше целиком или не появляется вовсе
+        os.replace(temp_entry, entry)
+
+        size = entry.stat().st_size
+        self._index[key] = {entry}
+        self._usage[entry] = size
+        self._size += size
+        if self._size > self.max_size:
+            self._evict()
+
+    def invalidate(self, path: Union[str, pathlib.Path, None] = None) -> None:
+        """
+        Удалить записи кэша
+
+        :param path: путь к файлу измерений, записи которого удалить. None - очистить весь кэш
+        """
+        if path is not None:
+            entries = list(self._entry_index().get(self._path_key(path), ()))
+        else:
+            # Весь кэш - вместе с записями, сделанными другими процессами
+            entries = list(self._entries())
+        for entry in entries:
+            self._remove(entry)
+
+    def clear(self) -> None:
+        """Очистить весь кэш"""
+        self.invalidate()
+
+    def size(self) -> int:
+        """Суммарный размер записей кэша на диске, байт"""
+        self._entry_index()
+        return self._size
+
+    def _evict(self) -> None:
+        """Удалять давно не использовавшиеся записи, пока размер кэша превышает max_size"""
+        while self._size > self.max_size and self._usage:
+            self._remove(next(iter(self._usage)))
+
+    def _entry_index(self) -> Dict[str, Set[pathlib.Path]]:
+        """
+        Записи кэша по ключам путей файлов. При первом обращении состояние кэша в памяти (записи,
+        их размеры и порядок использования по времени изменения) строится по содержимому папки кэша
+        """
+        if self._index is None:
+            entries = sorted(self._entries().items(), key=lambda item: item[1].st_mtime_ns)
+            self._index = {}
+            for entry, _ in entries:
+                self._index.setdefault(self._entry_key(entry), set()).add(entry)
+            self._usage = collections.OrderedDict((entry, stat.st_size) for entry, stat in entries)
+            self._size = sum(self._usage.values())
+        return self._index
+
+    def _entries(self) -> Dict[pathlib.Path, os.stat_result]:
+        """Все записи кэша и их атрибуты"""
+        entries = {}
+        for entry in self.dir.glob(f'*{ENTRY_SUFFIX}'):
+            try:
+                entries[entry] = entry.stat()
+            except FileNotFoundError:
+                pass
+        return entries
+
+    def _remove(self, entry: pathlib.Path) -> None:
+        """Удалить запись кэша (с диска и из состояния в памяти)"""
+        try:
+            entry.unlink()
+        except FileNotFoundError:
+            pass
+        if self._index is None:
+            return
+        self._size -= self._usage.pop(entry, 0)
+        entries = self._index.get(self._entry_key(entry))
+        if entries is not None:
+            entries.discard(entry)
+            if not entries:
+                del self._index[self._entry_key(entry)]
+
+    def _entry_path(self, path: Union[str, pathlib.Path], key: Optional[str] = None) -> pathlib.Path:
+        """Путь к записи кэша для текущего состояния файла (key - ключ пути файла, если уже вычислен)"""
+        return self.dir.joinpath(f'{key or self._path_key(path)}-{self._state_key(path)}{ENTRY_SUFFIX}')
+
+    @staticmethod
+    def _entry_key(entry: pathlib.Path) -> str:
+        """Ключ пути файла по имени записи кэша"""
+        return entry.name.split('-', 1)[0]
+
+    @staticmethod
+    def _path_key(path: Union[str, pathlib.Path]) -> str:
+        """Ключ файла по его абсолютному пути"""
+        return hashlib.sha1(str(pathlib.Path(path).resolve()).encode('utf-8')).hexdigest()
+
+    def _state_key(self, path: Union[str, pathlib.Path]) -> str:
+        """Ключ состояния файла: размер и время изменения либо хэш содержимого"""
+        if self.validate == 'content':
+            state = hashlib.sha1(pathlib.Path(path).read_bytes()).hexdigest()
+        else:
+            stat = os.stat(path)
+            state = f'{stat.st_size}:{stat.st_mtime_ns}'
+        return hashlib.sha1(f'{CACHE_VERSION}:{state}'.encode('utf-8')).hexdigest()[:16]
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List
+
+
+class ColumnarBuilder:
+    """
+    Накопитель данных по столбцам. Данные каждого файла добавляются в списки массивов,
+    а итоговый DataFrame собирается один раз в to_frame(), без копирования всей таблицы
+    при добавлении каждого файла (как при pd.concat или data.loc[len(data)] в цикле)
+    """
+
+    def __init__(self, columns: List[str], categorical: Iterable[str] = ()):
+        """
+        :param columns: имена столбцов итогового DataFrame
+        :param categorical: столбцы с повторяющимися строковыми метаданными (имя измерения,
+        интерфейс, поляризация), которые хранятся как коды категорий
+        """
+        self.columns: List[str] = list(columns)
+        self.categorical = set(categorical)
+
+        self._chunks: Dict[str, List[np.ndarray]] = {name: [] for name in self.columns}
+        self._rows: Dict[str, list] = {name: [] for name in self.columns}
+        self._categories: Dict[str, Dict[str, int]] = {name: {} for name in self.categorical}
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append_row(self, **values) -> None:
+        """
+        Добавить одну строку данных
+
+        :param values: значения всех столбцов строки
+        """
+        for name in self.columns:
+            self._rows[name].append(self._encode(name, values[name]))
+        self._length += 1
+
+    def append_block(self, **values) -> None:
+        """
+        Добавить блок строк (например, все строки одного файла). Массивы добавляются как есть,
+        а скалярные значения (метаданные файла) растягиваются на длину блока
+
+        :param values: массивы или скалярные значения всех столбцов блока
+        """
+        self._flush_rows()
+
+        lengths = {len(value) for value in values.values() if np.ndim(value) > 0}
+        if len(lengths) > 1:
+            raise ValueError(f'Массивы блока имеют разную длину: {sorted(lengths)}')
+        length = lengths.pop() if lengths else 1
+
+        for name in self.columns:
+            value = values[name]
+            if np.ndim(value) == 0:
+                chunk = np.full(length, self._encode(name, value))
+            else:
+                chunk = np.asarray(value)
+            self._chunks[name].append(chunk)
+        self._length += length
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Собрать накопленные данные в DataFrame
+
+        :return: DataFrame со столбцами self.columns, метаданные - в виде категорий
+        """
+        self._flush_rows()
+
+        data = {}
+        for name in self.columns:
+            chunks = self._chunks[name]
+            if name in self.categorical:
+                codes = np.concatenate(chunks) if chunks else np.array([], dtype=np.int32)
+                data[name] = self._decode(name, codes)
+            else:
+                data[name] = np.concatenate(chunks) if chunks else np.array([], dtype=float)
+
+        return pd.DataFrame(data, columns=self.columns)
+
+    def _encode(self, name: str, value):
+        """Для категориального столбца вернуть код значения, для остальных - само значение"""
+        if name not in self.categorical:
+            return value
+        return self._categories[name].setdefault(value, len(self._categories[name]))
+
+    def _decode(self, name: str, codes: np.ndarray) -> pd.Categorical:
+        """
+        Преобразовать коды в категории. Категории упорядочиваются по значению, чтобы
+        группировка по ним шла в том же порядке, что и по строкам
+        """
+        categories = sorted(self._categories[name])
+        remap = np.empty(len(categories), dtype=np.int32)
+        for new_code, category in enumerate(categories):
+            remap[self._categories[name][category]] = new_code
+        return pd.Categorical.from_codes(remap[codes], categories=categories)
+
+    def _flush_rows(self) -> None:
+        """Перенести построчно добавленные значения в списки массивов"""
+        if not self._rows[self.columns[0]]:
+            return
+        for name in self.columns:
+            self._chunks[name].append(np.asarray(self._rows[name]))
+            self._rows[name] = []
@@ -0,0 +1,78 @@
+import concurrent.futures
+import pathlib
+
+import numpy as np
+from typing import Callable, List, NamedTuple, Optional, Sequence, TypeVar, Union
+
+from ..navigator import read_navigator_file
+
+
+T = TypeVar('T')
+
+# Пулы для параллельного чтения файлов: потоки - когда упираемся в ввод-вывод (сетевые папки),
+# процессы - когда упираемся в разбор текста
+EXECUTORS = {
+    'thread': concurrent.futures.ThreadPoolExecutor,
+    'process': concurrent.futures.ProcessPoolExecutor,
+}
+
+
+class LevelsFileData(NamedTuple):
+    """Данные одного файла измерений уровней: частоты, уровни сигнала и шума"""
+    freq: np.ndarray
+    signal: np.ndarray
+    noise: np.ndarray
+
+
+def read_levels_file(path: Union[str, pathlib.Path]) -> LevelsFileData:
+    """
+    Прочитать частоты, уровни сигнала и шума из файла измерений Навигатора
+    специализированным разборщиком формата
+
+    :param path: путь к файлу
+    :return: массивы частот, сигналов и шумов
+    """
+    freq, signal, noise = read_navigator_file(path)
+    return LevelsFileData(freq=freq, signal=signal, noise=noise)
+
+
+def read_levels_file_pandas(path: Union[str, pathlib.Path]) -> LevelsFileData:
+    """
+    Прочитать частоты, уровни сигнала и шума из файла измерений Навигатора с помощью pandas.read_csv
+    (прежний способ чтения, медленнее read_levels_file)
+
+    :param path: путь к файлу
+    :return: массивы частот, сигналов и шумов
+    """
+    import pandas as pd
+
+    file_dataframe = pd.read_csv(path, sep='\t', encoding='cp1251',
+                                 usecols=[1, 2, 3], skiprows=2, names=['freq', 'signal', 'noise'])
+    return LevelsFileData(freq=file_dataframe['freq'].to_numpy(),
+                          signal=file_dataframe['signal'].to_numpy(),
+                          noise=file_dataframe['noise'].to_numpy())
+
+
+def map_files(func: Callable[..., T], files: Sequence, workers: Optional[int] = None,
+              executor: str = 'thread') -> List[T]:
+    """
+    Применить func к каждому файлу списка. При workers > 1 файлы обрабатываются параллельно,
+    но результаты всегда возвращаются в порядке files, поэтому итог не зависит от того,
+    в каком порядке завершилась обработка
+
+    :param func: функция обработки одного файла (для пула процессов - функция уровня модуля)
+    :param files: список файлов
+    :param workers: количество потоков или процессов. None или 1 - последовательная обработка
+    :param executor: 'thread' - пул потоков, 'process' - пул процессов
+    :return: список результатов в порядке files
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f'Неизвестный тип пула: {executor!r}, допустимы: {", ".join(EXECUTORS)}')
+
+    if workers is None or workers <= 1 or len(files) < 2:
+        return [func(file) for file in files]
+
+    # Для пула процессов файлы передаются пачками, чтобы не платить за пересылку каждого файла
+    chunksize = max(1, len(files) // (workers * 4))
+    with EXECUTORS[executor](max_workers=workers) as pool:
+        return list(pool.map(func, files, chunksize=chunksize))
@@ -0,0 +1,315 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .ingest import LevelsFileData
+from ..frequencies import DEFAULT_TOLERANCE, FrequencyClusters, FrequencyTolerance
+
+
+# Навигатор записывает уровни с точностью 0.01 дБ, поэтому уровни хранятся во float32
+# и при расчетах восстанавливаются округлением до LEVEL_DECIMALS знаков без потери точности
+LEVEL_DECIMALS = 2
+CUBE_DTYPE = np.float32
+
+
+class MeasFileRecord:
+    """Метаданные одного файла измерений, разобранные из его пути"""
+
+    __slots__ = ('path', 'meas_name', 'interface', 'polarisation', 'angle', 'r2')
+
+    def __init__(self, path: Union[str, pathlib.Path], meas_name: str, interface: str,
+                 polarisation: str, angle: float, r2: float):
+        """
+        :param path: путь к файлу
+        :param meas_name: имя измерения (папки с измерением)
+        :param interface: название интерфейса
+        :param polarisation: поляризация
+        :param angle: угол, на котором проводились измерения, рад
+        :param r2: рассчитанная зона R2
+        """
+        self.path = path
+        self.meas_name = meas_name
+        self.interface = interface
+        self.polarisation = polarisation
+        self.angle = angle
+        self.r2 = r2
+
+    def __repr__(self) -> str:
+        return (f'MeasFileRecord(meas_name={self.meas_name!r}, interface={self.interface!r}, '
+                f'polarisation={self.polarisation!r}, angle={self.angle!r}, r2={self.r2!r})')
+
+
+class LevelsCube:
+    """
+    Компактное представление данных уровней многих измерений: плотные кубы float32 с осями
+    (измерение, поляризация, угол, частота) для сигналов, шумов и R2 и таблицы значений осей.
+    Частоты разных файлов совмещаются по допуску (см. frequencies): ось частот - канонические частоты
+    кластеров, крайние частоты кластеров хранятся для последующего дополнения куба.
+    Отсутствующие данные - NaN. Если в одну ячейку попадают несколько строк файлов
+    (частоты одного кластера, несколько интерфейсов), то хранится максимальное значение
+    """
+
+    __slots__ = ('meas_names', 'polarisations', 'angles', 'frequencies', 'interfaces',
+                 'signal', 'noise', 'r2', 'records', 'freq_low', 'freq_high')
+
+    def __init__(self, meas_names: Sequence[str], polarisations: Sequence[str], angles: np.ndarray,
+                 frequencies: np.ndarray, interfaces: np.ndarray, signal: np.ndarray, noise: np.ndarray,
+                 r2: np.ndarray, records: List[MeasFileRecord] = None,
+                 freq_low: Optional[np.ndarray] = None, freq_high: Optional[np.ndarray] = None):
+        """
+        :param meas_names: имена измерений (ось 0)
+        :param polarisations: поляризации (ось 1)
+        :param angles: углы, рад (ось 2)
+        :param frequencies: частоты (ось 3)
+        :param interfaces: названия интерфейсов для каждой пары (измерение, поляризация)
+        :param signal: куб уровней сигнала
+        :param noise: куб уровней шума
+        :param r2: куб зон R2
+        :param records: метаданные файлов, из которых собран куб
+        :param freq_low: наименьшие частоты кластеров частот (по умолчанию - frequencies)
+        :param freq_high: наибольшие частоты кластеров частот (по умолчанию - frequencies)
+        """
+        self.meas_names: List[str] = list(meas_names)
+        self.polarisations: List[str] = list(polarisations)
+        self.angles: np.ndarray = np.asarray(angles, dtype=np.float64)
+        self.frequencies: np.ndarray = np.asarray(frequencies, dtype=np.float64)
+        self.interfaces: np.ndarray = interfaces
+        self.signal: np.ndarray = signal
+        self.noise: np.ndarray = noise
+        self.r2: np.ndarray = r2
+        self.records: List[MeasFileRecord] = records if records is not None else []
+        self.freq_low: np.ndarray = np.asarray(freq_low if freq_low is not None else self.frequencies, dtype=np.float64)
+        self.freq_high: np.ndarray = np.asarray(freq_high if freq_high is not None else self.frequencies,
+                                                dtype=np.float64)
+
+    @classmethod
+    def from_files(cls, records: List[MeasFileRecord], files_data: List[LevelsFileData],
+                   tolerance: FrequencyTolerance = DEFAULT_TOLERANCE) -> 'LevelsCube':
+        """
+        Собрать куб из метаданных и разобранных данных файлов
+
+        :param records: метаданные файлов
+        :param files_data: данные файлов в том же порядке, что и records
+        :param tolerance: допуск совмещения частот разных файлов
+        :return: куб данных
+        """
+        meas_names = sorted({record.meas_name for record in records})
+        polarisations = sorted({record.polarisation for record in records})
+        angles = np.unique(np.array([record.angle for record in records], dtype=np.float64))
+        clusters = FrequencyClusters.from_frequencies([file_data.freq for file_data in files_data], tolerance)
+        frequencies = clusters.centres
+
+        shape = (len(meas_names), len(polarisations), len(angles), len(frequencies))
+        meas_index = {name: i for i, name in enumerate(meas_names)}
+        polarisation_index = {name: i for i, name in enumerate(polarisations)}
+
+        interfaces = np.full(shape[:2], '', dtype=object)
+
+        # Линейные номера ячеек куба для всех строк всех файлов
+        cells, signals, noises, r2s = [], [], [], []
+        for record, file_data in zip(records, files_data):
+            m = meas_index[record.meas_name]
+            p = polarisation_index[record.polarisation]
+            a = np.searchsorted(angles, record.angle)
+            base = ((m * shape[1] + p) * shape[2] + a) * shape[3]
+            cells.append(base + clusters.positions(file_data.freq))
+            signals.append(file_data.signal)
+            noises.append(file_data.noise)
+            r2s.append(np.full(len(file_data.freq), record.r2, dtype=np.float64))
+
+            if record.interface not in interfaces[m, p].split(','):
+                interfaces[m, p] = ','.join(filter(None, [interfaces[m, p], record.interface]))
+
+        cells = np.concatenate(cells) if cells else np.array([], dtype=np.intp)
+        return cls(meas_names, polarisations, angles, frequencies, interfaces,
+                   signal=_scatter_max(shape, cells, np.concatenate(signals) if signals else np.array([])),
+                   noise=_scatter_max(shape, cells, np.concatenate(noises) if noises else np.array([])),
+                   r2=_scatter_max(shape, cells, np.concatenate(r2s) if r2s else np.array([])),
+                   records=list(records), freq_low=clusters.low, freq_high=clusters.high)
+
+    @property
+    def shape(self) -> tuple:
+        """Размер куба (измерения, поляризации, углы, частоты)"""
+        return self.signal.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Объем памяти, занимаемый кубами и осями, байт"""
+        return (self.signal.nbytes + self.noise.nbytes + self.r2.nbytes
+                + self.angles.nbytes + self.frequencies.nbytes)
+
+    def values(self, name: str, angles=slice(None)) -> np.ndarray:
+        """
+        Значения куба в float64, восстановленные до точности исходных данных
+
+        :param name: 'signal', 'noise' или 'r2'
+        :param angles: номера углов (по умолчанию - все углы)
+        """
+        return np.round(getattr(self, name)[:, :, angles].astype(np.float64), LEVEL_DECIMALS)
+
+    def max_over_polarisations(self, name: str, angles=slice(None)) -> np.ndarray:
+        """
+        Максимум значений по поляризациям для каждого (измерения, угла, частоты)
+
+        :param name: 'signal', 'noise' или 'r2'
+        :param angles: номера углов (по умолчанию - все углы)
+        :return: массив (измерение, угол, частота)
+        """
+        return np.fmax.reduce(self.values(name, angles), axis=1)
+
+    def mean_over_meas(self, name: str, angles=slice(None)) -> np.ndarray:
+        """
+        Среднее по измерениям максимумов по поляризациям для каждого (угла, частоты) без учета пропусков.
+        Суммирование с компенсацией (Кэхэна) в порядке имен измерений - как при группировке pandas,
+        поэтому результат совпадает с groupby(['angle', 'freq']).mean() по длинной таблице
+
+        :param name: 'signal', 'noise' или 'r2'
+        :param angles: номера углов (по умолчанию - все углы)
+        :return: массив (угол, частота), NaN - нет данных
+        """
+        values = self.max_over_polarisations(name, angles)
+
+        total = np.zeros(values.shape[1:])
+        compensation = np.zeros(values.shape[1:])
+        count = np.zeros(values.shape[1:], dtype=np.int64)
+        for meas_values in values:
+            present = ~np.isnan(meas_values)
+            y = meas_values - compensation
+            t = total + y
+            compensation = np.where(present, t - total - y, compensation)
+            total = np.where(present, t, total)
+            count += present
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / count, np.nan)
+
+    def frequency_clusters(self, tolerance: FrequencyTolerance = DEFAULT_TOLERANCE) -> FrequencyClusters:
+        """Кластеры частот оси частот куба"""
+        return FrequencyClusters(self.freq_low, self.freq_high, tolerance)
+
+    def replace_groups(self, records: List[MeasFileRecord], files_data: List[LevelsFileData],
+                       tolerance: FrequencyTolerance = DEFAULT_TOLERANCE) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Заменить данные групп (измерение, поляризация, угол) данными заново прочитанных файлов.
+        Остальные группы не пересчитываются. Если в файлах есть новые измерения, поляризации, углы
+        или частоты, то оси куба расширяются, а прежние данные переносятся в расширенный куб
+
+        :param records: метаданные всех файлов изменившихся групп
+        :param files_data: данные файлов в том же порядке, что и records
+        :param tolerance: допуск совмещения частот
+        :return: номера углов и маска частот, данные которых изменились,
+                 или None, если изменились оси куба (изменилось все)
+        """
+        axes_changed = self._extend_axes(records, [file_data.freq for file_data in files_data], tolerance)
+        clusters = self.frequency_clusters(tolerance)
+
+        meas_index = {name: i for i, name in enumerate(self.meas_names)}
+        polarisation_index = {name: i for i, name in enumerate(self.polarisations)}
+
+        groups = {}
+        for record, file_data in zip(records, files_data):
+            group = (meas_index[record.meas_name], polarisation_index[record.polarisation],
+                     int(np.searchsorted(self.angles, record.angle)))
+            groups.setdefault(group, []).append((record, file_data))
+
+        changed_frequencies = np.zeros(len(self.frequencies), dtype=bool)
+        for (m, p, a), group in groups.items():
+            changed_frequencies |= ~np.isnan(self.r2[m, p, a])
+
+            cells = np.concatenate([clusters.positions(data.freq) for _, data in group])
+            shape = (len(self.frequencies),)
+            self.signal[m, p, a] = _scatter_max(shape, cells, np.concatenate([data.signal for _, data in group]))
+            self.noise[m, p, a] = _scatter_max(shape, cells, np.concatenate([data.noise for _, data in group]))
+            self.r2[m, p, a] = _scatter_max(shape, cells, np.concatenate(
+                [np.full(len(data.freq), record.r2, dtype=np.float64) for record, data in group]))
+
+            changed_frequencies |= ~np.isnan(self.r2[m, p, a])
+            for record, _ in group:
+                if record.interface not in self.interfaces[m, p].split(','):
+                    self.interfaces[m, p] = ','.join(filter(None, [self.interfaces[m, p], record.interface]))
+
+        if axes_changed:
+            return None
+        return np.unique([a for _, _, a in groups]), changed_frequencies
+
+    def _extend_axes(self, records: List[MeasFileRecord], file_frequencies: List[np.ndarray],
+                     tolerance: FrequencyTolerance) -> bool:
+        """
+        Расширить оси куба значениями из файлов, перенеся прежние данные на новые позиции.
+        Новые частоты могут расширить кластеры частот (изменив их канонические частоты) и объединить
+        соседние кластеры - тогда в ячейке остается максимальное из прежних значений
+
+        :return: изменились ли оси
+        """
+        meas_names = sorted(set(self.meas_names) | {record.meas_name for record in records})
+        polarisations = sorted(set(self.polarisations) | {record.polarisation for record in records})
+        angles = np.unique(np.concatenate([self.angles, [record.angle for record in records]]))
+        clusters, f = self.frequency_clusters(tolerance).extend(file_frequencies)
+
+        if (meas_names == self.meas_names and polarisations == self.polarisations
+                and len(angles) == len(self.angles) and np.array_equal(clusters.centres, self.frequencies)):
+            return False
+
+        # Позиции прежних значений осей в расширенных осях
+        m = np.searchsorted(meas_names, self.meas_names) if self.meas_names else np.array([], dtype=np.intp)
+        p = np.searchsorted(polarisations, self.polarisations) if self.polarisations else np.array([], dtype=np.intp)
+        a = np.searchsorted(angles, self.angles)
+        index = np.ix_(m, p, a, f)
+
+        shape = (len(meas_names), len(polarisations), len(angles), len(clusters))
+        for name in ['signal', 'noise', 'r2']:
+            cube = np.full(shape, np.nan, dtype=CUBE_DTYPE)
+            np.fmax.at(cube, index, getattr(self, name))
+            setattr(self, name, cube)
+
+        interfaces = np.full(shape[:2], '', dtype=object)
+        interfaces[np.ix_(m, p)] = self.interfaces
+        self.interfaces = interfaces
+
+        self.meas_names, self.polarisations = meas_names, polarisations
+        self.angles, self.frequencies = angles, clusters.centres
+        self.freq_low, self.freq_high = clusters.low, clusters.high
+        return True
+
+    def present_angles(self) -> np.ndarray:
+        """Маска углов, для которых в файлах есть хотя бы одна строка данных"""
+        return ~np.isnan(self.r2).all(axis=(0, 1, 3))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Длинная таблица данных куба: по строке на каждую заполненную ячейку
+        (measurement, polarisation, angle, freq)
+
+        :return: DataFrame со столбцами meas_name, interface, polarisation, angle, freq, signal, noise, R2
+        """
+        m, p, a, f = np.nonzero(~np.isnan(self.r2))
+        return pd.DataFrame({
+            'meas_name': pd.Categorical.from_codes(m, categories=self.meas_names),
+            'interface': pd.Categorical(self.interfaces[m, p]),
+            'polarisation': pd.Categorical.from_codes(p, categories=self.polarisations),
+            'angle': self.angles[a],
+            'freq': self.frequencies[f],
+            'signal': self.values('signal')[m, p, a, f],
+            'noise': self.values('noise')[m, p, a, f],
+            'R2': self.values('r2')[m, p, a, f],
+        })
+
+
+def _scatter_max(shape: tuple, cells: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Разложить значения по ячейкам плотного куба, оставляя в каждой ячейке максимальное значение
+
+    :param shape: размер куба
+    :param cells: линейные номера ячеек для значений
+    :param values: значения
+    :return: куб CUBE_DTYPE, NaN - нет значений
+    """
+    cube = np.full(int(np.prod(shape)), np.nan, dtype=CUBE_DTYPE)
+    if len(cells):
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+        cube[sorted_cells[starts]] = np.fmax.reduceat(values[order].astype(np.float64), starts)
+    return cube.reshape(shape)
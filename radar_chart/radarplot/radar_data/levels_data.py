@@ -1,11 +1,12 @@
-import os
-
 import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Optional
 
-from .base import BaseRadarData
-from ..utils import make_unique_frequency_list
+from .base import BaseRadarData, loaded_attribute
+from .cache import ParsedFileCache
+from .. import profiling
+from ..frequencies import EXACT, FrequencyClusters, FrequencyTolerance
+from ..utils import fill_missing_levels
 
 
 MIN_VALUE = 0
@@ -15,32 +16,33 @@ class RadarDataLevels(BaseRadarData):
     """Класс данных для круговых диаграмм уровней излучений, измеренных в различных
     направлениях от изделия"""
 
-    def __init__(self, dir_path: str):
+    frequencies = loaded_attribute('frequencies', 'Список всех частот из всех файлов (загружается при первом обращении)')
+    # Допуск совмещения частот разных файлов (по умолчанию совмещаются только совпадающие частоты)
+    frequency_tolerance: FrequencyTolerance = EXACT
+
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None, frequency_tolerance: Optional[FrequencyTolerance] = None):
         """
         Подготавливает данные об уровнях излучений (на всех углах измерений) из папки dir_path
         для отображения их на круговых диаграммах
         :param dir_path: путь к папке со списком файлов данных
+        :param workers: количество потоков или процессов для параллельного чтения файлов
+        :param executor: 'thread' - пул потоков, 'process' - пул процессов
+        :param cache: дисковый кэш разобранных файлов
+        :param frequency_tolerance: допуск совмещения частот разных файлов (по умолчанию EXACT - без допуска)
         """
-        BaseRadarData.__init__(self, dir_path)
+        if frequency_tolerance is not None:
+            self.frequency_tolerance = frequency_tolerance
+        BaseRadarData.__init__(self, dir_path, workers, executor, cache)
 
     def read_frequency_set(self) -> List[float]:
         """
         Получить список всех частот, на которых обнаружены сигналы, из всех файлов с данными
+        (канонические частоты кластеров, совмещенных с допуском frequency_tolerance).
+        Список частот составляется попутно при чтении файлов в make_data, повторно файлы не читаются
         :return: список частот
         """
-
-        frequency_list = []
-        # Прочитать все файлы с данными из папки self.dir и из каждого прочитать список частот
-        for filename in self.files:
-            frequencies = pd.read_csv(os.path.join(self.dir, filename), sep='\t', encoding='cp1251', usecols=[1],
-                                      skiprows=1, index_col=0)
-
-            # Каждый набор частот добавить в список
-            frequency_list.append(frequencies)
-        # Оставляем только уникальные частоты в списке
-        frequency_list = make_unique_frequency_list(frequency_list)
-
-        return sorted(frequency_list)
+        return list(self.frequencies)
 
     def make_data(self) -> pd.DataFrame:
         """
@@ -51,51 +53,40 @@ class RadarDataLevels(BaseRadarData):
         :return: ДатаСерия с углами, в качестве индексов, и уровнями сигнала, в качестве значений
         """
 
-        # Получить список всех частот из всех файлов
-        # self.frequencies = self.read_frequency_set()
+        # Прочитать все файлы (параллельно, если задано self.workers)
+        files_data = self.read_files(self.files)
 
-        # # Инициировать DataFrame сигналов и шумов с частотами в качестве индексов
-        # signal_data = pd.DataFrame(index=np.array(self.frequencies))
-        # noise_data = pd.DataFrame(index=np.array(self.frequencies))
+        # Список всех частот из всех файлов: частоты разных файлов, отличающиеся не больше допуска, совмещаются
+        clusters = FrequencyClusters.from_frequencies([file_data.freq for file_data in files_data],
+                                                      self.frequency_tolerance)
+        self.frequencies = clusters.centres.tolist()
+        frequencies = pd.Index(self.frequencies, name='freq')
 
-        signal_data = pd.DataFrame()
-        noise_data = pd.DataFrame()
-
-        # Перебрать все файлы и составить датафреймы сигналов и шумов
-        for filename in self.files:
+        # Перебрать все файлы и составить столбцы сигналов и шумов по общему списку частот
+        signal_columns = {}
+        noise_columns = {}
+        for filename, file_data in zip(self.files, files_data):
             # получить величину угла из названия файла
             angle = self.get_angle_from_filename(filename)
 
-            # прочитать данные частоты, уровня сигнала и шума из файла
-            # частоты установить в качестве индексов DataFrame
-            file_dataframe = pd.read_csv(os.path.join(self.dir, filename), sep='\t', encoding='cp1251',
-                                         usecols=[1, 2, 3], skiprows=2, index_col=0, names=['freq', 'signal', 'noise'])
-
-            # заполнить ДатаФреймы сигналов и шумов
-            signals = file_dataframe['signal']
-            noises = file_dataframe['noise']
-            signal_data[angle] = signals
-            noise_data[angle] = noises
-
-        # Пересмотреть все данные в ДатаФрейме шумов(noise_data), и вместо значений NaN установить
-        # значение максимального шума на этой частоте с других направлений
-        # Значение шума не должно быть ниже MIN_VALUE
-        for angle in noise_data:
-            for frequency in noise_data[angle].index.values:
-                if np.isnan(noise_data[angle][frequency]):
-                    noise_data[angle][frequency] = noise_data.loc[frequency].max()
-                if noise_data[angle][frequency] < MIN_VALUE:
-                    noise_data[angle][frequency] = MIN_VALUE
-
-        # Пересмотреть все данные в ДатаФрейме сигналов(signal_data), и
-        # вместо значений NaN установить значение MIN_VALUE
-        # Значение сигнала не должно быть ниже MIN_VALUE
-        for angle in signal_data:
-            for frequency in signal_data[angle].index.values:
-                if np.isnan(signal_data[angle][frequency]):
-                    signal_data[angle][frequency] = min(MIN_VALUE, noise_data.loc[frequency].max() - 10)
-                if signal_data[angle][frequency] < MIN_VALUE:
-                    signal_data[angle][frequency] = MIN_VALUE
+            # положения частот файла в общем списке частот (совмещенные частоты файла - максимальный уровень)
+            positions = clusters.positions(file_data.freq)
+
+            signal_columns[angle] = np.full(len(frequencies), np.nan)
+            np.fmax.at(signal_columns[angle], positions, file_data.signal)
+            noise_columns[angle] = np.full(len(frequencies), np.nan)
+            np.fmax.at(noise_columns[angle], positions, file_data.noise)
+
+        # ДатаФреймы сигналов и шумов с частотами в качестве индексов
+        with profiling.span('aggregate'):
+            signal_data = pd.DataFrame(signal_columns, index=frequencies)
+            noise_data = pd.DataFrame(noise_columns, index=frequencies)
+
+        # Вместо значений NaN в ДатаФрейме шумов(noise_data) установить значение максимального шума
+        # на этой частоте с других направлений, а в ДатаФрейме сигналов(signal_data) - значение MIN_VALUE.
+        # Значения шума и сигнала не должны быть ниже MIN_VALUE
+        with profiling.span('fill_missing'):
+            signal_data, noise_data = fill_missing_levels(signal_data, noise_data, MIN_VALUE)
 
         data_s = signal_data.sort_index().T.sort_index()
         data_n = noise_data.sort_index().T.sort_index()
@@ -1,134 +1,311 @@
 import math
 import os
+import pathlib
 
 import numpy as np
 import pandas as pd
-from typing import List
+from typing import Dict, Iterator, List, Optional, Sequence, Union
 
+from . import archive, streaming
+from .. import profiling
+from ..frequencies import DEFAULT_TOLERANCE, FrequencyTolerance
+from .base import loaded_attribute
 from .base_many_meas_data import BaseManyMeasData
-from ..utils import make_unique_frequency_list
+from .cache import ParsedFileCache
+from .levels_cube import LevelsCube, MeasFileRecord
+from ..utils import fill_missing_levels
 
 
 MIN_VALUE = 0
-FREQ_ROUNDING = 0
 
 
 class RadarDataLevelsManyMeas(BaseManyMeasData):
     """Класс данных для круговых диаграмм уровней излучений, измеренных в различных
     направлениях от изделия для множества измерений"""
 
-    output_data: pd.DataFrame
-    max_r2: int
+    frequencies = loaded_attribute('frequencies', 'Список всех частот из всех файлов (загружается при первом обращении)')
+    cube = loaded_attribute('cube', 'Куб уровней LevelsCube (загружается при первом обращении)')
+    # Допуск совмещения частот разных файлов
+    frequency_tolerance: FrequencyTolerance = DEFAULT_TOLERANCE
+    _means: Dict[str, np.ndarray]
+    _output_data: Optional[pd.DataFrame] = None
+    _max_r2: Optional[int] = None
 
-    def __init__(self, dir_path: str):
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None, frequency_tolerance: Optional[FrequencyTolerance] = None):
         """
         Подготавливает данные об уровнях излучений (на всех углах измерений) из папки dir_path
         для отображения их на круговых диаграммах
         :param dir_path: путь к папке со списком файлов данных
+        :param workers: количество потоков или процессов для параллельного чтения файлов
+        :param executor: 'thread' - пул потоков, 'process' - пул процессов
+        :param cache: дисковый кэш разобранных файлов
+        :param frequency_tolerance: допуск совмещения частот разных файлов (по умолчанию DEFAULT_TOLERANCE)
         """
-        BaseManyMeasData.__init__(self, dir_path)
+        if frequency_tolerance is not None:
+            self.frequency_tolerance = frequency_tolerance
+        BaseManyMeasData.__init__(self, dir_path, workers, executor, cache)
 
     def read_frequency_set(self) -> List[float]:
         """
         Получить список всех частот, на которых обнаружены сигналы, из всех файлов с данными
+        (канонические частоты кластеров, совмещенных с допуском frequency_tolerance).
+        Список частот составляется попутно при чтении файлов в make_data, повторно файлы не читаются
         :return: список частот
         """
+        return list(self.frequencies)
 
-        frequency_list = []
-        # Прочитать все файлы с данными из папки self.dir и из каждого прочитать список частот
-        for filename in self.files:
-            frequencies = pd.read_csv(os.path.join(self.dir, filename), sep='\t', encoding='cp1251', usecols=[1],
-                                      skiprows=1, index_col=0)
+    def make_data(self) -> None:
+        """
+        Читает имя каждого файла из списка self.files парсит в нем угол, на котором проводились измерения,
+        и измеренный уровень сигнала. Из этих данных формирует куб уровней и средние по измерениям значения.
+        ДатаФреймы data и noise строятся из средних при первом обращении к ним
+
+        :return: None - данные вычисляются при первом обращении
+        """
+
+        # Прочитать все файлы (параллельно, если задано self.workers)
+        files_data = self.read_files(self.files)
+
+        # Разобрать метаданные каждого файла из его пути
+        records = [self._make_record(file) for file in self.files]
+
+        # Разложить данные всех файлов в куб (измерение, поляризация, угол, частота)
+        with profiling.span('cube') as stage:
+            self.cube = LevelsCube.from_files(records, files_data, self.frequency_tolerance)
+            stage.set(cells=int(np.prod(self.cube.shape)))
 
-            # Каждый набор частот добавить в список
-            frequency_list.append(frequencies)
-        # Оставляем только уникальные частоты в списке
-        frequency_list = make_unique_frequency_list(frequency_list)
+        # Средние по измерениям значения (максимальные по поляризациям) для каждого угла и частоты
+        with profiling.span('aggregate'):
+            self._means = {name: self.cube.mean_over_meas(name) for name in ['signal', 'noise', 'r2']}
 
-        return sorted(frequency_list)
+        self._reset_frames()
+        return None
 
-    def make_data(self) -> pd.DataFrame:
+    def update_files(self, changed: Sequence[pathlib.Path],
+                     removed: Sequence[pathlib.Path] = ()) -> Optional[List[float]]:
         """
-        Читает имя каждого файла из списка self.files парсит в нем угол, на котором проводились измерения,
-        и измеренный уровень сигнала. Из этих данных формирует ДатаФрейм для всех положений (углов) измерений
-        и для всех частот, на которых обнаружены сигналы
-
-        :return: ДатаСерия с углами, в качестве индексов, и уровнями сигнала, в качестве значений
-        """
-
-        # # Инициировать DataFrame
-        raw_data = pd.DataFrame(columns=['meas_name', 'interface', 'polarisation', 'angle', 'freq',
-                                         'signal', 'noise', 'R2'])
-
-        # Перебрать все файлы и составить датафреймы сигналов и шумов
-        for file in self.files:
-            # получить величину угла из названия файла
-            meas_name = self._get_meas_name(file)
-            interface = self._get_interface(file)
-            polarisation = self._get_polarisation(file)
-            filename = self._get_filename(file)
-            angle = self.get_angle_from_filename(filename)
-            r2 = self.get_r2_from_filename(filename)
-
-            # прочитать данные частоты, уровня сигнала и шума из файла
-            # частоты установить в качестве индексов DataFrame
-            file_dataframe = pd.read_csv(file, sep='\t', encoding='cp1251',
-                                         usecols=[1, 2, 3], skiprows=2, names=['freq', 'signal', 'noise'])
-            file_dataframe['meas_name'] = meas_name
-            file_dataframe['interface'] = interface
-            file_dataframe['polarisation'] = polarisation
-            file_dataframe['angle'] = angle
-            file_dataframe['freq'] = file_dataframe['freq'].round(FREQ_ROUNDING)
-            file_dataframe['R2'] = r2
-            raw_data = pd.concat([raw_data, file_dataframe], ignore_index=True)
-
-        grouped = raw_data.groupby(['meas_name', 'angle', 'freq'],
-                                   as_index=False).max()[['meas_name', 'angle', 'freq', 'signal', 'noise', 'R2']]
-
-        df_after_grouped = pd.DataFrame(grouped)
-        data_for_output = df_after_grouped.groupby(['angle', 'freq'])[['signal', 'noise']].mean().round(1)
-        data_for_output = data_for_output.groupby('freq').max()
-
-        r2_for_output = df_after_grouped.groupby(['angle', 'freq'])['R2'].mean()
-        r2_for_output = r2_for_output.groupby('freq').max().max()
-        r2_for_output = math.ceil(r2_for_output)
-
-        self.output_data = pd.DataFrame(data_for_output)
-        self.max_r2 = r2_for_output
-
-        signal_data = df_after_grouped.groupby(['angle', 'freq'])['signal'].mean().round(1).unstack(level='angle')
-        noise_data = df_after_grouped.groupby(['angle', 'freq'])['noise'].mean().round(1).unstack(level='angle')
-
-        # Пересмотреть все данные в ДатаФрейме шумов(noise_data), и вместо значений NaN установить
-        # значение максимального шума на этой частоте с других направлений
-        # Значение шума не должно быть ниже MIN_VALUE
-        for angle in noise_data:
-            for frequency in noise_data[angle].index.values:
-                if np.isnan(noise_data[angle][frequency]):
-                    noise_data[angle][frequency] = noise_data.loc[frequency].max()
-                if noise_data[angle][frequency] < MIN_VALUE:
-                    noise_data[angle][frequency] = MIN_VALUE
-
-        # Пересмотреть все данные в ДатаФрейме сигналов(signal_data), и
-        # вместо значений NaN установить значение MIN_VALUE
-        # Значение сигнала не должно быть ниже MIN_VALUE
-        for angle in signal_data:
-            for frequency in signal_data[angle].index.values:
-                if np.isnan(signal_data[angle][frequency]):
-                    signal_data[angle][frequency] = min(MIN_VALUE, noise_data.loc[frequency].max() - 10)
-                if signal_data[angle][frequency] < MIN_VALUE:
-                    signal_data[angle][frequency] = MIN_VALUE
+        Обновить данные после добавления или изменения файлов: читаются только измененные файлы
+        (и файлы тех же групп измерение-поляризация-угол), средние пересчитываются только для затронутых углов.
+        При удалении файлов данные пересчитываются полностью
+
+        :param changed: добавленные или измененные файлы
+        :param removed: удаленные файлы
+        :return: частоты, данные которых изменились, или None, если изменились все данные
+        """
+        if removed or not self.loaded:
+            return BaseManyMeasData.update_files(self, changed, removed)
+
+        known = set(self.files)
+        self.files = self.files + [file for file in changed if file not in known]
+
+        # Метаданные всех файлов: прежние и заново разобранные для измененных файлов
+        records = {record.path: record for record in self.cube.records}
+        changed_records = [self._make_record(file) for file in changed]
+        records.update((record.path, record) for record in changed_records)
+        self.cube.records = list(records.values())
+
+        # Все файлы изменившихся групп (файлы разных интерфейсов одной группы складываются в одну ячейку)
+        groups = {(record.meas_name, record.polarisation, record.angle) for record in changed_records}
+        group_records = [record for record in self.cube.records
+                         if (record.meas_name, record.polarisation, record.angle) in groups]
+        changes = self.cube.replace_groups(group_records, self.read_files([record.path for record in group_records]),
+                                           self.frequency_tolerance)
+
+        if changes is None:
+            self._means = {name: self.cube.mean_over_meas(name) for name in ['signal', 'noise', 'r2']}
+            self._reset_frames()
+            return None
+
+        angles, frequencies = changes
+        for name in ['signal', 'noise', 'r2']:
+            self._means[name][angles] = self.cube.mean_over_meas(name, angles)
+        self._reset_frames()
+        return self.cube.frequencies[frequencies].tolist()
+
+    def to_archive(self, path: Union[str, pathlib.Path], archive_format: str = 'auto') -> pathlib.Path:
+        """
+        Сохранить загруженные данные в архив (см. archive.write_levels)
+
+        :param path: папка архива
+        :param archive_format: 'parquet', 'feather', 'npz' или 'auto'
+        :return: папка архива
+        """
+        return archive.write_levels(path, self, archive_format)
+
+    @classmethod
+    def from_archive(cls, path: Union[str, pathlib.Path]) -> 'RadarDataLevelsManyMeas':
+        """
+        Загрузить данные из архива, сохраненного to_archive, без чтения и разбора файлов измерений
+
+        :param path: папка архива
+        """
+        loaded = archive.read_levels(path)
+        provenance = loaded.meta['parts']['levels']['provenance']
+        radar_data = cls._create_loaded(provenance['source_dir'], [record.path for record in loaded.cube.records])
+        radar_data.cube = loaded.cube
+        radar_data._means = {name: loaded.cube.mean_over_meas(name) for name in ['signal', 'noise', 'r2']}
+        radar_data._output_data = None
+        radar_data._max_r2 = None
+        radar_data.frequencies = loaded.cube.frequencies.tolist()
+        radar_data.data = loaded.data
+        radar_data.noise = loaded.noise
+        return radar_data
+
+    def _make_record(self, file: pathlib.Path) -> MeasFileRecord:
+        """Метаданные файла измерений, разобранные из его пути"""
+        meta = self._file_meta(file)
+        return MeasFileRecord(file, meta.meas_name, meta.interface, meta.polarisation, meta.angle, meta.r2)
+
+    def _reset_frames(self) -> None:
+        """Забыть вычисленные по средним значениям таблицы: после изменения self._means они строятся заново"""
+        self._data = None
+        self._noise = None
+        self._output_data = None
+        self._max_r2 = None
+
+        # Список всех частот из всех файлов
+        self.frequencies = self.cube.frequencies.tolist()
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        Средние по измерениям уровни сигнала: углы - индексы, частоты - столбцы, пропуски заполнены
+        (см. fill_missing_levels). Строится из средних значений куба при первом обращении вместе с noise
+        """
+        self.load()
+        if self._data is None:
+            self._make_frames()
+        return self._data
+
+    @data.setter
+    def data(self, value: pd.DataFrame) -> None:
+        self._data = value
+
+    @property
+    def noise(self) -> pd.DataFrame:
+        """Средние по измерениям уровни шума (как data; строится при первом обращении вместе с data)"""
+        self.load()
+        if self._noise is None:
+            self._make_frames()
+        return self._noise
+
+    @noise.setter
+    def noise(self, value: pd.DataFrame) -> None:
+        self._noise = value
+
+    def _make_frames(self) -> None:
+        """
+        Сформировать ДатаФреймы сигналов и шумов из средних значений self._means. Это заполненные копии,
+        а не представления куба: fill_missing_levels заменяет пропуски значениями, зависящими
+        от других углов, поэтому таблицы строятся один раз и хранятся до изменения данных
+        """
+        # Средние по измерениям уровни с частотами в качестве индексов
+        signal_data = self._make_levels_frame(self._means['signal'].round(1))
+        noise_data = self._make_levels_frame(self._means['noise'].round(1))
+
+        # Вместо значений NaN в ДатаФрейме шумов(noise_data) установить значение максимального шума
+        # на этой частоте с других направлений, а в ДатаФрейме сигналов(signal_data) - значение MIN_VALUE.
+        # Значения шума и сигнала не должны быть ниже MIN_VALUE
+        with profiling.span('fill_missing'):
+            signal_data, noise_data = fill_missing_levels(signal_data, noise_data, MIN_VALUE)
 
         data_s = signal_data.sort_index().T.sort_index()
         data_n = noise_data.sort_index().T.sort_index()
 
-        self.data = data_s
-        self.noise = data_n
+        self._data = data_s
+        self._noise = data_n
 
-        return self.data
+    @property
+    def output_data(self) -> pd.DataFrame:
+        """Максимальные по углам средние уровни сигнала и шума на каждой частоте (вычисляются при первом обращении)"""
+        self.load()
+        if self._output_data is None:
+            self._output_data = self._make_output_frame(self._means, self.cube.frequencies)
+        return self._output_data
+
+    @staticmethod
+    def _make_output_frame(means: Dict[str, np.ndarray], frequencies: np.ndarray) -> pd.DataFrame:
+        """ДатаФрейм максимальных по углам средних уровней сигнала и шума с частотами в качестве индексов"""
+        return pd.DataFrame({
+            'signal': np.fmax.reduce(means['signal'].round(1), axis=0),
+            'noise': np.fmax.reduce(means['noise'].round(1), axis=0),
+        }, index=pd.Index(frequencies, name='freq'))
+
+    def iter_output_bands(self, band_width: float = streaming.DEFAULT_BAND_WIDTH,
+                          chunk_lines: int = streaming.CHUNK_LINES) -> Iterator[streaming.OutputBand]:
+        """
+        Потоковый расчет output_data и max_r2 по полосам частот (см. streaming): файлы читаются по частям,
+        в памяти находятся данные одной полосы, загруженные данные (куб) не используются и не загружаются
+
+        :param band_width: ширина полосы частот, МГц
+        :param chunk_lines: количество строк в порции чтения файла
+        :return: итератор полос: часть output_data и максимальная средняя зона R2 полосы
+        """
+        records = [self._make_record(file) for file in self.files]
+        for cube in streaming.iter_band_cubes(records, band_width, self.frequency_tolerance, chunk_lines):
+            with profiling.span('aggregate'):
+                means = {name: cube.mean_over_meas(name) for name in ['signal', 'noise', 'r2']}
+            max_r2 = float(np.nanmax(means['r2'])) if np.any(~np.isnan(means['r2'])) else math.nan
+            yield streaming.OutputBand(self._make_output_frame(means, cube.frequencies), max_r2)
+
+    @property
+    def max_r2(self) -> int:
+        """Максимальная по углам и частотам средняя зона R2, округленная вверх (вычисляется при первом обращении)"""
+        self.load()
+        if self._max_r2 is None:
+            self._max_r2 = math.ceil(np.nanmax(self._means['r2']))
+        return self._max_r2
+
+    @property
+    def raw_data(self) -> pd.DataFrame:
+        """Длинная таблица необработанных данных, собираемая из куба по запросу"""
+        return self.cube.to_frame()
+
+    def _make_levels_frame(self, levels: np.ndarray) -> pd.DataFrame:
+        """
+        ДатаФрейм уровней с частотами в качестве индексов и углами в качестве столбцов
+        (только углы, для которых есть данные)
+
+        :param levels: массив уровней (угол, частота)
+        """
+        present = self.cube.present_angles()
+        return pd.DataFrame(levels[present].T, index=pd.Index(self.cube.frequencies, name='freq'),
+                            columns=pd.Index(self.cube.angles[present], name='angle'))
+
+    def save_data(self, path: str = None, band_width: Optional[float] = None) -> str:
+        """
+        Сохранить данные в файл
+
+        :param path: путь к файлу (по умолчанию - рядом с папкой, с максимальной зоной R2 в имени)
+        :param band_width: ширина полосы частот, МГц, для потоковой обработки (iter_output_bands):
+        строки дописываются в файл по мере расчета полос. None - сохраняются загруженные данные
+        :return: путь к сохраненному файлу
+        """
+        if band_width is None:
+            if not path:
+                path = str(self.dir) + f' [R2={self.max_r2}].csv'
+            self.output_data.to_csv(path)
+            return path
 
-    def save_data(self, path: str = None) -> None:
-        """Сохранить данные в файл"""
-        if not path:
-            path = str(self.dir) + f' [R2={self.max_r2}].csv'
-        self.output_data.to_csv(path)
+        # Максимальная зона R2 известна только после расчета всех полос, поэтому строки записываются
+        # во временный файл, который затем переименовывается
+        temp_path = (path or str(self.dir) + ' [R2].csv') + '.part'
+        max_r2 = math.nan
+        try:
+            with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+                header = True
+                for band in self.iter_output_bands(band_width):
+                    band.data.to_csv(file, header=header)
+                    header = False
+                    max_r2 = np.fmax(max_r2, band.max_r2)
+            if math.isnan(max_r2):
+                raise ValueError(f'{self.dir}: нет данных уровней')
+            if not path:
+                path = str(self.dir) + f' [R2={math.ceil(max_r2)}].csv'
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
@@ -1,18 +1,26 @@
 import pandas as pd
+from typing import Optional
 
 from .base import BaseRadarData
+from .cache import ParsedFileCache
+from .columnar import ColumnarBuilder
+from .scan import parse_filename
 
 
 class RadarDataR2(BaseRadarData):
     """Класс данных для круговых диаграмм зон R2 по углам"""
 
-    def __init__(self, dir_path: str):
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None):
         """
         Подготавливает данные о зонах R2 (на всех углах измерения) для отображения их на круговых диаграммах
 
         :param dir_path: путь к папке со списком файлов данных
+        :param workers: количество потоков или процессов для параллельного чтения файлов
+        :param executor: 'thread' - пул потоков, 'process' - пул процессов
+        :param cache: дисковый кэш разобранных файлов
         """
-        BaseRadarData.__init__(self, dir_path)
+        BaseRadarData.__init__(self, dir_path, workers, executor, cache)
 
     def make_data(self) -> pd.DataFrame:
         """
@@ -22,19 +30,17 @@ class RadarDataR2(BaseRadarData):
         :return: ДатаСерия с углами, в качестве индексов, и R2, в качестве значений
         """
 
-        data = pd.DataFrame(columns=["angle", "main", "lower"])
+        data = ColumnarBuilder(["angle", "main", "lower"])
         # Перебрать названия всех файлов папки и выбрать из них угол,
         # на котором проводились измерения, и радиус зоны R2
         for filename in self.files:
-            angle = self.get_angle_from_filename(filename)
-            r2 = self.get_r2_from_filename(filename)
+            angle, r2 = parse_filename(filename)
             min_r2 = self._calc_lower_r2(r2)
 
-            new_row = {'angle': angle, 'main': r2, 'lower': min_r2}
-            data.loc[len(data)] = new_row
+            data.append_row(angle=angle, main=r2, lower=min_r2)
 
         # Установить углы в качестве индексов и отсортировать датафрей по индексам
-        data = data.set_index('angle').sort_index()
+        data = data.to_frame().set_index('angle').sort_index()
 
         # Добавить в конец ДатаСерии данные начальной точки, чтобы график замкнулся
 
@@ -1,88 +1,155 @@
-import math
+import pathlib
 
 import pandas as pd
+from typing import List, Optional, Sequence, Tuple, Union
 
+from . import archive
+from .base import loaded_attribute
 from .base_many_meas_data import BaseManyMeasData
-
-COVERAGE_FACTOR = 2   # Коэффициент охвата. При расчете расширенной неопределенности
+from .cache import ParsedFileCache
+from .r2_stats import R2Statistics
 
 
 class RadarDataR2ManyMeas(BaseManyMeasData):
     """Класс данных для круговых диаграмм зон R2 по углам"""
 
-    def __init__(self, dir_path: str):
+    stats = loaded_attribute('stats', 'Накопленная статистика R2Statistics (загружается при первом обращении)')
+
+    def __init__(self, dir_path: str, workers: Optional[int] = None, executor: str = 'thread',
+                 cache: Optional[ParsedFileCache] = None):
         """
         Подготавливает данные о зонах R2 (на всех углах измерения) для отображения их на круговых диаграммах
 
         :param dir_path: путь к папке со списком файлов данных
+        :param workers: количество потоков или процессов для параллельного чтения файлов
+        :param executor: 'thread' - пул потоков, 'process' - пул процессов
+        :param cache: дисковый кэш разобранных файлов
         """
-        BaseManyMeasData.__init__(self, dir_path)
+        BaseManyMeasData.__init__(self, dir_path, workers, executor, cache)
 
     def make_data(self) -> pd.DataFrame:
         """
         Читает имя каждого файла из списка self.files парсит в нем угол, на котором проводились измерения,
         результат рассчитанной зоны R2, номер измерений и т.д.
-        Из этих данных формирует ДатаСерию для всех положений (углов) измерений
+        Из этих данных формирует ДатаСерию для всех положений (углов) измерений.
+        Статистика накапливается в self.stats и затем обновляется по частям (update_files, add_measurement,
+        remove_measurement) без пересчета по всем файлам
 
         :return: ДатаСерия с углами, в качестве индексов,
                  и R2 с нижней и верхней границей доверительного интервала, в качестве значений
         """
-
-        # Пустой датасет для необработанных данных с именами столбцов
-        raw_data = pd.DataFrame(columns=["meas_name", "interface", "polarisation", "angle", "r2", "rounding"])
-
-        # Перебрать все файлы в списке и распарсить из путей данные по измерениям
+        self.stats = R2Statistics()
         for file in self.files:
-            meas_name = self._get_meas_name(file)
-            interface = self._get_interface(file)
-            polarisation = self._get_polarisation(file)
-            filename = self._get_filename(file)
-            angle = self.get_angle_from_filename(filename)
-            r2 = self.get_r2_from_filename(filename)
+            self.stats.add_file(*self._file_values(file))
+        return self._make_frame()
 
-            # Неопределенность дискретности округления Навигатором
-            # расцениваем как прямоугольное распределение вероятностей. Поэтому
-            rounding_uncertainty = ((r2 - self._calc_lower_r2(r2)) / 2) / (3 ** 0.5)
+    def update_files(self, changed: Sequence[pathlib.Path],
+                     removed: Sequence[pathlib.Path] = ()) -> Optional[List[float]]:
+        """
+        Обновить статистику после добавления или удаления файлов. Зоны R2 берутся из имен файлов,
+        поэтому изменение содержимого уже учтенного файла данные не меняет
 
-            # Принимаем за величину R2 значение в середине интервала от R2(min) до R2(max)
-            r2 = r2 - (r2 - self._calc_lower_r2(r2)) / 2
+        :param changed: добавленные или измененные файлы
+        :param removed: удаленные файлы
+        :return: None - данные R2 не зависят от частот
+        """
+        if not self.loaded:
+            return BaseManyMeasData.update_files(self, changed, removed)
+
+        known = set(self.files)
+        removed = set(removed)
+        for file in removed & known:
+            self.stats.remove_file(*self._file_values(file))
+        added = [file for file in changed if file not in known]
+        for file in added:
+            self.stats.add_file(*self._file_values(file))
+
+        self.files = [file for file in self.files if file not in removed] + added
+        self.data = self._make_frame()
+        return None
+
+    def add_measurement(self, meas_name: str) -> None:
+        """
+        Добавить в статистику измерение (папку dir/meas_name), появившееся после загрузки
 
-            new_row = {'meas_name': meas_name, 'interface': interface,
-                       'polarisation': polarisation, 'angle': angle, 'r2': r2,
-                       'rounding': rounding_uncertainty}
-            raw_data.loc[len(raw_data)] = new_row
+        :param meas_name: имя папки измерения
+        """
+        files = [file for file in self.read_filenames() if self._get_meas_name(file) == meas_name]
+        self.update_files(files)
 
-        grouped_max_in_polarisation = raw_data.groupby(['meas_name', 'angle'],
-                                                       as_index=False).max()[['angle', 'r2', 'rounding']]
+    def remove_measurement(self, meas_name: str) -> None:
+        """
+        Исключить измерение из статистики
 
-        max_in_polarisation = pd.DataFrame(grouped_max_in_polarisation)
+        :param meas_name: имя папки измерения
+        """
+        self.stats.remove_measurement(meas_name)
+        self.files = [file for file in self.files if self._get_meas_name(file) != meas_name]
+        self.data = self._make_frame()
 
-        grouped_r2_angle = max_in_polarisation.groupby('angle', as_index=False)['r2'].agg(['mean', 'std', 'count'])
-        grouped_rounding_angle = max_in_polarisation.groupby('angle', as_index=False)['rounding'].mean()
+    def files_frame(self) -> pd.DataFrame:
+        """
+        Значения каждого файла, из которых накоплена статистика
 
-        count = grouped_r2_angle['count'].max()
+        :return: ДатаФрейм со столбцами path, meas_name, angle, r2, rounding
+        """
+        return pd.DataFrame([(str(file),) + self._file_values(file) for file in self.files],
+                            columns=['path', 'meas_name', 'angle', 'r2', 'rounding'])
 
-        # Выборочное стандартное отклонение среднего
-        grouped_r2_angle['uncertainty'] = grouped_r2_angle['std'] / math.sqrt(count)
+    def to_archive(self, path: Union[str, pathlib.Path], archive_format: str = 'auto') -> pathlib.Path:
+        """
+        Сохранить загруженные данные в архив (см. archive.write_r2)
 
-        # Суммарная неопределенность с коэффициентом охвата COVERAGE_FACTOR
-        grouped_r2_angle['total_uncertainty'] = COVERAGE_FACTOR * (grouped_r2_angle['uncertainty'] ** 2 +
-                                                                   grouped_rounding_angle['rounding'] ** 2) ** 0.5
+        :param path: папка архива
+        :param archive_format: 'parquet', 'feather', 'npz' или 'auto'
+        :return: папка архива
+        """
+        return archive.write_r2(path, self, archive_format)
 
-        data = pd.DataFrame(columns=["angle", "main", "lower"])
-        data['angle'] = grouped_r2_angle['angle']
-        data['main'] = grouped_r2_angle['mean']
-        data['lower'] = grouped_r2_angle['mean'] - grouped_r2_angle['total_uncertainty']
-        data['upper'] = grouped_r2_angle['mean'] + grouped_r2_angle['total_uncertainty']
+    @classmethod
+    def from_archive(cls, path: Union[str, pathlib.Path]) -> 'RadarDataR2ManyMeas':
+        """
+        Загрузить данные из архива, сохраненного to_archive, без чтения папки измерений.
+        Статистика восстанавливается из значений файлов в том же порядке, что и при загрузке из папки
 
-        # Установить углы в качестве индексов и отсортировать датафрей по индексам
-        data = data.set_index('angle').sort_index()
+        :param path: папка архива
+        """
+        loaded = archive.read_r2(path)
+        provenance = loaded.meta['parts']['r2']['provenance']
+        radar_data = cls._create_loaded(provenance['source_dir'], [pathlib.Path(file) for file in loaded.files['path']])
+        radar_data.stats = R2Statistics()
+        for row in loaded.files.itertuples(index=False):
+            radar_data.stats.add_file(row.meas_name, float(row.angle), float(row.r2), float(row.rounding))
+        radar_data.data = radar_data._make_frame()
+        return radar_data
+
+    def _make_frame(self) -> pd.DataFrame:
+        """ДатаФрейм зон R2 по углам из накопленной статистики"""
+        data = self.stats.to_frame()
 
         # Добавить в конец ДатаСерии данные начальной точки, чтобы график замкнулся
         data = pd.concat([data, data[:0]])
 
         return data
 
+    def _file_values(self, file: pathlib.Path) -> Tuple[str, float, float, float]:
+        """
+        Разобрать из пути к файлу значения для статистики
+
+        :return: (имя измерения, угол, R2, неопределенность округления R2)
+        """
+        meta = self._file_meta(file)
+        r2 = meta.r2
+
+        # Неопределенность дискретности округления Навигатором
+        # расцениваем как прямоугольное распределение вероятностей. Поэтому
+        rounding_uncertainty = ((r2 - self._calc_lower_r2(r2)) / 2) / (3 ** 0.5)
+
+        # Принимаем за величину R2 значение в середине интервала от R2(min) до R2(max)
+        r2 = r2 - (r2 - self._calc_lower_r2(r2)) / 2
+
+        return meta.meas_name, meta.angle, r2, rounding_uncertainty
+
     @staticmethod
     def _calc_lower_r2(r2: float) -> float:
         """Вычисляет нижний уровень неопределенности зоны R2"""
@@ -0,0 +1,189 @@
+import math
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Tuple
+
+
+COVERAGE_FACTOR = 2   # Коэффициент охвата. При расчете расширенной неопределенности
+
+
+class AngleAccumulator:
+    """
+    Накопитель статистики зон R2 на одном угле: количество измерений, среднее и сумма квадратов
+    отклонений (алгоритм Уэлфорда), среднее неопределенности округления. Значения можно добавлять,
+    удалять, а накопители, рассчитанные по разным измерениям, - объединять (формулы Чана)
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'rounding_mean')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, rounding_mean: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.rounding_mean = rounding_mean
+
+    def add(self, r2: float, rounding: float) -> None:
+        """Добавить значение одного измерения"""
+        self.count += 1
+        delta = r2 - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (r2 - self.mean)
+        self.rounding_mean += (rounding - self.rounding_mean) / self.count
+
+    def remove(self, r2: float, rounding: float) -> None:
+        """Удалить значение одного измерения, добавленное ранее"""
+        if self.count <= 1:
+            self.count, self.mean, self.m2, self.rounding_mean = 0, 0.0, 0.0, 0.0
+            return
+        mean = (self.count * self.mean - r2) / (self.count - 1)
+        self.m2 -= (r2 - self.mean) * (r2 - mean)
+        self.mean = mean
+        self.rounding_mean = (self.count * self.rounding_mean - rounding) / (self.count - 1)
+        self.count -= 1
+
+    def merge(self, other: 'AngleAccumulator') -> None:
+        """Объединить со статистикой других измерений"""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.rounding_mean = other.count, other.mean, other.m2, other.rounding_mean
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.rounding_mean += (other.rounding_mean - self.rounding_mean) * other.count / count
+        self.count = count
+
+    @property
+    def std(self) -> float:
+        """Выборочное стандартное отклонение (NaN для одного измерения)"""
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1)) if self.count > 1 else math.nan
+
+    def copy(self) -> 'AngleAccumulator':
+        return AngleAccumulator(self.count, self.mean, self.m2, self.rounding_mean)
+
+
+class R2Statistics:
+    """
+    Статистика зон R2 многих измерений, обновляемая по частям. Для каждой пары (измерение, угол) хранятся
+    значения всех файлов (разных поляризаций и интерфейсов), в статистику угла входит их максимум.
+    Добавление и удаление файла или измерения обновляет только накопители затронутых углов
+    """
+
+    def __init__(self):
+        # (измерение, угол) -> значения (r2, неопределенность округления) файлов
+        self._files: Dict[Tuple[str, float], List[Tuple[float, float]]] = {}
+        # угол -> накопитель по максимумам измерений
+        self._angles: Dict[float, AngleAccumulator] = {}
+
+    @property
+    def meas_names(self) -> List[str]:
+        """Имена измерений, входящих в статистику"""
+        return sorted({meas_name for meas_name, _ in self._files})
+
+    @property
+    def angles(self) -> List[float]:
+        """Углы, для которых есть данные"""
+        return sorted(angle for angle, accumulator in self._angles.items() if accumulator.count)
+
+    def group_max(self, meas_name: str, angle: float) -> Tuple[float, float]:
+        """Максимальные по файлам r2 и неопределенность округления измерения на угле"""
+        values = self._files[(meas_name, angle)]
+        return max(r2 for r2, _ in values), max(rounding for _, rounding in values)
+
+    def add_file(self, meas_name: str, angle: float, r2: float, rounding: float) -> None:
+        """
+        Добавить значения одного файла
+
+        :param meas_name: имя измерения
+        :param angle: угол, рад
+        :param r2: зона R2
+        :param rounding: неопределенность округления R2
+        """
+        key = (meas_name, angle)
+        accumulator = self._angles.setdefault(angle, AngleAccumulator())
+        if key in self._files:
+            accumulator.remove(*self.group_max(meas_name, angle))
+        self._files.setdefault(key, []).append((r2, rounding))
+        accumulator.add(*self.group_max(meas_name, angle))
+
+    def remove_file(self, meas_name: str, angle: float, r2: float, rounding: float) -> None:
+        """Удалить значения одного файла, добавленные ранее"""
+        key = (meas_name, angle)
+        accumulator = self._angles[angle]
+        accumulator.remove(*self.group_max(meas_name, angle))
+        self._files[key].remove((r2, rounding))
+        if self._files[key]:
+            accumulator.add(*self.group_max(meas_name, angle))
+        else:
+            del self._files[key]
+
+    def add_measurement(self, meas_name: str, files: Iterable[Tuple[float, float, float]]) -> None:
+        """
+        Добавить измерение
+
+        :param meas_name: имя измерения
+        :param files: значения (угол, r2, неопределенность округления) файлов измерения
+        """
+        for angle, r2, rounding in files:
+            self.add_file(meas_name, angle, r2, rounding)
+
+    def remove_measurement(self, meas_name: str) -> None:
+        """Удалить измерение целиком"""
+        for key in [key for key in self._files if key[0] == meas_name]:
+            self._angles[key[1]].remove(*self.group_max(*key))
+            del self._files[key]
+
+    def merge(self, other: 'R2Statistics') -> 'R2Statistics':
+        """
+        Объединить со статистикой, рассчитанной по другим измерениям (например, в другом процессе)
+
+        :param other: статистика других измерений
+        :return: self
+        """
+        common = set(self.meas_names) & set(other.meas_names)
+        if common:
+            raise ValueError(f'Измерения {sorted(common)} входят в обе объединяемые статистики')
+
+        for key, values in other._files.items():
+            self._files[key] = list(values)
+        for angle, accumulator in other._angles.items():
+            self._angles.setdefault(angle, AngleAccumulator()).merge(accumulator)
+        return self
+
+    def accumulators_frame(self) -> pd.DataFrame:
+        """
+        Состояние накопителей по углам
+
+        :return: ДатаФрейм с углами в качестве индексов и столбцами count, mean, m2, rounding_mean
+        """
+        angles = sorted(self._angles)
+        return pd.DataFrame([(self._angles[angle].count, self._angles[angle].mean, self._angles[angle].m2,
+                              self._angles[angle].rounding_mean) for angle in angles],
+                            columns=['count', 'mean', 'm2', 'rounding_mean'],
+                            index=pd.Index(angles, dtype=np.float64, name='angle'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Средние зоны R2 по углам с границами расширенной неопределенности
+
+        :return: ДатаФрейм с углами в качестве индексов и столбцами main, lower, upper
+        """
+        angles = self.angles
+        accumulators = [self._angles[angle] for angle in angles]
+
+        mean = np.array([accumulator.mean for accumulator in accumulators], dtype=np.float64)
+        std = np.array([accumulator.std for accumulator in accumulators], dtype=np.float64)
+        rounding = np.array([accumulator.rounding_mean for accumulator in accumulators], dtype=np.float64)
+        count = max((accumulator.count for accumulator in accumulators), default=0)
+
+        # Выборочное стандартное отклонение среднего
+        uncertainty = std / math.sqrt(count) if count else std
+
+        # Суммарная неопределенность с коэффициентом охвата COVERAGE_FACTOR
+        total_uncertainty = COVERAGE_FACTOR * (uncertainty ** 2 + rounding ** 2) ** 0.5
+
+        return pd.DataFrame({'main': mean, 'lower': mean - total_uncertainty, 'upper': mean + total_uncertainty},
+                            index=pd.Index(angles, dtype=np.float64, name='angle'))
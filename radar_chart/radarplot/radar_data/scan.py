@@ -0,0 +1,120 @@
+"""
+Быстрый обход папок с измерениями: os.scandir (тип элемента берется из DirEntry без отдельных stat),
+разбор угла и зоны R2 из имени файла одним заранее скомпилированным выражением,
+метаданные файлов собираются в одну таблицу
+"""
+import os
+import pathlib
+import re
+
+import numpy as np
+from typing import TYPE_CHECKING, List, NamedTuple, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Имена файлов Навигатора: "... (<угол>) <R2>m ...", например "Е 1903103 FHD DVI (90) 3m ВП.txt"
+FILENAME_PATTERN = re.compile(r'\((?P<angle>\d+)\) (?P<r2>\d+)')
+# Угол и R2 по отдельности: для имен с несколькими скобками берутся первые совпадения
+ANGLE_PATTERN = re.compile(r'\((\d+)\)')
+R2_PATTERN = re.compile(r'\) (\d+)')
+
+DATA_SUFFIX = '.txt'
+
+
+class FileMeta(NamedTuple):
+    """Метаданные файла измерений, разобранные из его пути"""
+    path: pathlib.Path
+    meas_name: str
+    interface: str
+    polarisation: str
+    angle: float
+    r2: float
+
+
+def split_polarisation_dir(name: str) -> Tuple[str, str]:
+    """
+    Разобрать имя папки с файлами одной поляризации вида "<интерфейс> <поляризация>", например "DVI ВП"
+
+    :param name: имя папки
+    :return: (интерфейс, поляризация); поляризация - пустая строка, если ее нет в имени
+    """
+    parts = name.split(" ")
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def parse_filename(filename: str) -> Tuple[float, float]:
+    """
+    Разобрать из имени файла угол и зону R2. Если в имени одна пара скобок, то оба значения берутся
+    из одного совпадения FILENAME_PATTERN, иначе - как в BaseRadarData, по первым совпадениям
+    ANGLE_PATTERN и R2_PATTERN
+
+    :param filename: имя файла
+    :return: (угол, рад; R2)
+    """
+    if filename.count('(') == 1 and filename.count(')') == 1:
+        match = FILENAME_PATTERN.search(filename)
+        if match is not None:
+            return np.deg2rad(float(match.group('angle'))), float(match.group('r2'))
+    return (np.deg2rad(float(ANGLE_PATTERN.findall(filename)[0])),
+            float(R2_PATTERN.findall(filename)[0]))
+
+
+def scan_dir(dir_path: Union[str, pathlib.Path]) -> List[str]:
+    """
+    Имена файлов данных в папке (без вложенных папок)
+
+    :param dir_path: папка
+    :return: имена текстовых файлов в порядке os.scandir
+    """
+    with os.scandir(dir_path) as entries:
+        return [entry.name for entry in entries if entry.name.endswith(DATA_SUFFIX) and entry.is_file()]
+
+
+def scan_many_meas(dir_path: Union[str, pathlib.Path]) -> List[FileMeta]:
+    """
+    Обойти папку многих измерений вида <dir_path>/<измерение>/<интерфейс поляризация>/<файлы>
+    и разобрать метаданные каждого файла
+
+    :param dir_path: папка многих измерений
+    :return: метаданные файлов в порядке обхода
+    """
+    dir_path = pathlib.Path(dir_path)
+    files = []
+    with os.scandir(dir_path) as meas_entries:
+        meas_dirs = [entry for entry in meas_entries if entry.is_dir()]
+
+    for meas_entry in meas_dirs:
+        meas_path = dir_path.joinpath(meas_entry.name)
+        with os.scandir(meas_entry.path) as polarisation_entries:
+            polarisation_dirs = [entry for entry in polarisation_entries if entry.is_dir()]
+
+        for polarisation_entry in polarisation_dirs:
+            polarisation_path = meas_path.joinpath(polarisation_entry.name)
+            interface, polarisation = split_polarisation_dir(polarisation_entry.name)
+            for filename in scan_dir(polarisation_entry.path):
+                angle, r2 = parse_filename(filename)
+                files.append(FileMeta(polarisation_path.joinpath(filename), meas_entry.name,
+                                      interface, polarisation, angle, r2))
+    return files
+
+
+def files_table(files: List[FileMeta]) -> 'pd.DataFrame':
+    """
+    Таблица метаданных файлов
+
+    :param files: метаданные файлов
+    :return: ДатаФрейм со столбцами path, meas_name, interface, polarisation, angle, r2
+    """
+    # pandas импортируется только здесь: обход папок (например, для индекса) обходится без него
+    import pandas as pd
+
+    return pd.DataFrame({
+        'path': [file.path for file in files],
+        'meas_name': pd.Categorical([file.meas_name for file in files]),
+        'interface': pd.Categorical([file.interface for file in files]),
+        'polarisation': pd.Categorical([file.polarisation for file in files]),
+        'angle': np.array([file.angle for file in files], dtype=np.float64),
+        'r2': np.array([file.r2 for file in files], dtype=np.float64),
+    })
@@ -0,0 +1,139 @@
+"""
+Потоковая обработка данных уровней многих измерений по полосам частот.
+
+Каждый файл читается порциями по возрастанию частот (read_navigator_chunk), строки файла, не вошедшие
+в текущую полосу, ждут следующей. Для каждой полосы из строк всех файлов собирается куб LevelsCube
+с общими осями измерений, поляризаций и углов и с частотами только этой полосы, поэтому в памяти
+одновременно находятся данные одной полосы (и по порции непрочитанных строк на файл), а не всего измерения.
+Расчеты в кубе выполняются отдельно для каждой частоты, поэтому результаты по полосам совпадают
+с результатами по кубу всего измерения. Полоса продлевается, пока следующие частоты совмещаются по допуску
+с частотами полосы, чтобы кластер частот не разделялся между полосами
+"""
+import pathlib
+
+import numpy as np
+import pandas as pd
+from typing import Iterator, List, NamedTuple, Optional, Union
+
+from .ingest import LevelsFileData
+from .levels_cube import LevelsCube, MeasFileRecord
+from .. import profiling
+from ..frequencies import DEFAULT_TOLERANCE, FrequencyTolerance
+from ..navigator import HEADER_LINES, NavigatorFormatError, read_navigator_chunk
+
+
+# Ширина полосы частот по умолчанию, МГц
+DEFAULT_BAND_WIDTH = 1000.0
+# Количество строк в порции чтения файла: в памяти остается до CHUNK_LINES непрочитанных строк на каждый файл
+CHUNK_LINES = 512
+
+
+class OutputBand(NamedTuple):
+    """Результат расчета одной полосы частот"""
+    # Максимальные по углам средние уровни сигнала и шума (часть output_data)
+    data: pd.DataFrame
+    # Максимальная средняя зона R2 полосы (NaN - в полосе нет данных)
+    max_r2: float
+
+
+class FileBandReader:
+    """Чтение файла измерений по полосам частот. Частоты в файле должны не убывать"""
+
+    __slots__ = ('path', 'chunk_lines', '_offset', '_line_number', '_eof', '_last', '_pending')
+
+    def __init__(self, path: Union[str, pathlib.Path], chunk_lines: int = CHUNK_LINES):
+        """
+        :param path: путь к файлу
+        :param chunk_lines: количество строк в порции чтения
+        """
+        self.path = path
+        self.chunk_lines = chunk_lines
+        self._offset = 0
+        self._line_number = HEADER_LINES + 1
+        self._eof = False
+        self._last = -np.inf
+        # Прочитанные строки, еще не отданные в полосы: частоты, сигналы, шумы
+        self._pending = (np.array([]),) * 3
+
+    def next_freq(self) -> Optional[float]:
+        """Частота следующей непрочитанной строки, None - строк больше нет"""
+        if not len(self._pending[0]):
+            self._read_chunk()
+        return float(self._pending[0][0]) if len(self._pending[0]) else None
+
+    def read_band(self, high: float) -> LevelsFileData:
+        """
+        Прочитать строки с частотами меньше high
+
+        :param high: верхняя граница полосы (не включается)
+        :return: частоты, уровни сигнала и шума строк полосы
+        """
+        parts = []
+        while True:
+            count = int(np.searchsorted(self._pending[0], high, side='left'))
+            parts.append(tuple(values[:count] for values in self._pending))
+            self._pending = tuple(values[count:] for values in self._pending)
+            if len(self._pending[0]) or self._eof:
+                break
+            self._read_chunk()
+
+        freq, signal, noise = (np.concatenate(values) for values in zip(*parts))
+        return LevelsFileData(freq=freq, signal=signal, noise=noise)
+
+    def _read_chunk(self) -> None:
+        """Дочитать следующую порцию строк в self._pending"""
+        while not self._eof and not len(self._pending[0]):
+            chunk = read_navigator_chunk(self.path, self._offset, self._line_number, self.chunk_lines)
+            freq = chunk.freq
+            if len(freq) and (freq[0] < self._last or np.any(np.diff(freq) < 0)):
+                decreasing = np.flatnonzero(np.diff(np.r_[self._last, freq]) < 0)[0]
+                raise NavigatorFormatError(self.path, self._line_number + int(decreasing),
+                                           'частоты в файле убывают, обработка по полосам частот невозможна')
+            if len(freq):
+                self._last = freq[-1]
+
+            self._pending = (freq, chunk.signal, chunk.noise)
+            self._offset, self._line_number, self._eof = chunk.offset, chunk.line_number, chunk.eof
+
+
+def iter_band_cubes(records: List[MeasFileRecord], band_width: float = DEFAULT_BAND_WIDTH,
+                    tolerance: FrequencyTolerance = DEFAULT_TOLERANCE,
+                    chunk_lines: int = CHUNK_LINES) -> Iterator[LevelsCube]:
+    """
+    Кубы уровней по полосам частот в порядке возрастания частот. Полоса начинается с наименьшей
+    непрочитанной частоты и имеет ширину band_width (пустые диапазоны частот пропускаются), затем продлевается
+    до частот, совмещаемых с частотами полосы
+
+    :param records: метаданные файлов
+    :param band_width: ширина полосы частот, МГц
+    :param tolerance: допуск совмещения частот разных файлов
+    :param chunk_lines: количество строк в порции чтения файла
+    :return: итератор кубов с осями измерений, поляризаций и углов всех файлов и частотами полосы
+    """
+    if band_width <= 0:
+        raise ValueError(f'Ширина полосы частот должна быть положительной: {band_width}')
+
+    readers = [FileBandReader(record.path, chunk_lines) for record in records]
+    while True:
+        next_frequencies = [freq for freq in (reader.next_freq() for reader in readers) if freq is not None]
+        if not next_frequencies:
+            return
+
+        low = min(next_frequencies)
+        with profiling.span('band', low=low) as stage:
+            files_data = [reader.read_band(low + band_width) for reader in readers]
+            while True:
+                top = max((file_data.freq[-1] for file_data in files_data if len(file_data.freq)), default=low)
+                reach = tolerance.reach(top)
+                if not any(freq is not None and freq <= reach for freq in (reader.next_freq() for reader in readers)):
+                    break
+                files_data = [_concat(file_data, reader.read_band(np.nextafter(reach, np.inf)))
+                              for file_data, reader in zip(files_data, readers)]
+            cube = LevelsCube.from_files(records, files_data, tolerance)
+            stage.set(rows=sum(len(file_data.freq) for file_data in files_data), frequencies=len(cube.frequencies))
+        yield cube
+
+
+def _concat(first: LevelsFileData, second: LevelsFileData) -> LevelsFileData:
+    """Объединить строки двух последовательных частей файла"""
+    return LevelsFileData(*(np.concatenate(values) for values in zip(first, second)))
@@ -1,8 +1,11 @@
 import math
+import numpy as np
 import pandas as pd
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple, Union
+
+from .frequencies import EXACT, FrequencyTolerance, unique_frequencies
 
 
 @dataclass
@@ -13,23 +16,29 @@ class Line:
     alpha: float = 1.
 
 
-def make_unique_frequency_list(data_list: List[pd.DataFrame]) -> List[float]:
+def make_unique_frequency_list(data_list: List[Union[pd.DataFrame, pd.Series, np.ndarray]],
+                               tolerance: FrequencyTolerance = EXACT) -> List[float]:
     """
-    Формирует общий список частот из всех выборок
+    Формирует общий отсортированный список частот из всех выборок
     :param data_list: список с выборками частот, из которого создать список
-    не повторяющихся частот
-    :return: список уникальных частот
+    не повторяющихся частот. Для ДатаФреймов частотами считаются названия столбцов,
+    для Серий и массивов - их значения
+    :param tolerance: допуск совмещения частот (см. frequencies). EXACT - удаляются только повторы
+    :return: отсортированный список уникальных (канонических) частот
     """
-    frequency_set = set()
-
-    # Каждую частоту из выборок добавить в set, который обеспечивает уникальность частот
-    for frequencies in data_list:
-        for freq in frequencies:
+    frequency_arrays = [frequencies.columns.to_numpy() if isinstance(frequencies, pd.DataFrame)
+                        else np.asarray(frequencies).ravel()
+                        for frequencies in data_list]
+    if not frequency_arrays:
+        return []
 
-            frequency_set.add(freq)
+    # Объединение всех выборок с сортировкой и удалением повторов
+    # (без допуска подписи столбцов могут быть и не числами, например, 'main' у данных R2)
+    if tolerance == EXACT:
+        return np.unique(np.concatenate(frequency_arrays)).tolist()
 
-    # Преобразуем set в list и возвращаем список уникальных частот
-    return list(frequency_set)
+    # Объединение всех выборок с сортировкой и совмещением частот
+    return unique_frequencies(frequency_arrays, tolerance).tolist()
 
 
 def determine_max_y_tick(df_list: List[pd.DataFrame]) -> int:
@@ -42,3 +51,35 @@ def determine_max_y_tick(df_list: List[pd.DataFrame]) -> int:
     y_max = max(df.max().max() for df in df_list)
     max_y_tick = int(math.ceil(y_max / 10) * 10)
     return max_y_tick
+
+
+def fill_missing_levels(signal_data: pd.DataFrame, noise_data: pd.DataFrame,
+                        min_value: float = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Заполняет пропуски в ДатаФреймах сигналов и шумов (частоты - индексы, углы - столбцы)
+    сразу для всего двумерного массива, без перебора ячеек.
+    Вместо NaN шума устанавливается максимальный шум на этой частоте с других направлений,
+    вместо NaN сигнала - min(min_value, максимальный шум на частоте - 10).
+    Значения шума и сигнала не должны быть ниже min_value
+
+    :param signal_data: ДатаФрейм уровней сигнала
+    :param noise_data: ДатаФрейм уровней шума (с теми же индексами, что и signal_data)
+    :param min_value: минимально допустимое значение уровня
+    :return: заполненные копии ДатаФреймов сигналов и шумов
+    """
+    noise = noise_data.to_numpy(dtype=float, copy=True)
+
+    # Максимальный шум на каждой частоте (без учета NaN), растянутый на все направления
+    noise_max = np.fmax.reduce(noise, axis=1, keepdims=True)
+    noise = np.where(np.isnan(noise), noise_max, noise)
+    noise = np.where(noise < min_value, min_value, noise)
+
+    # Максимум уже заполненного шума. fmin, как и встроенный min, при NaN максимума шума вернет min_value
+    filled_noise_max = np.fmax.reduce(noise, axis=1, keepdims=True)
+    signal = signal_data.to_numpy(dtype=float, copy=True)
+    signal = np.where(np.isnan(signal), np.fmin(min_value, filled_noise_max - 10), signal)
+    signal = np.where(signal < min_value, min_value, signal)
+
+    filled_signal = pd.DataFrame(signal, index=signal_data.index, columns=signal_data.columns)
+    filled_noise = pd.DataFrame(noise, index=noise_data.index, columns=noise_data.columns)
+    return filled_signal, filled_noise
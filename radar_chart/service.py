@@ -0,0 +1,398 @@
+"""
+Локальная служба построения графиков.
+
+Служба работает постоянно и хранит загруженные данные папок в памяти (LRU с ограничением объема),
+поэтому повторные запросы по той же папке не читают файлы заново и не импортируют библиотеки.
+Данные папки загружаются заново, если в ней изменились, появились или удалились файлы.
+Служба принимает запросы только с этого компьютера (127.0.0.1).
+
+Запросы:
+    GET /render?type=r2-many&dir=<папка>&max_y_tick=13&profile=draft - график (PNG или PDF по профилю)
+    GET /render?type=levels-many&dir=<папка>&format=csv - таблица уровней (CSV)
+    GET /status - состояние кэша (JSON)
+
+Параметры /render: type - r2, r2-many, levels, levels-many; dir - папка (для сравнения - несколько dir);
+max_y_tick - предел шкалы; col_count - количество колонок графиков уровней;
+profile - профиль вывода (draft, final, vector); format - image или csv.
+В ответе заголовок X-Cache: hit - все данные взяты из кэша, miss - данные загружены.
+
+Запуск из корня репозитория:
+    python -m radar_chart.service --port 8765 --cache-size 1024
+"""
+import argparse
+import collections
+import hashlib
+import io
+import json
+import logging
+import os
+import pathlib
+import sys
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Служба доступна только с этого компьютера
+HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Ограничение объема загруженных данных в кэше по умолчанию, байт
+DEFAULT_CACHE_SIZE = 512 * 1024 * 1024
+
+# Тип запроса -> (класс данных, класс построителя)
+DATA_TYPES = {
+    'r2': ('RadarDataR2', 'RadarR2Plotter'),
+    'r2-many': ('RadarDataR2ManyMeas', 'RadarR2Plotter'),
+    'levels': ('RadarDataLevels', 'RadarLevelsPlotter'),
+    'levels-many': ('RadarDataLevelsManyMeas', 'RadarLevelsPlotter'),
+}
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+    'svg': 'image/svg+xml',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class RequestError(Exception):
+    """Ошибка в параметрах запроса"""
+
+    def __init__(self, message: str, status: int = 400):
+        """
+        :param message: описание ошибки
+        :param status: код ответа HTTP
+        """
+        Exception.__init__(self, message)
+        self.status = status
+
+
+def dir_state(dir_path: pathlib.Path) -> str:
+    """
+    Состояние папки: хэш путей, размеров и времени изменения всех файлов папки и вложенных папок
+
+    :param dir_path: папка
+    :return: шестнадцатеричный хэш
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(dir_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            digest.update(f'{os.path.relpath(path, dir_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+
+def data_size(radar_data) -> int:
+    """
+    Оценка объема памяти загруженных данных: таблицы и массивы в атрибутах объекта
+    и в атрибутах вложенных объектов (например, куба уровней)
+
+    :param radar_data: объект RadarData*
+    :return: объем, байт
+    """
+    import numpy as np
+    import pandas as pd
+
+    def size(value, depth: int) -> int:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) \
+                else int(value.memory_usage(deep=True))
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, dict):
+            return sum(size(item, depth) for item in value.values())
+        if depth > 0:
+            slots = getattr(type(value), '__slots__', ())
+            attributes = [getattr(value, name, None) for name in slots]
+            attributes += list(getattr(value, '__dict__', {}).values())
+            return sum(size(item, depth - 1) for item in attributes)
+        return 0
+
+    return size(radar_data, 2)
+
+
+class CacheEntry(NamedTuple):
+    """Загруженные данные папки в кэше"""
+    state: str
+    data: object
+    size: int
+
+
+class DataCache:
+    """
+    Кэш загруженных данных RadarData* с вытеснением давно не использованных данных (LRU)
+    при превышении ограничения объема. Ключ - тип данных и папка, данные загружаются заново
+    при изменении состояния папки (см. dir_state). Потокобезопасен
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param max_size: ограничение объема загруженных данных, байт. Данные больше ограничения не кэшируются
+        """
+        self.max_size = max_size
+        self._entries: 'collections.OrderedDict[Tuple[str, pathlib.Path], CacheEntry]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+        # Загрузка одной папки выполняется один раз, даже если ее одновременно запросили несколько потоков
+        self._loading: Dict[Tuple[str, pathlib.Path], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data_type: str, dir_path: pathlib.Path) -> Tuple[object, bool]:
+        """
+        Получить загруженные данные папки
+
+        :param data_type: тип данных (ключ DATA_TYPES)
+        :param dir_path: папка с измерениями
+        :return: данные и признак того, что они взяты из кэша
+        """
+        key = (data_type, dir_path)
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            state = dir_state(dir_path)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.state == state:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.data, True
+                self.misses += 1
+
+            data = self._load(data_type, dir_path)
+            size = data_size(data)
+            with self._lock:
+                self._entries.pop(key, None)
+                if size <= self.max_size:
+                    self._entries[key] = CacheEntry(state, data, size)
+                    self._evict()
+            return data, False
+
+    @property
+    def size(self) -> int:
+        """Объем данных в кэше, байт"""
+        with self._lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def status(self) -> dict:
+        """Состояние кэша: объем, попадания, промахи и загруженные папки в порядке использования"""
+        with self._lock:
+            return {
+                'size': sum(entry.size for entry in self._entries.values()),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': [{'type': data_type, 'dir': str(dir_path), 'size': entry.size}
+                            for (data_type, dir_path), entry in self._entries.items()],
+            }
+
+    def clear(self) -> None:
+        """Очистить кэш"""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self) -> None:
+        """Вытеснить давно не использованные данные до ограничения объема"""
+        total = sum(entry.size for entry in self._entries.values())
+        while total > self.max_size:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.size
+
+    @staticmethod
+    def _load(data_type: str, dir_path: pathlib.Path):
+        """Загрузить данные папки"""
+        from .radarplot import radar_data
+
+        start = time.perf_counter()
+        data = getattr(radar_data, DATA_TYPES[data_type][0])(str(dir_path)).load()
+        logger.info('Загружено %s %s за %.2f с', data_type, dir_path, time.perf_counter() - start)
+        return data
+
+
+@dataclass
+class RenderRequest:
+    """Параметры запроса построения"""
+    data_type: str
+    dirs: List[pathlib.Path]
+    max_y_tick: Optional[int] = None
+    col_count: int = 5
+    profile: str = 'final'
+    output: str = 'image'
+
+    @classmethod
+    def from_query(cls, query: Dict[str, List[str]]) -> 'RenderRequest':
+        """
+        Разобрать параметры строки запроса
+
+        :param query: параметры (urllib.parse.parse_qs)
+        :raises RequestError: недопустимые параметры или папка не найдена
+        """
+        from .radarplot.plotter.profiles import PROFILES
+
+        def single(name: str, default: Optional[str] = None) -> Optional[str]:
+            values = query.get(name, [])
+            if len(values) > 1:
+                raise RequestError(f'Параметр {name} задан несколько раз')
+            return values[0] if values else default
+
+        def integer(name: str, default: Optional[int]) -> Optional[int]:
+            value = single(name)
+            if value is None:
+                return default
+            try:
+                value = int(value)
+            except ValueError:
+                raise RequestError(f'Параметр {name} должен быть целым числом: {value!r}') from None
+            if value <= 0:
+                raise RequestError(f'Параметр {name} должен быть положительным: {value}')
+            return value
+
+        data_type = single('type')
+        if data_type not in DATA_TYPES:
+            raise RequestError(f'Параметр type должен быть одним из: {", ".join(DATA_TYPES)}')
+        profile = single('profile', cls.profile)
+        if profile not in PROFILES:
+            raise RequestError(f'Параметр profile должен быть одним из: {", ".join(PROFILES)}')
+        output = single('format', cls.output)
+        if output not in ('image', 'csv'):
+            raise RequestError('Параметр format должен быть image или csv')
+
+        dirs = [pathlib.Path(value).resolve() for value in query.get('dir', [])]
+        if not dirs:
+            raise RequestError('Не задана папка (параметр dir)')
+        if output == 'csv' and len(dirs) > 1:
+            raise RequestError('Таблица строится по одной папке')
+        for dir_path in dirs:
+            if not dir_path.is_dir():
+                raise RequestError(f'Папка не найдена: {dir_path}', status=404)
+
+        return cls(data_type, dirs, integer('max_y_tick', None), integer('col_count', cls.col_count),
+                   profile, output)
+
+
+class RenderService:
+    """Построение графиков и таблиц по запросам с кэшированием загруженных данных"""
+
+    def __init__(self, cache: Optional[DataCache] = None):
+        """
+        :param cache: кэш загруженных данных (по умолчанию - с ограничением DEFAULT_CACHE_SIZE)
+        """
+        self.cache = cache if cache is not None else DataCache()
+
+    def render(self, request: RenderRequest) -> Tuple[str, bytes, bool]:
+        """
+        Выполнить запрос
+
+        :return: тип содержимого, содержимое и признак того, что все данные взяты из кэша
+        """
+        loaded = [self.cache.get(request.data_type, dir_path) for dir_path in request.dirs]
+        data_list = [data for data, _ in loaded]
+        hit = all(cached for _, cached in loaded)
+
+        if request.output == 'csv':
+            # Для уровней многих измерений - итоговая таблица (как в save_data), для остальных - данные по углам
+            data = data_list[0]
+            frame = data.output_data if request.data_type == 'levels-many' else data.data
+            return CONTENT_TYPES['csv'], frame.to_csv().encode('utf-8'), hit
+
+        from .radarplot import plotter
+        from .radarplot.plotter.profiles import get_profile
+
+        plotter_class = getattr(plotter, DATA_TYPES[request.data_type][1])
+        kwargs = {'col_count': request.col_count} if plotter_class.__name__ == 'RadarLevelsPlotter' else {}
+        profile = get_profile(request.profile)
+        buffer = io.BytesIO()
+        plotter_class(data_list, max_y_tick=request.max_y_tick, profile=profile, **kwargs).save(buffer)
+        return CONTENT_TYPES[profile.format], buffer.getvalue(), hit
+
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """Обработчик запросов службы (служба - в self.server.service)"""
+
+    server_version = 'RadarChartService/1.0'
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        try:
+            if url.path == '/render':
+                start = time.perf_counter()
+                request = RenderRequest.from_query(urllib.parse.parse_qs(url.query))
+                content_type, body, hit = self.server.service.render(request)
+                self._send(200, content_type, body, {
+                    'X-Cache': 'hit' if hit else 'miss',
+                    'X-Render-Time': f'{time.perf_counter() - start:.3f}',
+                })
+            elif url.path == '/status':
+                self._send(200, 'application/json', json.dumps(self.server.service.cache.status(),
+                                                               ensure_ascii=False).encode('utf-8'))
+            else:
+                raise RequestError(f'Неизвестный адрес: {url.path}', status=404)
+        except RequestError as error:
+            self._send(error.status, 'text/plain; charset=utf-8', str(error).encode('utf-8'))
+        except Exception as error:
+            logger.exception('Ошибка запроса %s', self.path)
+            self._send(500, 'text/plain; charset=utf-8', f'{type(error).__name__}: {error}'.encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, body: bytes, headers: Dict[str, str] = None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.info('%s %s', self.address_string(), format % args)
+
+
+def make_server(port: int = DEFAULT_PORT, cache_size: int = DEFAULT_CACHE_SIZE) -> ThreadingHTTPServer:
+    """
+    Создать сервер службы на 127.0.0.1 (запросы обрабатываются в отдельных потоках)
+
+    :param port: порт (0 - любой свободный, см. server.server_address)
+    :param cache_size: ограничение объема загруженных данных в кэше, байт
+    :return: сервер; служба - в server.service
+    """
+    server = ThreadingHTTPServer((HOST, port), RenderHandler)
+    server.daemon_threads = True
+    server.service = RenderService(DataCache(cache_size))
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m radar_chart.service',
+                                     description='Локальная служба построения графиков R2 и уровней')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='порт на 127.0.0.1')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE // 2 ** 20,
+                        help='ограничение объема загруженных данных в памяти, МиБ')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    server = make_server(args.port, args.cache_size * 2 ** 20)
+    logger.info('Служба запущена: http://%s:%d/', *server.server_address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
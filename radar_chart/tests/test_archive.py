@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+from radar_chart.radarplot.radar_data import archive
+
+
+class TestArchive(unittest.TestCase):
+
+    def setUp(self):
+        source = pathlib.Path(r'radar_chart/tests/data/DataSet 3/9. VGA [кабель - НВИТ, нагрузка - БК-ТЗ-А1] (все частоты + фон)').resolve()
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.dir = self.temp_dir.joinpath('meas')
+        shutil.copytree(source, self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def check_round_trip(self, archive_format: str):
+        """Данные, загруженные из архива, совпадают с данными, загруженными из папки"""
+        levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        r2_data = RadarDataR2ManyMeas(str(self.dir))
+        path = self.temp_dir.joinpath('archive')
+        levels_data.to_archive(path, archive_format)
+        r2_data.to_archive(path, archive_format)
+
+        # Загрузка из архива не обращается к файлам измерений
+        shutil.rmtree(self.dir)
+        levels_loaded = RadarDataLevelsManyMeas.from_archive(path)
+        r2_loaded = RadarDataR2ManyMeas.from_archive(path)
+
+        pd.testing.assert_frame_equal(levels_loaded.data, levels_data.data, check_exact=True)
+        pd.testing.assert_frame_equal(levels_loaded.noise, levels_data.noise, check_exact=True)
+        pd.testing.assert_frame_equal(levels_loaded.output_data, levels_data.output_data, check_exact=True)
+        pd.testing.assert_frame_equal(levels_loaded.raw_data, levels_data.raw_data, check_exact=True)
+        self.assertEqual(levels_loaded.max_r2, levels_data.max_r2)
+        self.assertEqual(levels_loaded.files, levels_data.files)
+        for name in ['signal', 'noise', 'r2']:
+            np.testing.assert_array_equal(getattr(levels_loaded.cube, name), getattr(levels_data.cube, name))
+        np.testing.assert_array_equal(levels_loaded.cube.interfaces, levels_data.cube.interfaces)
+
+        pd.testing.assert_frame_equal(r2_loaded.data, r2_data.data, check_exact=True)
+        self.assertEqual(r2_loaded.files, r2_data.files)
+        self.assertEqual(r2_loaded.stats.meas_names, r2_data.stats.meas_names)
+
+        meta = archive.read_meta(path)
+        self.assertEqual(meta['format'], archive_format)
+        self.assertEqual(meta['parts']['levels']['provenance']['source_dir'], str(self.dir))
+        self.assertEqual(meta['parts']['levels']['provenance']['file_count'], len(levels_data.files))
+
+    def test_npz(self):
+        self.check_round_trip('npz')
+
+    @unittest.skipIf(archive.pyarrow is None, 'pyarrow не установлен')
+    def test_parquet(self):
+        self.check_round_trip('parquet')
+
+    @unittest.skipIf(archive.pyarrow is None, 'pyarrow не установлен')
+    def test_feather(self):
+        self.check_round_trip('feather')
+
+    def test_missing_part(self):
+        """Чтение отсутствующего раздела архива"""
+        path = RadarDataR2ManyMeas(str(self.dir)).to_archive(self.temp_dir.joinpath('archive'), 'npz')
+        with self.assertRaises(archive.ArchiveError):
+            RadarDataLevelsManyMeas.from_archive(path)
+        with self.assertRaises(archive.ArchiveError):
+            RadarDataLevelsManyMeas.from_archive(self.temp_dir.joinpath('missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
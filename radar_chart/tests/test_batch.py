@@ -0,0 +1,48 @@
+import io
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+from radar_chart.batch import BatchOptions, expand_dirs, read_manifest, run_batch
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_failure_isolation(self):
+        """Ошибка в одной папке не мешает построению отчетов по остальным"""
+
+        good_dir = pathlib.Path(r'radar_chart/tests/data/DataSet 3/9. VGA [кабель - НВИТ, нагрузка - БК-ТЗ-А1] (все частоты + фон)').resolve()
+        bad_dir = self.temp_dir.joinpath('bad')
+        bad_dir.mkdir()
+        bad_dir.joinpath('not a measurement').write_text('')
+
+        options = BatchOptions(levels=False, output_dir=self.temp_dir.joinpath('out'))
+        results = run_batch([bad_dir, good_dir], options, workers=2, stream=io.StringIO())
+
+        self.assertEqual([result.dir_name for result in results], [str(bad_dir), str(good_dir)])
+        self.assertFalse(results[0].ok)
+        self.assertIn('загрузка', results[0].error)
+
+        self.assertTrue(results[1].ok, results[1].error)
+        self.assertEqual(set(results[1].timings), {'load', 'r2', 'csv'})
+        for output in results[1].outputs:
+            self.assertTrue(pathlib.Path(output).is_file())
+            self.assertEqual(pathlib.Path(output).parent, options.output_dir)
+
+    def test_manifest(self):
+        """Папки из файла-списка раскрываются по шаблонам без повторов, комментарии пропускаются"""
+
+        for name in ['a', 'b']:
+            self.temp_dir.joinpath(name).mkdir()
+        manifest = self.temp_dir.joinpath('manifest.txt')
+        manifest.write_text(f'# кампания\n\n{self.temp_dir}/*\n{self.temp_dir}/a\n', encoding='utf-8')
+
+        dirs = expand_dirs(read_manifest(manifest))
+        self.assertEqual(dirs, [self.temp_dir.joinpath('a'), self.temp_dir.joinpath('b')])
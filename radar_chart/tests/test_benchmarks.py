@@ -0,0 +1,45 @@
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+from radar_chart.benchmarks.suite import compare
+from radar_chart.benchmarks.synthetic import TreeSize, generate_tree
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_synthetic_tree(self):
+        """Синтетические данные читаются загрузчиками и имеют заданный размер"""
+        size = TreeSize(meas=2, polarisations=2, angles=4, frequencies=10)
+        files = generate_tree(self.temp_dir, size)
+        self.assertEqual(len(files), size.file_count)
+
+        levels_data = RadarDataLevelsManyMeas(str(self.temp_dir))
+        self.assertEqual(levels_data.cube.shape, (2, 2, 4, 10))
+        self.assertEqual(levels_data.data.shape, (4, 10))
+        self.assertEqual(len(RadarDataR2ManyMeas(str(self.temp_dir)).data), 5)
+
+    def test_compare(self):
+        """Ухудшение времени или памяти больше порога отмечается"""
+        baseline = {'benchmarks': {'load': {'best_s': 1.0, 'peak_mib': 10.0},
+                                   'plot': {'best_s': 2.0, 'peak_mib': 10.0}}}
+        current = {'benchmarks': {'load': {'best_s': 1.1, 'peak_mib': 13.0},
+                                  'plot': {'best_s': 3.0, 'peak_mib': 10.0},
+                                  'save': {'best_s': 1.0, 'peak_mib': 1.0}}}
+        regressions = {(comparison.name, comparison.metric)
+                       for comparison in compare(baseline, current, threshold=0.2) if comparison.regression}
+        self.assertEqual(regressions, {('load', 'peak_mib'), ('plot', 'best_s')})
+        self.assertEqual(len(compare(baseline, current)), 4)
+        self.assertFalse(any(comparison.regression for comparison in compare(baseline, current, 0.6, 0.5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
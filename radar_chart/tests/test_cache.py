@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas
+from radar_chart.radarplot.radar_data.cache import ParsedFileCache
+from radar_chart.radarplot.radar_data.ingest import LevelsFileData, read_levels_file
+
+
+class TestParsedFileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        source = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]')
+        self.data_dir = self.temp_dir.joinpath('data')
+        shutil.copytree(source, self.data_dir)
+        self.cache = ParsedFileCache(self.temp_dir.joinpath('cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_warm_reload_same_as_cold(self):
+        """Данные, загруженные из кэша, совпадают с данными, прочитанными из файлов"""
+
+        cold = RadarDataLevelsManyMeas(str(self.data_dir), cache=self.cache).load()
+        self.assertGreater(self.cache.size(), 0)
+
+        warm = RadarDataLevelsManyMeas(str(self.data_dir), cache=self.cache)
+        pd.testing.assert_frame_equal(warm.data, cold.data, check_exact=True)
+        pd.testing.assert_frame_equal(warm.noise, cold.noise, check_exact=True)
+        pd.testing.assert_frame_equal(warm.output_data, cold.output_data, check_exact=True)
+        self.assertEqual(warm.max_r2, cold.max_r2)
+
+    def test_other_reader_bypasses_cache(self):
+        """Кэш хранит только данные read_levels_file: другая функция чтения его не использует"""
+
+        levels_data = RadarDataLevelsManyMeas(str(self.data_dir), cache=self.cache).load()
+        files = levels_data.files[:2]
+        size = self.cache.size()
+
+        names = levels_data.read_files(files, reader=lambda path: path.name)
+        self.assertEqual(names, [file.name for file in files])
+        self.assertEqual(self.cache.size(), size)
+
+    def test_changed_file_is_read_again(self):
+        """После изменения файла запись кэша для него недействительна"""
+
+        file = next(self.data_dir.rglob('*.txt'))
+        self.cache.put(file, read_levels_file(file))
+        self.assertIsNotNone(self.cache.get(file))
+
+        with open(file, 'a', encoding='cp1251') as stream:
+            stream.write('99\t999.000000\t1.00\t1.00\t100.000\t0.10\t0.20\n')
+        self.assertIsNone(self.cache.get(file))
+
+    def test_get_entry_removed_after_read(self):
+        """Запись, удаленная другим процессом сразу после чтения, все равно возвращается"""
+
+        file = next(self.data_dir.rglob('*.txt'))
+        expected = read_levels_file(file)
+        self.cache.put(file, expected)
+
+        with mock.patch('os.utime', side_effect=FileNotFoundError):
+            file_data = self.cache.get(file)
+        np.testing.assert_array_equal(file_data.signal, expected.signal)
+
+    def test_put_replaces_previous_entry(self):
+        """Запись новой версии файла удаляет запись прежней, в том числе сделанную до перезапуска"""
+
+        file = next(self.data_dir.rglob('*.txt'))
+        self.cache.put(file, read_levels_file(file))
+
+        with open(file, 'a', encoding='cp1251') as stream:
+            stream.write('99\t999.000000\t1.00\t1.00\t100.000\t0.10\t0.20\n')
+        cache = ParsedFileCache(self.cache.dir)
+        cache.put(file, read_levels_file(file))
+        entries = list(cache.dir.glob('*.npy'))
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(cache.size(), entries[0].stat().st_size)
+        self.assertEqual(cache.get(file).freq[-1], 999.0)
+
+    def test_invalidate(self):
+        """Записи удаляются из кэша по пути файла и целиком"""
+
+        files = sorted(self.data_dir.rglob('*.txt'))[:2]
+        for file in files:
+            self.cache.put(file, read_levels_file(file))
+
+        self.cache.invalidate(files[0])
+        self.assertIsNone(self.cache.get(files[0]))
+        self.assertIsNotNone(self.cache.get(files[1]))
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(files[1]))
+        self.assertEqual(self.cache.size(), 0)
+
+    def test_lru_eviction(self):
+        """При превышении размера удаляются давно не использовавшиеся записи"""
+
+        files = sorted(self.data_dir.rglob('*.txt'))[:3]
+        data = LevelsFileData(freq=np.arange(100.), signal=np.ones(100), noise=np.zeros(100))
+        self.cache.put(files[0], data)
+        entry_size = self.cache.size()
+        self.cache.max_size = 2 * entry_size
+
+        self.cache.put(files[1], data)
+        # Первая запись использовалась позже второй
+        for entry in self.cache.dir.glob('*.npy'):
+            os.utime(entry, ns=(1, 1))
+        self.cache.get(files[0])
+
+        self.cache.put(files[2], data)
+        self.assertIsNotNone(self.cache.get(files[0]))
+        self.assertIsNone(self.cache.get(files[1]))
+        self.assertIsNotNone(self.cache.get(files[2]))
+        self.assertLessEqual(self.cache.size(), self.cache.max_size)
+
+    def test_eviction_without_rescan(self):
+        """Заполненный кэш вытесняет записи по состоянию в памяти, не просматривая папку кэша"""
+
+        files = sorted(self.data_dir.rglob('*.txt'))[:6]
+        data = LevelsFileData(freq=np.arange(100.), signal=np.ones(100), noise=np.zeros(100))
+        self.cache.put(files[0], data)
+        self.cache.max_size = 3 * self.cache.size()
+
+        with mock.patch.object(ParsedFileCache, '_entries', side_effect=AssertionError('папка просматривается')):
+            for file in files[1:]:
+                self.cache.put(file, data)
+                self.cache.get(files[1])
+
+        self.assertEqual([self.cache.get(file) is not None for file in files], [False, True, False, False, True, True])
+        self.assertEqual(self.cache.size(), sum(entry.stat().st_size for entry in self.cache.dir.glob('*.npy')))
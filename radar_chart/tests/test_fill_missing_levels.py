@@ -0,0 +1,89 @@
+import unittest
+import pathlib
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevels, RadarDataLevelsManyMeas
+from radar_chart.radarplot.utils import fill_missing_levels
+
+
+MIN_VALUE = 0
+
+
+def legacy_fill_missing_levels(signal_data: pd.DataFrame, noise_data: pd.DataFrame):
+    """Прежнее (поячеечное) заполнение пропусков, с которым сравнивается векторное"""
+    signal_data = signal_data.copy()
+    noise_data = noise_data.copy()
+
+    for angle in noise_data:
+        for frequency in noise_data[angle].index.values:
+            if np.isnan(noise_data.at[frequency, angle]):
+                noise_data.at[frequency, angle] = noise_data.loc[frequency].max()
+            if noise_data.at[frequency, angle] < MIN_VALUE:
+                noise_data.at[frequency, angle] = MIN_VALUE
+
+    for angle in signal_data:
+        for frequency in signal_data[angle].index.values:
+            if np.isnan(signal_data.at[frequency, angle]):
+                signal_data.at[frequency, angle] = min(MIN_VALUE, noise_data.loc[frequency].max() - 10)
+            if signal_data.at[frequency, angle] < MIN_VALUE:
+                signal_data.at[frequency, angle] = MIN_VALUE
+
+    return signal_data, noise_data
+
+
+class TestFillMissingLevels(unittest.TestCase):
+
+    def assert_same_as_legacy(self, module_name: str, radar_data_class, path: pathlib.Path):
+        """Перехватывает незаполненные данные загрузчика и сравнивает результат с прежним заполнением"""
+        calls = []
+
+        def recorder(signal_data, noise_data, min_value=0):
+            calls.append((signal_data.copy(), noise_data.copy()))
+            return fill_missing_levels(signal_data, noise_data, min_value)
+
+        with mock.patch(f'radar_chart.radarplot.radar_data.{module_name}.fill_missing_levels', side_effect=recorder):
+            radar_data = radar_data_class(str(path)).load()
+            # Таблицы многих измерений строятся при первом обращении
+            radar_data.data
+
+        self.assertEqual(len(calls), 1)
+        signal_data, noise_data = calls[0]
+        expected_signal, expected_noise = legacy_fill_missing_levels(signal_data, noise_data)
+
+        pd.testing.assert_frame_equal(radar_data.data, expected_signal.sort_index().T.sort_index())
+        pd.testing.assert_frame_equal(radar_data.noise, expected_noise.sort_index().T.sort_index())
+
+    def test_levels_data_sets_same_as_legacy(self):
+        """Векторное заполнение данных одного измерения совпадает с прежним"""
+        for data_set in ['DataSet 1', 'DataSet 2']:
+            with self.subTest(data_set=data_set):
+                path = pathlib.Path(f'radar_chart/tests/data/{data_set}/DVI ВП').resolve()
+                self.assert_same_as_legacy('levels_data', RadarDataLevels, path)
+
+    def test_levels_many_meas_data_sets_same_as_legacy(self):
+        """Векторное заполнение данных многих измерений совпадает с прежним"""
+        for path in sorted(pathlib.Path(r'radar_chart/tests/data/DataSet 3').resolve().iterdir()):
+            with self.subTest(path=path.name):
+                self.assert_same_as_legacy('levels_data_many_meas', RadarDataLevelsManyMeas, path)
+
+    def test_missing_and_negative_values(self):
+        """Пропуски, отрицательные значения и полностью пустые частоты заполняются как прежде"""
+        index = pd.Index([100., 200., 300., 400.])
+        columns = [0., np.pi / 2, np.pi]
+        signal_data = pd.DataFrame([[12., np.nan, -3.],
+                                    [np.nan, np.nan, np.nan],
+                                    [5., 25., np.nan],
+                                    [np.nan, 1., 2.]], index=index, columns=columns)
+        noise_data = pd.DataFrame([[np.nan, 4., -2.],
+                                   [np.nan, np.nan, np.nan],
+                                   [-7., np.nan, -1.],
+                                   [30., np.nan, 3.]], index=index, columns=columns)
+
+        signal, noise = fill_missing_levels(signal_data, noise_data, MIN_VALUE)
+        expected_signal, expected_noise = legacy_fill_missing_levels(signal_data, noise_data)
+
+        pd.testing.assert_frame_equal(signal, expected_signal)
+        pd.testing.assert_frame_equal(noise, expected_noise)
@@ -0,0 +1,116 @@
+import pathlib
+import unittest
+
+import numpy as np
+
+from radar_chart.radarplot.frequencies import (DEFAULT_TOLERANCE, EXACT, FrequencyClusters, FrequencyTolerance,
+                                               unique_frequencies)
+from radar_chart.radarplot.radar_data import RadarDataLevels
+from radar_chart.radarplot.radar_data.ingest import LevelsFileData
+from radar_chart.radarplot.radar_data.levels_cube import LevelsCube, MeasFileRecord
+from radar_chart.radarplot.utils import make_unique_frequency_list
+
+
+SOURCE = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]')
+
+
+def make_file_data(freq, signal):
+    freq = np.array(freq, dtype=np.float64)
+    return LevelsFileData(freq=freq, signal=np.array(signal, dtype=np.float64), noise=np.zeros(len(freq)))
+
+
+class TestFrequencies(unittest.TestCase):
+
+    def test_clusters(self):
+        """Частоты, отличающиеся не больше допуска, совмещаются в кластер с частотой посередине"""
+        tolerance = FrequencyTolerance(absolute=0.1)
+        clusters = FrequencyClusters.from_frequencies([[415.5, 1000.0], [415.6, 1000.0, 1200.0]], tolerance)
+        np.testing.assert_array_equal(clusters.centres, [415.55, 1000.0, 1200.0])
+        np.testing.assert_array_equal(clusters.positions([415.6, 1200.0, 415.5]), [0, 2, 0])
+        with self.assertRaises(ValueError):
+            clusters.positions([415.7])
+
+        self.assertEqual(unique_frequencies([[415.5], [415.6]]).tolist(), [415.5, 415.6])
+        self.assertEqual(make_unique_frequency_list([np.array([415.5]), np.array([415.6])], tolerance), [415.55])
+        with self.assertRaises(ValueError):
+            FrequencyTolerance(relative=1.0)
+
+    def test_relative_tolerance(self):
+        """Относительный допуск растет с частотой"""
+        tolerance = FrequencyTolerance(relative=0.001)
+        clusters = FrequencyClusters.from_frequencies([[100.0, 100.2, 1000.0, 1000.9]], tolerance)
+        np.testing.assert_array_equal(clusters.centres, [100.0, 100.2, 1000.45])
+        self.assertAlmostEqual(tolerance.reach(999.0), 1000.0, places=5)
+        self.assertEqual(EXACT.reach(999.0), 999.0 + 0.5e-6)
+
+    def test_rounded_centres(self):
+        """Канонические частоты округляются как прежнее округление частот, совпадающие - объединяются"""
+        clusters = FrequencyClusters.from_frequencies([[108.0, 216.0], [108.00326, 216.0065]], DEFAULT_TOLERANCE)
+        np.testing.assert_array_equal(clusters.centres, [108.0, 216.0])
+
+        # Разрыв 0.6 МГц больше допуска, но обе частоты округляются до 107
+        clusters = FrequencyClusters.from_frequencies([[106.6, 107.2, 300.0]], DEFAULT_TOLERANCE)
+        np.testing.assert_array_equal(clusters.centres, [107.0, 300.0])
+        np.testing.assert_array_equal(clusters.positions([106.6, 107.2]), [0, 0])
+
+    def test_dense_sweep(self):
+        """Частый равномерный ряд частот делится на кластеры шириной в допуск, а не сливается в один"""
+        sweep = np.round(np.arange(100, 200, 0.1), 1)
+
+        clusters = FrequencyClusters.from_frequencies([sweep], DEFAULT_TOLERANCE)
+        np.testing.assert_array_equal(clusters.centres, np.unique(np.round(sweep)))
+        self.assertLessEqual(np.max(clusters.high - clusters.low), 0.5 + 1.0)
+        self.assertLess(np.max(np.abs(clusters.centres[clusters.positions(sweep)] - sweep)), 1.0)
+
+        tolerance = FrequencyTolerance(absolute=0.1)
+        clusters = FrequencyClusters.from_frequencies([sweep], tolerance)
+        self.assertGreater(len(clusters), 400)
+        self.assertLessEqual(np.max(clusters.high - clusters.low), 0.1 + 1e-6)
+        self.assertTrue(np.all(np.diff(clusters.centres) > 0))
+
+    def test_extend_same_as_fresh(self):
+        """Дополнение кластеров дает те же кластеры, что и построение по всем частотам сразу"""
+        rng = np.random.default_rng(1)
+        tolerance = FrequencyTolerance(absolute=0.5)
+        # Составляющие через 5 МГц, измеренные в разных файлах с разбросом до 0.2 МГц
+        lines = np.arange(100.0, 1000.0, 5.0)
+        first = np.round(rng.choice(lines, 100) + rng.uniform(-0.2, 0.2, 100), 3)
+        second = np.round(rng.choice(lines, 100) + rng.uniform(-0.2, 0.2, 100), 3)
+
+        clusters = FrequencyClusters.from_frequencies([first], tolerance)
+        extended, labels = clusters.extend([second])
+        fresh = FrequencyClusters.from_frequencies([first, second], tolerance)
+        np.testing.assert_array_equal(extended.low, fresh.low)
+        np.testing.assert_array_equal(extended.high, fresh.high)
+        np.testing.assert_array_equal(labels, extended.positions(clusters.low))
+
+    def test_cube_merges_clusters(self):
+        """Новая частота объединяет кластеры куба: в ячейке остается максимальное значение"""
+        records = [MeasFileRecord('a', 'Измерение 1', 'DVI', 'ГП', 0.0, 10.0),
+                   MeasFileRecord('b', 'Измерение 1', 'DVI', 'ГП', 1.0, 10.0)]
+        cube = LevelsCube.from_files(records, [make_file_data([100.4, 101.2], [20.0, 30.0]),
+                                               make_file_data([200.0], [40.0])], DEFAULT_TOLERANCE)
+        np.testing.assert_array_equal(cube.frequencies, [100.0, 101.0, 200.0])
+
+        # 100.8 присоединяется к 100.4, середина кластера округляется до 101 - как у кластера 101.2
+        new_record = MeasFileRecord('c', 'Измерение 1', 'DVI', 'ГП', 1.0, 10.0)
+        files_data = [make_file_data([200.0], [40.0]), make_file_data([100.8], [25.0])]
+        self.assertIsNone(cube.replace_groups([records[1], new_record], files_data, DEFAULT_TOLERANCE))
+        np.testing.assert_array_equal(cube.frequencies, [101.0, 200.0])
+        np.testing.assert_array_equal(cube.signal[0, 0, :, 0], [30.0, 25.0])
+        np.testing.assert_array_equal(cube.signal[0, 0, :, 1], [np.nan, 40.0])
+
+    def test_single_folder_levels(self):
+        """Уровни одной папки по умолчанию совмещают только совпадающие частоты, допуск задается явно"""
+        folder = next(path for path in sorted(SOURCE.rglob('*')) if path.is_dir() and any(path.glob('*.txt')))
+        levels_data = RadarDataLevels(str(folder)).load()
+        files_data = levels_data.read_files(levels_data.files)
+        self.assertEqual(levels_data.frequencies,
+                         np.unique(np.concatenate([file_data.freq for file_data in files_data])).tolist())
+
+        tolerant = RadarDataLevels(str(folder), frequency_tolerance=DEFAULT_TOLERANCE).load()
+        self.assertEqual(tolerant.frequencies, np.unique(np.round(levels_data.frequencies)).tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
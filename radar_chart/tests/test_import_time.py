@@ -0,0 +1,63 @@
+import pathlib
+import subprocess
+import sys
+import unittest
+from typing import Dict
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+
+# Предельное время импорта (с запасом для медленных машин), мкс
+STARTUP_BUDGET_US = {
+    'radar_chart.index': 1_500_000,
+    'radar_chart.radarplot.radar_data': 300_000,
+    'radar_chart.radarplot.plotter': 300_000,
+}
+
+
+def import_times(statement: str) -> Dict[str, int]:
+    """
+    Выполнить statement в новом интерпретаторе с -X importtime
+
+    :return: имя модуля -> суммарное время импорта (с вложенными модулями), мкс
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                               capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def assert_imported(self, times: Dict[str, int], module: str, imported: bool = True):
+        self.assertEqual(module in times, imported, f'{module}: {"не " if imported else ""}импортирован')
+
+    def test_data_layer_without_matplotlib(self):
+        """Данные и индекс импортируются без matplotlib и pandas, построители - без matplotlib"""
+        for module, budget in STARTUP_BUDGET_US.items():
+            with self.subTest(module=module):
+                times = import_times(f'import {module}')
+                self.assert_imported(times, 'matplotlib', False)
+                self.assert_imported(times, 'pandas', False)
+                self.assertLess(times[module], budget)
+
+    def test_lazy_attributes(self):
+        """Классы загружаются при обращении, модули построителей загружаются один раз"""
+        times = import_times('from radar_chart.radarplot.radar_data import RadarDataR2')
+        self.assert_imported(times, 'radar_chart.radarplot.radar_data.r2_data')
+        self.assert_imported(times, 'radar_chart.radarplot.radar_data.levels_data_many_meas', False)
+        self.assert_imported(times, 'matplotlib', False)
+
+        times = import_times('from radar_chart.radarplot.plotter import RadarLevelsPlotter, RadarR2Plotter')
+        self.assert_imported(times, 'matplotlib')
+        self.assertEqual([name for name in times if name.endswith('plotter.base')],
+                         ['radar_chart.radarplot.plotter.base'])
+
+
+if __name__ == '__main__':
+    unittest.main()
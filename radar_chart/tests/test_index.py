@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+import pandas as pd
+
+from radar_chart.index import MeasurementIndex
+from radar_chart.radarplot.radar_data import RadarDataR2, RadarDataR2ManyMeas
+
+
+class TestMeasurementIndex(unittest.TestCase):
+
+    def setUp(self):
+        data = pathlib.Path('radar_chart/tests/data').resolve()
+        self.root = pathlib.Path(tempfile.mkdtemp())
+        self.campaign = self.root.joinpath('ЭВМ', '9. VGA')
+        shutil.copytree(data.joinpath('DataSet 3', '9. VGA [кабель - НВИТ, нагрузка - БК-ТЗ-А1] (все частоты + фон)'),
+                        self.campaign)
+        self.folder = self.root.joinpath('ВМЦ', 'Оценочные', 'DVI ВП')
+        shutil.copytree(data.joinpath('DataSet 1', 'DVI ВП'), self.folder)
+        self.index = MeasurementIndex(self.root)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.root)
+
+    def test_query(self):
+        """Поиск по полям файлов и загрузка найденных папок"""
+        update = self.index.update()
+        file_count = sum(len(files) for _, _, files in os.walk(self.root) if files and files[0].endswith('.txt'))
+        self.assertEqual((update.added, update.updated, update.removed, update.failed), (file_count, 0, 0, 0))
+
+        entries = self.index.query(interface='DVI', polarisation='ВП', angle=90)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual((entries[0].device, entries[0].campaign, entries[0].r2), ('ВМЦ', None, 3))
+
+        campaign_files = self.index.query(campaign='ЭВМ/9. VGA')
+        self.assertTrue(campaign_files)
+        self.assertEqual({entry.meas_name for entry in campaign_files}, {'Измерение 1', 'Измерение 2', 'Измерение 3'})
+        self.assertEqual({entry.interface for entry in campaign_files}, {'HDMI'})
+
+        strong = self.index.query(min_r2=4)
+        self.assertEqual(strong, [entry for entry in self.index.query() if entry.r2 >= 4])
+
+        # Пики: наибольший уровень файла
+        peaks = self.index.peaks(entries[0].path)
+        self.assertEqual(peaks, sorted(peaks, key=lambda peak: -peak[1]))
+        self.assertEqual(self.index.query(min_signal=peaks[0][1] + 0.01, interface='DVI', angle=90), [])
+        self.assertEqual(self.index.query(freq_range=(peaks[0][0], peaks[0][0]), interface='DVI', angle=90), entries)
+
+        # Загрузка найденных папок: кампания многих измерений и отдельная папка
+        loaded = self.index.load('r2')
+        self.assertEqual([type(radar_data) for radar_data in loaded], [RadarDataR2, RadarDataR2ManyMeas])
+        pd.testing.assert_frame_equal(loaded[1].data, RadarDataR2ManyMeas(str(self.campaign)).data)
+
+    def test_campaign_structure(self):
+        """Кампания многих измерений определяется по структуре папок, а не по именам папок измерений"""
+        for meas_dir, name in zip(sorted(self.campaign.iterdir()), ['Замер 1', '2', 'Контрольное']):
+            meas_dir.rename(self.campaign.joinpath(name))
+        self.index.update()
+
+        campaign_files = self.index.query(campaign='ЭВМ/9. VGA')
+        self.assertEqual(len(campaign_files), len(self.index.query(device='ЭВМ')))
+        self.assertEqual({entry.meas_name for entry in campaign_files}, {'Замер 1', '2', 'Контрольное'})
+        self.assertEqual([type(radar_data) for radar_data in self.index.load('r2', device='ЭВМ')],
+                         [RadarDataR2ManyMeas])
+
+        # Папка поляризации, добавленная прямо в кампанию, нарушает структуру: файлы кампании становятся
+        # файлами отдельных папок без чтения заново
+        shutil.copytree(self.folder, self.campaign.joinpath('DVI ВП'))
+        update = self.index.update()
+        self.assertEqual((update.added, update.updated), (len(list(self.folder.iterdir())), len(campaign_files)))
+        self.assertEqual(self.index.query(campaign='ЭВМ/9. VGA'), [])
+        self.assertNotIn(RadarDataR2ManyMeas, [type(radar_data) for radar_data in self.index.load('r2')])
+
+    def test_incremental_update(self):
+        """Повторное обновление читает только измененные файлы"""
+        self.index.update()
+        self.assertEqual(self.index.update(), (0, 0, 0, 0))
+
+        files = sorted(self.folder.iterdir())
+        files[0].unlink()
+        stat = files[1].stat()
+        os.utime(files[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.index.update(), (0, 1, 1, 0))
+
+        # Индекс сохраняется между сеансами
+        self.index.close()
+        self.index = MeasurementIndex(self.root)
+        self.assertEqual(self.index.update(), (0, 0, 0, 0))
+        self.assertEqual(len(self.index.query(device='ВМЦ')), len(files) - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
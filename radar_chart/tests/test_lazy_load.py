@@ -0,0 +1,94 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevels, RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+from radar_chart.radarplot.radar_data.base import BaseRadarData
+from radar_chart.radarplot.utils import fill_missing_levels
+
+
+SOURCE = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]')
+
+
+class TestLazyLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.dir = self.temp_dir.joinpath('data')
+        shutil.copytree(SOURCE, self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_construction_reads_nothing(self):
+        """Создание объекта не читает папку, список файлов не требует чтения файлов данных"""
+        with mock.patch.object(BaseRadarData, 'read_files') as read_files, \
+                mock.patch('radar_chart.radarplot.radar_data.base_many_meas_data.scan_many_meas') as scan:
+            levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        scan.assert_not_called()
+        read_files.assert_not_called()
+        self.assertFalse(levels_data.loaded)
+
+        with mock.patch.object(BaseRadarData, 'read_files') as read_files:
+            self.assertTrue(levels_data.files)
+            self.assertEqual(len(levels_data.files_table), len(levels_data.files))
+        read_files.assert_not_called()
+        self.assertFalse(levels_data.loaded)
+
+    def test_load_on_first_access(self):
+        """Данные загружаются один раз при первом обращении и совпадают с загруженными явно"""
+        expected = RadarDataLevelsManyMeas(str(self.dir)).load()
+        levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        with mock.patch.object(RadarDataLevelsManyMeas, 'make_data', autospec=True,
+                               side_effect=RadarDataLevelsManyMeas.make_data) as make_data:
+            self.assertEqual(levels_data.max_r2, expected.max_r2)
+            pd.testing.assert_frame_equal(levels_data.noise, expected.noise)
+            pd.testing.assert_frame_equal(levels_data.output_data, expected.output_data)
+            self.assertEqual(levels_data.cube.shape, expected.cube.shape)
+        self.assertEqual(make_data.call_count, 1)
+        self.assertTrue(levels_data.loaded)
+
+        single_dir = next(path for path in self.dir.iterdir() if path.is_dir())
+        single_dir = next(path for path in single_dir.iterdir() if path.is_dir())
+        levels = RadarDataLevels(str(single_dir))
+        self.assertEqual(levels.read_frequency_set(), RadarDataLevels(str(single_dir)).load().frequencies)
+
+    def test_frames_on_first_access(self):
+        """Таблицы data и noise строятся из куба при первом обращении один раз и после изменения данных заново"""
+        levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        with mock.patch('radar_chart.radarplot.radar_data.levels_data_many_meas.fill_missing_levels',
+                        side_effect=fill_missing_levels) as fill:
+            levels_data.load()
+            self.assertEqual(levels_data.output_data.index.tolist(), levels_data.frequencies)
+            fill.assert_not_called()
+
+            self.assertIs(levels_data.data, levels_data.data)
+            self.assertIs(levels_data.noise, levels_data.noise)
+            self.assertEqual(fill.call_count, 1)
+
+            file = levels_data.files[0]
+            self.assertIsNotNone(levels_data.update_files([file]))
+            fill.assert_called_once()
+            self.assertIsNotNone(levels_data.noise)
+            self.assertEqual(fill.call_count, 2)
+        pd.testing.assert_frame_equal(levels_data.data, RadarDataLevelsManyMeas(str(self.dir)).data)
+
+    def test_refresh(self):
+        """refresh читает папку заново"""
+        r2_data = RadarDataR2ManyMeas(str(self.dir)).load()
+        meas_dir = sorted(path for path in self.dir.iterdir() if path.is_dir())[0]
+        shutil.copytree(meas_dir, self.dir.joinpath('Измерение 99'))
+
+        self.assertIs(r2_data.refresh(), r2_data)
+        expected = RadarDataR2ManyMeas(str(self.dir))
+        self.assertEqual(r2_data.files, expected.files)
+        pd.testing.assert_frame_equal(r2_data.data, expected.data)
+        self.assertEqual(len(r2_data.stats.meas_names), len(expected.stats.meas_names))
+
+
+if __name__ == '__main__':
+    unittest.main()
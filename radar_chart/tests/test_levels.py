@@ -1,8 +1,11 @@
 import unittest
 import pathlib
 
+import numpy as np
+
 
 from radar_chart.radarplot.plotter import RadarLevelsPlotter
+from radar_chart.radarplot.plotter.levels_plotter import wedge_vertices
 from radar_chart.radarplot.radar_data import RadarDataLevels
 
 
@@ -26,3 +29,43 @@ class TestLevels(unittest.TestCase):
         radar_data = RadarDataLevels(str(path))
         plotter = RadarLevelsPlotter([radar_data])
         self.assertIsNotNone(plotter)
+
+    def test_plot_panels(self):
+        """На каждую частоту строится один график с лепестками шума и сигнала, названия на одной высоте"""
+
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 1/DVI ВП').resolve()
+        radar_data = RadarDataLevels(str(path))
+        plotter = RadarLevelsPlotter([radar_data], max_y_tick=50, col_count=5)
+
+        axes_list = plotter.figure.axes
+        self.assertEqual(len(axes_list), len(plotter.frequency_list))
+        self.assertEqual(len({axes.title.get_position()[1] for axes in axes_list}), 1)
+        for axes, frequency in zip(axes_list, plotter.frequency_list):
+            self.assertEqual(axes.get_title(), f'{frequency} МГц')
+            noise, signal = axes.collections
+            self.assertEqual(len(signal.get_paths()), radar_data.data[frequency].notna().sum())
+
+    def test_wedge_vertices(self):
+        """Лепесток - дуга заданной ширины и радиуса, замкнутая в центре; лепестки без данных пропускаются"""
+
+        vertices, valid = wedge_vertices(np.array([0.0, 1.0, 2.0]), np.array([0.5, 0.5, 0.5]),
+                                         np.array([3.0, np.nan, 5.0]))
+        self.assertEqual(len(vertices), 2)
+        np.testing.assert_array_equal(valid, [True, False, True])
+        np.testing.assert_allclose(vertices[1][[0, -2, -1]], [[1.75, 5.0], [2.25, 5.0], [2.0, 0.0]])
+
+    def test_nan_wedge_colors(self):
+        """Лепестки без данных пропускаются, и цвета остальных лепестков не сдвигаются"""
+
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 1/DVI ВП').resolve()
+        radar_data = RadarDataLevels(str(path)).load()
+        radar_data.data = radar_data.data.copy()
+        radar_data.data.iloc[1, 0] = np.nan
+        plotter = RadarLevelsPlotter([radar_data], max_y_tick=50)
+
+        _, signal = plotter.figure.axes[0].collections
+        layer = plotter._layers[0]
+        valid = ~np.isnan(layer.signal[0])
+        self.assertFalse(valid[1])
+        self.assertEqual(len(signal.get_paths()), valid.sum())
+        np.testing.assert_allclose(signal.get_facecolor()[:, :3], layer.signal_colors[0][valid][:, :3])
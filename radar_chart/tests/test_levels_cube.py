@@ -0,0 +1,70 @@
+import math
+import unittest
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas
+from radar_chart.radarplot.radar_data.levels_cube import CUBE_DTYPE
+
+
+# Прежнее совмещение частот разных файлов: округление до целых МГц
+FREQ_ROUNDING = 0
+
+
+def legacy_long_table_aggregation(radar_data: RadarDataLevelsManyMeas):
+    """Прежняя агрегация по длинной таблице pandas, с которой сравниваются результаты куба"""
+    frames = []
+    for file, file_data in zip(radar_data.files, radar_data.read_files(radar_data.files)):
+        filename = radar_data._get_filename(file)
+        frames.append(pd.DataFrame({
+            'meas_name': radar_data._get_meas_name(file),
+            'angle': radar_data.get_angle_from_filename(filename),
+            'freq': file_data.freq.round(FREQ_ROUNDING),
+            'signal': file_data.signal,
+            'noise': file_data.noise,
+            'R2': radar_data.get_r2_from_filename(filename),
+        }))
+    raw_data = pd.concat(frames, ignore_index=True)
+
+    grouped = raw_data.groupby(['meas_name', 'angle', 'freq'], as_index=False).max()
+    output_data = grouped.groupby(['angle', 'freq'])[['signal', 'noise']].mean().round(1).groupby('freq').max()
+    max_r2 = math.ceil(grouped.groupby(['angle', 'freq'])['R2'].mean().groupby('freq').max().max())
+    signal_data = grouped.groupby(['angle', 'freq'])['signal'].mean().round(1).unstack(level='angle')
+    return output_data, max_r2, signal_data
+
+
+class TestLevelsCube(unittest.TestCase):
+
+    def test_same_as_long_table(self):
+        """Результаты, рассчитанные по кубу, совпадают с расчетом по длинной таблице"""
+
+        for path in sorted(pathlib.Path(r'radar_chart/tests/data/DataSet 3').resolve().iterdir()):
+            with self.subTest(path=path.name):
+                radar_data = RadarDataLevelsManyMeas(str(path))
+                output_data, max_r2, signal_data = legacy_long_table_aggregation(radar_data)
+
+                pd.testing.assert_frame_equal(radar_data.output_data, output_data, check_exact=True)
+                self.assertEqual(radar_data.max_r2, max_r2)
+
+                # Незаполненные (NaN) уровни сигнала в итоговых данных заменяются на MIN_VALUE
+                present = signal_data.notna().to_numpy()
+                np.testing.assert_array_equal(radar_data.data.T.to_numpy()[present], signal_data.to_numpy()[present])
+
+    def test_compact_storage(self):
+        """Данные хранятся в плотном кубе float32, длинная таблица собирается из него по запросу"""
+
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]').resolve()
+        radar_data = RadarDataLevelsManyMeas(str(path))
+        cube = radar_data.cube
+
+        self.assertEqual(cube.signal.dtype, CUBE_DTYPE)
+        self.assertEqual(cube.shape, (len(cube.meas_names), len(cube.polarisations),
+                                      len(cube.angles), len(cube.frequencies)))
+        self.assertEqual(len(cube.records), len(radar_data.files))
+        self.assertFalse(hasattr(cube.records[0], '__dict__'))
+
+        raw_data = radar_data.raw_data
+        self.assertEqual(set(raw_data['meas_name']), set(cube.meas_names))
+        self.assertEqual(sorted(raw_data['freq'].unique()), radar_data.frequencies)
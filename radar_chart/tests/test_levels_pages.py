@@ -0,0 +1,89 @@
+import gc
+import io
+import shutil
+import tempfile
+import unittest
+import weakref
+import pathlib
+
+from radar_chart.radarplot.plotter import RadarLevelsPlotter
+from radar_chart.radarplot.radar_data import RadarDataLevels
+
+
+class TestLevelsPages(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 1/DVI ВП').resolve()
+        cls.radar_data = RadarDataLevels(str(path))
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_pages_by_size(self):
+        """Частоты делятся на страницы по page_size графиков, фигура строится только при сохранении"""
+
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, col_count=5, page_size=6)
+        self.assertIsNone(plotter.figure)
+
+        pages = plotter.pages()
+        self.assertEqual(sum(pages, []), plotter.frequency_list)
+        self.assertTrue(all(len(page) == 6 for page in pages[:-1]))
+
+        paths = plotter.save(self.temp_dir.joinpath('levels.png'), dpi=20)
+        self.assertEqual(len(paths), len(pages))
+        self.assertEqual(paths[0].name, 'levels [стр. 1].png')
+        self.assertTrue(all(path.is_file() for path in paths))
+
+    def test_pages_by_bands(self):
+        """Страницы по диапазонам частот: частоты вне диапазонов и пустые диапазоны пропускаются"""
+
+        frequencies = RadarLevelsPlotter([self.radar_data], bands=[]).frequency_list
+        middle = frequencies[len(frequencies) // 2]
+        plotter = RadarLevelsPlotter([self.radar_data], bands=[(0, middle), (middle, frequencies[-1]), (1e6, 2e6)])
+
+        self.assertEqual(plotter.pages(), [frequencies[:len(frequencies) // 2],
+                                           frequencies[len(frequencies) // 2:-1]])
+
+    def test_streaming(self):
+        """Страницы строятся по одной: фигура предыдущей страницы освобождается до построения следующей"""
+
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, page_size=5)
+        previous = None
+        for page, figure in plotter.iter_pages():
+            gc.collect()
+            if previous is not None:
+                self.assertIsNone(previous())
+            self.assertEqual(len(figure.axes), len(page))
+            previous = weakref.ref(figure)
+            del figure
+
+    def test_multipage_pdf(self):
+        """При сохранении в PDF все страницы записываются в один файл"""
+
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, page_size=8)
+        paths = plotter.save(self.temp_dir.joinpath('levels.pdf'))
+
+        self.assertEqual(paths, [self.temp_dir.joinpath('levels.pdf')])
+        self.assertIn(f'/Count {len(plotter.pages())}'.encode(), paths[0].read_bytes())
+
+    def test_save_file_object(self):
+        """Страницы записываются в открытый файл многостраничным PDF, в другие форматы - ошибка"""
+
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, page_size=8, profile='vector')
+        buffer = io.BytesIO()
+        self.assertEqual(plotter.save(buffer), [])
+        self.assertTrue(buffer.getvalue().startswith(b'%PDF'))
+        self.assertIn(f'/Count {len(plotter.pages())}'.encode(), buffer.getvalue())
+
+        with self.assertRaises(ValueError):
+            RadarLevelsPlotter([self.radar_data], max_y_tick=50, page_size=8).save(io.BytesIO())
+
+        # Без постраничного вывода save возвращает то же: список путей
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, profile='draft')
+        self.assertEqual(plotter.save(self.temp_dir.joinpath('levels.png')), [self.temp_dir.joinpath('levels.png')])
+        plotter = RadarLevelsPlotter([self.radar_data], max_y_tick=50, profile='draft')
+        self.assertEqual(plotter.save(io.BytesIO()), [])
@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+import numpy as np
+
+from radar_chart.radarplot.navigator import NavigatorFormatError, read_navigator_file
+from radar_chart.radarplot.radar_data.ingest import read_levels_file_pandas
+
+
+HEADER = ' ' * 53 + '\nN\tЧаст.МГц\tEсш.дБмкВ\tEш.дБмкВ\tПП.кГц\tПогр.пр.дБ\tПогр.ант.дБ\n'
+
+
+class TestNavigatorReader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, text: str) -> pathlib.Path:
+        path = self.temp_dir.joinpath('E (90) 5м.txt')
+        path.write_bytes(text.encode('cp1251'))
+        return path
+
+    def test_same_as_pandas(self):
+        """Разборщик читает тестовые данные так же, как pandas.read_csv"""
+
+        files = [file for file in pathlib.Path(r'radar_chart/tests/data').rglob('*.txt') if 'Графики' not in file.parts]
+        self.assertTrue(files)
+        for file in files:
+            expected = read_levels_file_pandas(file)
+            for actual, column in zip(read_navigator_file(file), expected):
+                np.testing.assert_array_equal(actual, column)
+
+    def test_empty_table(self):
+        """Файл без строк данных дает пустые массивы"""
+
+        freq, signal, noise = read_navigator_file(self.write(HEADER))
+        self.assertEqual(freq.shape, (0,))
+        self.assertEqual(signal.shape, (0,))
+        self.assertEqual(noise.shape, (0,))
+
+    def test_malformed_line_reported_with_line_number(self):
+        """О строке, которую не удается разобрать, сообщается с именем файла и номером строки"""
+
+        path = self.write(HEADER + '1\t108.003261\t8.80\t3.82\t100.000\t0.10\t0.20\n'
+                                   '2\t216.006521\tнет\t6.87\t100.000\t0.10\t0.20\n')
+        with self.assertRaises(NavigatorFormatError) as context:
+            read_navigator_file(path)
+        self.assertEqual(context.exception.line_number, 4)
+        self.assertIn(path.name, str(context.exception))
+
+    def test_wrong_header(self):
+        """Файл другого формата (без строки заголовка Навигатора) не читается"""
+
+        path = self.write('№ ПП\tЧастота, МГц\tЕс+п, дБмкВ/м\tЕп, дБмкВ/м\tПП, кГц\n'
+                          '1\t10.000000\t12.53\t12.55\t100.000\n')
+        with self.assertRaises(NavigatorFormatError) as context:
+            read_navigator_file(path)
+        self.assertEqual(context.exception.line_number, 1)
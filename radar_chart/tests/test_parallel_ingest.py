@@ -0,0 +1,40 @@
+import unittest
+import pathlib
+
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataLevels, RadarDataLevelsManyMeas
+from radar_chart.radarplot.radar_data.ingest import map_files
+
+
+class TestParallelIngest(unittest.TestCase):
+
+    def test_parallel_levels_data_same_as_serial(self):
+        """Параллельное чтение данных одного измерения дает тот же результат, что и последовательное"""
+
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 1/DVI ВП').resolve()
+        serial = RadarDataLevels(str(path))
+        for executor in ['thread', 'process']:
+            with self.subTest(executor=executor):
+                parallel = RadarDataLevels(str(path), workers=3, executor=executor)
+                pd.testing.assert_frame_equal(parallel.data, serial.data, check_exact=True)
+                pd.testing.assert_frame_equal(parallel.noise, serial.noise, check_exact=True)
+
+    def test_parallel_levels_many_meas_data_same_as_serial(self):
+        """Параллельное чтение данных многих измерений дает тот же результат, что и последовательное"""
+
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]').resolve()
+        serial = RadarDataLevelsManyMeas(str(path))
+        for executor in ['thread', 'process']:
+            with self.subTest(executor=executor):
+                parallel = RadarDataLevelsManyMeas(str(path), workers=4, executor=executor)
+                pd.testing.assert_frame_equal(parallel.data, serial.data, check_exact=True)
+                pd.testing.assert_frame_equal(parallel.noise, serial.noise, check_exact=True)
+                pd.testing.assert_frame_equal(parallel.output_data, serial.output_data, check_exact=True)
+                self.assertEqual(parallel.max_r2, serial.max_r2)
+
+    def test_unknown_executor(self):
+        """Неизвестный тип пула вызывает ошибку"""
+
+        with self.assertRaises(ValueError):
+            map_files(str, ['a', 'b'], workers=2, executor='cluster')
@@ -0,0 +1,142 @@
+import concurrent.futures
+import gc
+import io
+import unittest
+import warnings
+import weakref
+import pathlib
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+from PIL import Image
+
+from radar_chart.radarplot.radar_data import RadarDataR2, RadarDataR2ManyMeas
+from radar_chart.radarplot.plotter import R2FigureTemplate, RadarR2Plotter, get_profile
+
+
+def render(radar_data: RadarDataR2) -> bytes:
+    buffer = io.BytesIO()
+    RadarR2Plotter([radar_data], max_y_tick=13).save(buffer, dpi=40, format='png')
+    return buffer.getvalue()
+
+
+def pixels(image: bytes) -> np.ndarray:
+    return np.asarray(Image.open(io.BytesIO(image)))
+
+
+def max_rss() -> int:
+    """Пиковый объем памяти процесса, КиБ (0, если недоступен)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else 0
+
+
+class TestPlotterFigures(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        path = pathlib.Path(r'radar_chart/tests/data/DataSet 1/DVI ВП').resolve()
+        cls.radar_data = RadarDataR2(str(path))
+
+    def test_save_releases_figure(self):
+        """После сохранения фигура освобождается, повторное сохранение строит график заново"""
+
+        plotter = RadarR2Plotter([self.radar_data])
+        self.assertIsNotNone(plotter.figure)
+
+        first, second = io.BytesIO(), io.BytesIO()
+        plotter.save(first, dpi=40, format='png')
+        self.assertIsNone(plotter.figure)
+        plotter.save(second, dpi=40, format='png')
+        self.assertEqual(first.getvalue(), second.getvalue())
+
+    def test_memory_is_flat(self):
+        """Фигуры освобождаются, и память не растет при построении многих графиков подряд"""
+
+        # Прогрев кэшей шрифтов и текста matplotlib
+        for _ in range(10):
+            render(self.radar_data)
+
+        figures = weakref.WeakSet()
+        gc.collect()
+        start = max_rss()
+        for _ in range(200):
+            plotter = RadarR2Plotter([self.radar_data], max_y_tick=13)
+            figures.add(plotter.figure)
+            plotter.save(io.BytesIO(), dpi=40, format='png')
+        gc.collect()
+        growth = max_rss() - start
+
+        self.assertEqual(len(figures), 0)
+        # Одна неосвобожденная фигура занимает сотни КиБ
+        self.assertLess(growth, 32 * 1024)
+
+    def test_show(self):
+        """График строится на фигуре pyplot без лишних фигур (с неинтерактивным бэкендом Agg окно не открывается)"""
+        import matplotlib.pyplot as plt
+
+        plotter = RadarR2Plotter([self.radar_data], max_y_tick=13)
+        try:
+            with warnings.catch_warnings():
+                # Agg не отображает окна и предупреждает об этом
+                warnings.simplefilter('ignore', UserWarning)
+                plotter.show('agg')
+            self.assertIs(plt.gcf(), plotter.figure)
+            self.assertEqual(plt.get_fignums(), [plotter.figure.number])
+            self.assertIs(plotter.figure.canvas.manager, plt.get_current_fig_manager())
+
+            image = io.BytesIO()
+            plotter.save(image, dpi=40, format='png')
+            self.assertEqual(image.getvalue(), render(self.radar_data))
+        finally:
+            plt.close('all')
+
+    def test_concurrent_rendering(self):
+        """Графики, построенные одновременно в нескольких потоках, совпадают с построенным в одном потоке"""
+
+        expected = render(self.radar_data)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            images = list(pool.map(lambda _: render(self.radar_data), range(32)))
+        for image in images:
+            self.assertEqual(image, expected)
+
+    def test_template_same_as_plotter(self):
+        """Графики, построенные на шаблоне, попиксельно совпадают с графиками RadarR2Plotter"""
+
+        many_data = RadarDataR2ManyMeas(str(next(pathlib.Path(r'radar_chart/tests/data/DataSet 3').iterdir())))
+        template = R2FigureTemplate(13, slots=2)
+        # Шаблон переиспользуется: разные данные, разное количество данных, возврат к прежним данным
+        for data_list in [[many_data], [self.radar_data, many_data], [self.radar_data], [many_data]]:
+            with self.subTest(data=[type(data).__name__ for data in data_list]):
+                expected = io.BytesIO()
+                RadarR2Plotter(data_list, max_y_tick=13).save(expected, dpi=40, format='png')
+                image = io.BytesIO()
+                template.render(data_list, image, dpi=40, format='png')
+                np.testing.assert_array_equal(pixels(image.getvalue()), pixels(expected.getvalue()))
+
+        with self.assertRaises(ValueError):
+            template.render([many_data] * 3, io.BytesIO(), dpi=40, format='png')
+        template.close()
+
+    def test_output_profiles(self):
+        """Профиль задает разрешение, формат и подробность графика"""
+
+        images = {}
+        for profile in ['draft', 'final', 'vector']:
+            buffer = io.BytesIO()
+            RadarR2Plotter([self.radar_data], max_y_tick=13, profile=profile).save(buffer)
+            images[profile] = buffer.getvalue()
+
+        self.assertEqual(pixels(images['draft']).shape[:2], (4.8 * 80, 6.4 * 80))
+        self.assertEqual(pixels(images['final']).shape[:2], (4.8 * 400, 6.4 * 400))
+        self.assertTrue(images['vector'].startswith(b'%PDF'))
+
+        # Без дополнительной сетки черновик отличается от окончательного графика с тем же разрешением
+        final_at_draft_dpi = io.BytesIO()
+        RadarR2Plotter([self.radar_data], max_y_tick=13).save(final_at_draft_dpi, dpi=get_profile('draft').dpi)
+        self.assertNotEqual(images['draft'], final_at_draft_dpi.getvalue())
+
+        with self.assertRaises(ValueError):
+            RadarR2Plotter([self.radar_data], profile='preview')
@@ -0,0 +1,70 @@
+import io
+import json
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+from radar_chart.radarplot import profiling
+from radar_chart.radarplot.plotter import RadarR2Plotter
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = r'radar_chart/tests/data/DataSet 3/9. VGA [кабель - НВИТ, нагрузка - БК-ТЗ-А1] (все частоты + фон)'
+
+    def test_disabled(self):
+        """Без профилировщика этапы не создаются"""
+        self.assertFalse(profiling.enabled())
+        with profiling.span('stage', files=1) as stage:
+            stage.set(rows=2)
+        self.assertIs(stage, profiling.NULL_SPAN)
+
+    def test_stages(self):
+        """Этапы загрузки и построения графиков с вложенностью, счетчиками и памятью"""
+        with profiling.Profiler(memory=True) as profiler:
+            levels_data = RadarDataLevelsManyMeas(self.dir).load()
+            self.assertIsNotNone(levels_data.data)
+            RadarR2Plotter([RadarDataR2ManyMeas(self.dir)]).save(io.BytesIO(), dpi=50, format='png')
+            with self.assertRaises(RuntimeError):
+                profiling.Profiler().__enter__()
+        self.assertFalse(profiling.enabled())
+
+        spans = {}
+        for stage in profiler.spans:
+            spans.setdefault(stage.name, []).append(stage)
+        for name in ['load', 'read_filenames', 'make_data', 'read_files', 'cube', 'aggregate', 'fill_missing',
+                     'make_plot', 'save', 'encode']:
+            self.assertIn(name, spans)
+
+        self.assertEqual(spans['read_filenames'][0].attrs['files'], len(levels_data.files))
+        self.assertEqual(spans['read_filenames'][0].parent, 'load')
+        self.assertEqual(spans['cube'][0].depth, 2)
+        self.assertGreater(spans['read_files'][0].attrs['rows'], 0)
+        self.assertEqual(spans['encode'][0].parent, 'save')
+        load = spans['load'][0]
+        self.assertGreaterEqual(load.peak, spans['make_data'][0].peak)
+        self.assertGreaterEqual(load.duration, spans['make_data'][0].duration)
+
+        summary = profiler.summary()
+        self.assertEqual(summary['load']['count'], 2)
+        self.assertEqual(summary['read_filenames']['attrs']['files'], 2 * len(levels_data.files))
+
+        temp_dir = pathlib.Path(tempfile.mkdtemp())
+        try:
+            profiler.save_chrome_trace(temp_dir.joinpath('trace.json'))
+            trace = json.loads(temp_dir.joinpath('trace.json').read_text(encoding='utf-8'))
+            self.assertEqual(len(trace['traceEvents']), len(profiler.spans))
+            self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in trace['traceEvents']))
+
+            profiler.save_json(temp_dir.joinpath('spans.json'))
+            spans_json = json.loads(temp_dir.joinpath('spans.json').read_text(encoding='utf-8'))
+            self.assertEqual(spans_json['spans'][0]['name'], 'load')
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
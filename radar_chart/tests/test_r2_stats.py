@@ -0,0 +1,91 @@
+import math
+import unittest
+import pathlib
+
+import pandas as pd
+
+from radar_chart.radarplot.radar_data import RadarDataR2ManyMeas
+from radar_chart.radarplot.radar_data.r2_stats import COVERAGE_FACTOR, R2Statistics
+
+
+DATA_DIRS = sorted(pathlib.Path(r'radar_chart/tests/data/DataSet 3').resolve().iterdir())
+
+
+def legacy_r2_aggregation(radar_data: RadarDataR2ManyMeas) -> pd.DataFrame:
+    """Прежний расчет статистики группировками pandas по всем файлам, с которым сравниваются накопители"""
+    raw_data = pd.DataFrame([radar_data._file_values(file) for file in radar_data.files],
+                            columns=['meas_name', 'angle', 'r2', 'rounding'])
+
+    max_in_polarisation = raw_data.groupby(['meas_name', 'angle'], as_index=False)[['r2', 'rounding']].max()
+    grouped_r2_angle = max_in_polarisation.groupby('angle', as_index=False)['r2'].agg(['mean', 'std', 'count'])
+    grouped_rounding_angle = max_in_polarisation.groupby('angle', as_index=False)['rounding'].mean()
+
+    count = grouped_r2_angle['count'].max()
+    uncertainty = grouped_r2_angle['std'] / math.sqrt(count)
+    total_uncertainty = COVERAGE_FACTOR * (uncertainty ** 2 + grouped_rounding_angle['rounding'] ** 2) ** 0.5
+
+    data = pd.DataFrame({'main': grouped_r2_angle['mean'].to_numpy(),
+                         'lower': (grouped_r2_angle['mean'] - total_uncertainty).to_numpy(),
+                         'upper': (grouped_r2_angle['mean'] + total_uncertainty).to_numpy()},
+                        index=pd.Index(grouped_r2_angle['angle'], name='angle'))
+    return pd.concat([data, data[:0]])
+
+
+class TestR2Statistics(unittest.TestCase):
+
+    def assert_same(self, actual: pd.DataFrame, expected: pd.DataFrame):
+        pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12, atol=1e-12)
+
+    def test_same_as_batch(self):
+        """Статистика накопителей совпадает с расчетом группировками по всем файлам"""
+
+        for path in DATA_DIRS:
+            with self.subTest(path=path.name):
+                radar_data = RadarDataR2ManyMeas(str(path))
+                self.assert_same(radar_data.data, legacy_r2_aggregation(radar_data))
+
+    def test_add_remove_measurement(self):
+        """Удаление и повторное добавление измерения дает ту же статистику, что и расчет по оставшимся файлам"""
+
+        path = DATA_DIRS[0]
+        radar_data = RadarDataR2ManyMeas(str(path))
+        expected = radar_data.data
+        meas_name = radar_data.stats.meas_names[-1]
+
+        radar_data.remove_measurement(meas_name)
+        self.assertNotIn(meas_name, radar_data.stats.meas_names)
+        self.assert_same(radar_data.data, legacy_r2_aggregation(radar_data))
+
+        radar_data.add_measurement(meas_name)
+        self.assert_same(radar_data.data, expected)
+
+    def test_merge(self):
+        """Статистики, рассчитанные по разным измерениям отдельно, объединяются в статистику всех измерений"""
+
+        path = DATA_DIRS[1]
+        radar_data = RadarDataR2ManyMeas(str(path))
+
+        parts = {}
+        for file in radar_data.files:
+            meas_name, angle, r2, rounding = radar_data._file_values(file)
+            parts.setdefault(meas_name, R2Statistics()).add_file(meas_name, angle, r2, rounding)
+
+        merged = R2Statistics()
+        for part in parts.values():
+            merged.merge(part)
+        self.assert_same(merged.to_frame(), radar_data.stats.to_frame())
+
+        with self.assertRaises(ValueError):
+            merged.merge(next(iter(parts.values())))
+
+    def test_group_max_update(self):
+        """В статистику угла входит максимум по файлам измерения; удаление файла возвращает прежний максимум"""
+
+        stats = R2Statistics()
+        stats.add_file('1', 0.0, 4.5, 0.3)
+        stats.add_file('2', 0.0, 6.5, 0.3)
+        stats.add_file('1', 0.0, 8.5, 0.3)
+        self.assertEqual(stats.to_frame()['main'].tolist(), [7.5])
+
+        stats.remove_file('1', 0.0, 8.5, 0.3)
+        self.assertEqual(stats.to_frame()['main'].tolist(), [5.5])
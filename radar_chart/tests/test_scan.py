@@ -0,0 +1,55 @@
+import re
+import unittest
+import pathlib
+
+import numpy as np
+
+from radar_chart.radarplot.radar_data import RadarDataR2ManyMeas
+from radar_chart.radarplot.radar_data.scan import files_table, parse_filename, scan_dir, scan_many_meas
+
+
+class TestScan(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = pathlib.Path(r'radar_chart/tests/data/DataSet 3/10. DVI [кабель - доработанный, нагрузка - ВМЦ-61.2ЖК(крэмз 10м)] (все частоты + фон)')
+
+    def test_parse_filename(self):
+        """Разбор имени совпадает с прежним разбором двумя выражениями"""
+        names = ['Е 1903103 FHD DVI (90) 3m ВП.txt', 'E 2300108 Ft=54 VGA ВП (135) 12м.txt',
+                 'E (1) 2300108 (270) 4m.txt', 'DVI) 7 (45) 3m.txt']
+        for name in names:
+            angle = np.deg2rad(float(re.findall(r'\((\d+)\)', name)[0]))
+            r2 = float(re.findall(r'\) (\d+)', name)[0])
+            self.assertEqual(parse_filename(name), (angle, r2), name)
+        with self.assertRaises(IndexError):
+            parse_filename('notes.txt')
+
+    def test_scan_many_meas(self):
+        """Обход папки многих измерений находит те же файлы, что и обход через pathlib"""
+        expected = [file for meas_dir in self.dir.iterdir() if meas_dir.is_dir()
+                    for polarisation in meas_dir.iterdir()
+                    for file in polarisation.iterdir() if file.is_file() and file.name.endswith('.txt')]
+        scanned = scan_many_meas(self.dir)
+        self.assertEqual([file.path for file in scanned], expected)
+
+        for file in scanned:
+            meas_name, polarisation_dir = file.path.relative_to(self.dir).parts[:2]
+            self.assertEqual((file.meas_name, file.interface + ' ' + file.polarisation), (meas_name, polarisation_dir))
+            self.assertEqual((file.angle, file.r2), parse_filename(file.path.name))
+
+        table = files_table(scanned)
+        self.assertEqual(len(table), len(scanned))
+        self.assertEqual(set(table['polarisation']), {'ВП', 'ГП'})
+        self.assertEqual(scan_dir(self.dir), [])
+
+    def test_files_table(self):
+        """Таблица метаданных загруженных данных, в том числе файлов, найденных после загрузки"""
+        radar_data = RadarDataR2ManyMeas(str(self.dir))
+        table = radar_data.files_table
+        self.assertEqual(list(table['path']), radar_data.files)
+        radar_data._scanned.clear()
+        self.assertTrue(radar_data.files_table.equals(table))
+
+
+if __name__ == '__main__':
+    unittest.main()
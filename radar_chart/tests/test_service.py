@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from PIL import Image
+
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas
+from radar_chart.service import DataCache, make_server
+
+
+SOURCE = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]')
+
+
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = make_server(port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.dir = self.temp_dir.joinpath('data')
+        shutil.copytree(SOURCE, self.dir)
+        self.server.service.cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get(self, path: str, **params):
+        host, port = self.server.server_address
+        url = f'http://{host}:{port}{path}?{urllib.parse.urlencode(params, doseq=True)}'
+        try:
+            with urllib.request.urlopen(url) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers, error.read()
+
+    def test_render_cached(self):
+        """Повторный запрос берет данные из кэша, изменение файла папки приводит к загрузке заново"""
+        status, headers, body = self.get('/render', type='r2-many', dir=str(self.dir), max_y_tick=13,
+                                         profile='draft')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'image/png')
+        self.assertEqual(headers['X-Cache'], 'miss')
+        self.assertEqual(Image.open(io.BytesIO(body)).size, (512, 384))
+
+        status, headers, cached_body = self.get('/render', type='r2-many', dir=str(self.dir), max_y_tick=13,
+                                                profile='draft')
+        self.assertEqual(headers['X-Cache'], 'hit')
+        self.assertEqual(cached_body, body)
+
+        file = next(self.dir.rglob('*.txt'))
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        _, headers, _ = self.get('/render', type='r2-many', dir=str(self.dir), max_y_tick=13, profile='draft')
+        self.assertEqual(headers['X-Cache'], 'miss')
+
+        status, _, body = self.get('/status')
+        cache_status = json.loads(body)
+        self.assertEqual((cache_status['hits'], cache_status['misses']), (1, 2))
+        self.assertEqual(len(cache_status['entries']), 1)
+        self.assertGreater(cache_status['size'], 0)
+
+    def test_render_csv(self):
+        """Таблица уровней совпадает с таблицей, сохраняемой save_data"""
+        status, headers, body = self.get('/render', type='levels-many', dir=str(self.dir), format='csv')
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Content-Type'], 'text/csv; charset=utf-8')
+
+        expected = self.temp_dir.joinpath('expected.csv')
+        RadarDataLevelsManyMeas(str(self.dir)).save_data(str(expected))
+        self.assertEqual(body.decode('utf-8'), expected.read_text(encoding='utf-8'))
+
+    def test_bad_requests(self):
+        """Недопустимые параметры - 400, отсутствующая папка - 404"""
+        self.assertEqual(self.get('/render', type='pie', dir=str(self.dir))[0], 400)
+        self.assertEqual(self.get('/render', type='r2-many')[0], 400)
+        self.assertEqual(self.get('/render', type='r2-many', dir=str(self.dir), max_y_tick='x')[0], 400)
+        self.assertEqual(self.get('/render', type='r2-many', dir=str(self.dir), profile='preview')[0], 400)
+        self.assertEqual(self.get('/render', type='r2-many', dir=str(self.temp_dir.joinpath('нет')))[0], 404)
+        self.assertEqual(self.get('/unknown')[0], 404)
+
+    def test_cache_eviction(self):
+        """При превышении ограничения объема вытесняются давно не использованные данные"""
+        other_dir = self.temp_dir.joinpath('other')
+        shutil.copytree(self.dir, other_dir)
+
+        cache = DataCache()
+        cache.get('levels-many', self.dir)
+        # Места хватает только на данные одной папки
+        cache.max_size = cache.size + 1
+        cache.get('levels-many', other_dir)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.status()['entries'][0]['dir'], str(other_dir))
+        self.assertTrue(cache.get('levels-many', other_dir)[1])
+        self.assertFalse(cache.get('levels-many', self.dir)[1])
+
+        cache = DataCache(max_size=1)
+        cache.get('r2-many', self.dir)
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from radar_chart.radarplot.navigator import NavigatorFormatError, read_navigator_file
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas
+from radar_chart.radarplot.radar_data.streaming import FileBandReader
+
+
+SOURCE = pathlib.Path(r'radar_chart/tests/data/DataSet 3/1. DVI [кабель - доработанный, нагрузка - монитор Asus]')
+
+
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.dir = self.temp_dir.joinpath('data')
+        shutil.copytree(SOURCE, self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_file_band_reader(self):
+        """Строки файла, прочитанные по полосам и порциями, совпадают со строками файла"""
+        path = next(self.dir.rglob('*.txt'))
+        expected = read_navigator_file(path)
+        reader = FileBandReader(path, chunk_lines=3)
+
+        bands = []
+        while reader.next_freq() is not None:
+            bands.append(reader.read_band(reader.next_freq() + 250))
+        self.assertGreater(len(bands), 1)
+        for name, column in zip(['freq', 'signal', 'noise'], expected):
+            np.testing.assert_array_equal(np.concatenate([getattr(band, name) for band in bands]), column)
+
+    def test_decreasing_frequencies(self):
+        """Файл с убывающими частотами не обрабатывается по полосам"""
+        path = next(self.dir.rglob('*.txt'))
+        lines = path.read_bytes().split(b'\n')
+        lines[3], lines[4] = lines[4], lines[3]
+        path.write_bytes(b'\n'.join(lines))
+
+        reader = FileBandReader(path, chunk_lines=2)
+        with self.assertRaises(NavigatorFormatError) as error:
+            reader.read_band(np.inf)
+        self.assertEqual(error.exception.line_number, 5)
+
+    def test_save_data_by_bands(self):
+        """Таблица, рассчитанная по полосам частот, совпадает с рассчитанной по загруженным данным"""
+        streaming_data = RadarDataLevelsManyMeas(str(self.dir))
+        streamed = pathlib.Path(streaming_data.save_data(band_width=300))
+        self.assertFalse(streaming_data.loaded)
+        self.assertEqual(list(self.temp_dir.glob('*.part')), [])
+
+        levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        self.assertEqual(streamed.name, f'data [R2={levels_data.max_r2}].csv')
+        bands = list(levels_data.iter_output_bands(300, chunk_lines=4))
+        self.assertGreater(len(bands), 1)
+
+        expected = self.temp_dir.joinpath('expected.csv')
+        levels_data.save_data(str(expected))
+        self.assertEqual(streamed.read_text(encoding='utf-8'), expected.read_text(encoding='utf-8'))
+
+
+if __name__ == '__main__':
+    unittest.main()
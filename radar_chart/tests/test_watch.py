@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pathlib
+
+import pandas as pd
+
+from radar_chart.batch import BatchOptions
+from radar_chart.radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+from radar_chart.watch import MeasurementWatcher
+
+
+class TestWatch(unittest.TestCase):
+
+    def setUp(self):
+        source = pathlib.Path(r'radar_chart/tests/data/DataSet 3/9. VGA [кабель - НВИТ, нагрузка - БК-ТЗ-А1] (все частоты + фон)').resolve()
+        self.temp_dir = pathlib.Path(tempfile.mkdtemp())
+        self.dir = self.temp_dir.joinpath('meas')
+        shutil.copytree(source, self.dir)
+
+        # Файлы, которые "появятся" во время сеанса: один файл первого измерения и все последнее измерение
+        self.held_dir = self.temp_dir.joinpath('held')
+        self.held_dir.mkdir()
+        self.single_file = sorted(self.dir.joinpath('Измерение 1', 'HDMI ВП').iterdir())[-1]
+        shutil.move(self.single_file, self.held_dir.joinpath('single.txt'))
+        shutil.move(self.dir.joinpath('Измерение 3'), self.held_dir.joinpath('Измерение 3'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assert_same_as_fresh(self, watcher: MeasurementWatcher):
+        """Данные наблюдателя совпадают с данными, загруженными заново"""
+        levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        pd.testing.assert_frame_equal(watcher.levels_data.data, levels_data.data, check_exact=True)
+        pd.testing.assert_frame_equal(watcher.levels_data.noise, levels_data.noise, check_exact=True)
+        pd.testing.assert_frame_equal(watcher.levels_data.output_data, levels_data.output_data, check_exact=True)
+        self.assertEqual(watcher.levels_data.max_r2, levels_data.max_r2)
+        pd.testing.assert_frame_equal(watcher.r2_data.data, RadarDataR2ManyMeas(str(self.dir)).data)
+
+    def test_incremental_updates(self):
+        """Появление, изменение и удаление файлов учитывается так же, как полная перезагрузка"""
+
+        watcher = MeasurementWatcher(str(self.dir), render=False)
+        self.assertFalse(watcher.poll())
+
+        # Новый файл в существующих осях: обновляются только затронутые частоты
+        shutil.copy(self.held_dir.joinpath('single.txt'), self.single_file)
+        self.assertFalse(watcher.poll())  # файл еще может записываться
+        self.assertTrue(watcher.poll())
+        self.assert_same_as_fresh(watcher)
+
+        # Новое измерение: оси куба расширяются
+        shutil.copytree(self.held_dir.joinpath('Измерение 3'), self.dir.joinpath('Измерение 3'))
+        watcher.poll()
+        self.assertTrue(watcher.poll())
+        self.assertEqual(len(watcher.levels_data.cube.meas_names), 3)
+        self.assert_same_as_fresh(watcher)
+
+        # Удаление файла
+        self.single_file.unlink()
+        self.assertTrue(watcher.poll())
+        self.assert_same_as_fresh(watcher)
+
+    def test_scale_change_renders_all_pages(self):
+        """Новый файл, поднимающий предел шкалы, перестраивает все страницы графиков уровней"""
+
+        output_dir = self.temp_dir.joinpath('reports')
+        output_dir.mkdir()
+        options = BatchOptions(r2=False, csv=False, levels_page_size=4, output_dir=output_dir)
+        watcher = MeasurementWatcher(str(self.dir), options)
+        page_paths = sorted(output_dir.iterdir())
+        self.assertGreater(len(page_paths), 1)
+        max_y_tick = watcher._levels_max_y_tick
+
+        # Файл с уровнем сигнала на первой частоте, при котором и среднее по измерениям выше прежнего предела шкалы
+        lines = self.held_dir.joinpath('single.txt').read_text(encoding='cp1251').splitlines(keepends=True)
+        values = lines[2].split('\t')
+        values[2] = f'{3 * max_y_tick:.2f}'
+        lines[2] = '\t'.join(values)
+        self.single_file.write_text(''.join(lines), encoding='cp1251')
+
+        for page_path in page_paths:
+            os.utime(page_path, ns=(0, 0))
+        watcher.poll()
+        self.assertTrue(watcher.poll())
+        self.assertGreater(watcher._levels_max_y_tick, max_y_tick)
+        self.assertEqual(sorted(output_dir.iterdir()), page_paths)
+        for page_path in page_paths:
+            self.assertGreater(page_path.stat().st_mtime_ns, 0, page_path.name)
+
+    def test_changed_frequencies(self):
+        """Обновление существующей группы сообщает только о затронутых частотах"""
+
+        levels_data = RadarDataLevelsManyMeas(str(self.dir)).load()
+        shutil.copy(self.held_dir.joinpath('single.txt'), self.single_file)
+
+        frequencies = levels_data.update_files([self.single_file])
+        file_frequencies = set(levels_data.read_files([self.single_file])[0].freq.round())
+        self.assertEqual(set(frequencies), file_frequencies)
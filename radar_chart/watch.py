@@ -0,0 +1,188 @@
+"""
+Наблюдение за папкой измерений во время сеанса измерений.
+
+Папка периодически опрашивается; новые и измененные файлы Навигатора читаются и добавляются
+к уже загруженным данным без полной перезагрузки, после чего перестраиваются затронутые отчеты.
+Время каждого обновления выводится в журнал.
+
+Запуск из корня репозитория:
+    python -m radar_chart.watch "data/ЭВМ БК-ТЗ-4К/1. DVI" --interval 2 --levels-page-size 20
+"""
+import argparse
+import logging
+import os
+import pathlib
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .batch import BatchOptions, levels_max_y_tick, render_levels, render_r2, save_levels_csv
+
+
+logger = logging.getLogger(__name__)
+
+# Состояние файла, по которому определяется его изменение: (размер, время изменения в нс)
+FileState = Tuple[int, int]
+
+
+def take_snapshot(files: List[pathlib.Path]) -> Dict[pathlib.Path, FileState]:
+    """
+    Состояние файлов папки
+
+    :param files: пути к файлам
+    :return: словарь путь -> (размер, время изменения)
+    """
+    snapshot = {}
+    for file in files:
+        try:
+            stat = os.stat(file)
+        except FileNotFoundError:
+            continue
+        snapshot[file] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def diff_snapshots(old: Dict[pathlib.Path, FileState],
+                   new: Dict[pathlib.Path, FileState]) -> Tuple[List[pathlib.Path], List[pathlib.Path]]:
+    """
+    Сравнить состояния папки
+
+    :return: (добавленные или измененные файлы, удаленные файлы)
+    """
+    changed = [file for file, state in new.items() if old.get(file) != state]
+    removed = [file for file in old if file not in new]
+    return changed, removed
+
+
+class MeasurementWatcher:
+    """Наблюдатель за папкой измерений, обновляющий данные и отчеты по мере появления файлов"""
+
+    def __init__(self, dir_path: str, options: BatchOptions = None, render: bool = True):
+        """
+        Загружает данные папки и строит отчеты
+
+        :param dir_path: папка с измерениями
+        :param options: настройки построения отчетов
+        :param render: строить ли отчеты (False - только обновлять данные)
+        """
+        from .radarplot.radar_data import RadarDataLevelsManyMeas, RadarDataR2ManyMeas
+
+        self.dir: pathlib.Path = pathlib.Path(dir_path)
+        self.options: BatchOptions = options if options is not None else BatchOptions()
+        self.render_enabled: bool = render
+
+        self.levels_data = RadarDataLevelsManyMeas(str(self.dir))
+        self.r2_data = RadarDataR2ManyMeas(str(self.dir))
+        self.snapshot: Dict[pathlib.Path, FileState] = take_snapshot(self.levels_data.files)
+
+        # Файлы, изменение которых замечено, но которые, возможно, еще записываются
+        self._pending: Dict[pathlib.Path, FileState] = {}
+        self._csv_path: Optional[str] = None
+        # Предел шкалы сохраненных графиков уровней: при его изменении перестраиваются все страницы
+        self._levels_max_y_tick: Optional[int] = None
+
+        if self.render_enabled:
+            self.render(None)
+
+    def poll(self) -> bool:
+        """
+        Проверить папку и обновить данные и отчеты. Новый или измененный файл обрабатывается,
+        когда его размер и время изменения не меняются между двумя опросами (Навигатор закончил запись)
+
+        :return: были ли обновлены данные
+        """
+        current = take_snapshot(self.levels_data.read_filenames())
+        changed, removed = diff_snapshots(self.snapshot, current)
+
+        settled = [file for file in changed if self._pending.get(file) == current[file]]
+        self._pending = {file: current[file] for file in changed if file not in settled}
+        if not settled and not removed:
+            return False
+
+        start = time.perf_counter()
+        frequencies = self.levels_data.update_files(settled, removed)
+        self.r2_data.update_files(settled, removed)
+        for file in settled:
+            self.snapshot[file] = current[file]
+        for file in removed:
+            del self.snapshot[file]
+        update_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if self.render_enabled:
+            self.render(frequencies)
+        render_time = time.perf_counter() - start
+
+        logger.info('%s: файлов изменено %d, удалено %d, частот затронуто %s; '
+                    'обновление данных %.3f с, построение отчетов %.3f с',
+                    self.dir.name, len(settled), len(removed),
+                    'все' if frequencies is None else len(frequencies), update_time, render_time)
+        return True
+
+    def render(self, frequencies: Optional[List[float]]) -> None:
+        """
+        Перестроить отчеты
+
+        :param frequencies: частоты, данные которых изменились (None - все)
+        """
+        if self.options.r2:
+            render_r2(self.r2_data, self.dir, self.options)
+
+        if self.options.csv:
+            # Имя таблицы содержит R2, поэтому при его изменении прежняя таблица удаляется
+            csv_path, = save_levels_csv(self.levels_data, self.dir, self.options)
+            if self._csv_path is not None and self._csv_path != csv_path and os.path.exists(self._csv_path):
+                os.remove(self._csv_path)
+            self._csv_path = csv_path
+
+        if self.options.levels and frequencies != []:
+            render_levels(self.levels_data, self.dir, self.options, frequencies, self._levels_max_y_tick)
+            self._levels_max_y_tick = levels_max_y_tick(self.levels_data, self.options)
+
+    def run(self, interval: float = 2.0) -> None:
+        """
+        Опрашивать папку до прерывания (Ctrl+C)
+
+        :param interval: период опроса, с
+        """
+        logger.info('%s: наблюдение за папкой, файлов %d', self.dir.name, len(self.snapshot))
+        try:
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            logger.info('%s: наблюдение остановлено', self.dir.name)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m radar_chart.watch',
+                                     description='Обновление графиков R2 и уровней по мере появления файлов измерений')
+    parser.add_argument('dir', type=pathlib.Path, help='папка с измерениями')
+    parser.add_argument('--interval', type=float, default=2.0, help='период опроса папки, с')
+    parser.add_argument('--output-dir', type=pathlib.Path, default=None,
+                        help='папка для отчетов (по умолчанию - рядом с папкой измерений)')
+    parser.add_argument('--r2-max-y-tick', type=int, default=13, help='предел шкалы графика R2')
+    parser.add_argument('--levels-max-y-tick', type=int, default=None, help='предел шкалы графиков уровней')
+    parser.add_argument('--col-count', type=int, default=5, help='количество колонок графиков уровней')
+    parser.add_argument('--levels-page-size', type=int, default=None,
+                        help='количество графиков уровней на странице (перестраиваются только затронутые страницы, '
+                             'при изменении предела шкалы - все)')
+    parser.add_argument('--no-levels', action='store_true', help='не строить графики уровней')
+    args = parser.parse_args(argv)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    options = BatchOptions(levels=not args.no_levels, r2_max_y_tick=args.r2_max_y_tick,
+                           levels_max_y_tick=args.levels_max_y_tick, col_count=args.col_count,
+                           levels_page_size=args.levels_page_size, output_dir=args.output_dir)
+    if options.output_dir is not None:
+        options.output_dir.mkdir(parents=True, exist_ok=True)
+
+    MeasurementWatcher(str(args.dir), options).run(args.interval)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())